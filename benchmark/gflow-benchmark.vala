@@ -0,0 +1,277 @@
+/********************************************************************
+# Copyright 2014-2022 Daniel 'grindhold' Brendle
+#
+# This file is part of libgtkflow.
+#
+# libgtkflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+/**
+ * Headless benchmarks for the graph operations of libgflow
+ *
+ * Every measurement is written as one JSON object per line, so the
+ * results can be collected and compared over time.
+ */
+namespace GFlowBenchmark {
+
+    /**
+     * Signal driven propagation recurses once per hop, so chains
+     * deeper than this would only measure the size of the stack
+     */
+    private const int MAX_PROPAGATION_DEPTH = 2000;
+
+    /**
+     * A node with one sink and one source that forwards
+     * every value it receives
+     */
+    private class ForwardNode : GFlow.SimpleNode {
+        public GFlow.SimpleSink sink;
+        public GFlow.SimpleSource source;
+
+        public ForwardNode() {
+            this.sink = new GFlow.SimpleSink.with_type(typeof(double));
+            this.sink.max_sources = uint.MAX;
+            this.source = new GFlow.SimpleSource.with_type(typeof(double));
+            try {
+                this.add_sink(this.sink);
+                this.add_source(this.source);
+            } catch (GFlow.NodeError e) {
+                error("Could not build node: %s", e.message);
+            }
+        }
+
+        public void enable_forwarding() {
+            this.sink.changed.connect((v, flow_id) => {
+                try {
+                    this.source.set_value(v, flow_id);
+                } catch (GLib.Error e) {
+                    warning("Could not forward value: %s", e.message);
+                }
+            });
+        }
+    }
+
+    /**
+     * A synthetic graph: the nodes and the links that have to be made
+     * between them, expressed as pairs of node indices
+     */
+    private class Graph {
+        public string name;
+        public ForwardNode[] nodes;
+        public int[] links = {};
+        private HashTable<int64?, bool> pairs = new HashTable<int64?, bool>(int64_hash, int64_equal);
+
+        public Graph(string name, int size) {
+            this.name = name;
+            this.nodes = new ForwardNode[size];
+            for (int i = 0; i < size; i++) {
+                this.nodes[i] = new ForwardNode();
+            }
+        }
+
+        /**
+         * Adds a link between the given nodes. Pairs that are already
+         * linked are skipped, since linking them again does nothing and
+         * would only inflate the amount of links that are reported.
+         */
+        public void add_link(int from, int to) {
+            int64 key = ((int64)from << 32) | (uint32)to;
+            if (this.pairs.contains(key)) {
+                return;
+            }
+            this.pairs.insert(key, true);
+            this.links += from;
+            this.links += to;
+        }
+
+        public int n_links {
+            get { return this.links.length / 2; }
+        }
+
+        public void link_all() throws GLib.Error {
+            for (int i = 0; i < this.links.length; i += 2) {
+                this.nodes[this.links[i]].source.link(this.nodes[this.links[i+1]].sink);
+            }
+        }
+
+        public void unlink_all() throws GLib.Error {
+            for (int i = 0; i < this.links.length; i += 2) {
+                this.nodes[this.links[i]].source.unlink(this.nodes[this.links[i+1]].sink);
+            }
+        }
+
+        public static Graph chain(int size) {
+            var g = new Graph("chain", size);
+            for (int i = 0; i + 1 < size; i++) {
+                g.add_link(i, i + 1);
+            }
+            return g;
+        }
+
+        public static Graph fan_out(int size) {
+            var g = new Graph("fan-out", size);
+            for (int i = 1; i < size; i++) {
+                g.add_link(0, i);
+            }
+            return g;
+        }
+
+        public static Graph diamonds(int size) {
+            var g = new Graph("diamonds", size);
+            for (int i = 0; i + 3 < size; i += 3) {
+                g.add_link(i, i + 1);
+                g.add_link(i, i + 2);
+                g.add_link(i + 1, i + 3);
+                g.add_link(i + 2, i + 3);
+            }
+            return g;
+        }
+
+        public static Graph random_dag(int size, int degree, uint32 seed) {
+            var g = new Graph("random-dag", size);
+            var rand = new GLib.Rand.with_seed(seed);
+            for (int i = 0; i + 1 < size; i++) {
+                // Always link the next node so the graph is connected
+                g.add_link(i, i + 1);
+                for (int d = 1; d < degree; d++) {
+                    g.add_link(i, rand.int_range(i + 1, size));
+                }
+            }
+            return g;
+        }
+    }
+
+    private class Benchmark {
+        private unowned FileStream output;
+
+        public Benchmark(FileStream output) {
+            this.output = output;
+        }
+
+        private static string read_status_field(string field) {
+            string contents;
+            try {
+                FileUtils.get_contents("/proc/self/status", out contents);
+            } catch (FileError e) {
+                return "null";
+            }
+            foreach (string line in contents.split("\n")) {
+                if (line.has_prefix(field + ":")) {
+                    return line.substring(field.length + 1).replace("kB", "").strip();
+                }
+            }
+            return "null";
+        }
+
+        private void report(Graph g, string operation, int ops, int64 usec) {
+            double seconds = usec / 1000000.0;
+            output.printf(
+                "{\"graph\": \"%s\", \"nodes\": %d, \"links\": %d, \"operation\": \"%s\", \"ops\": %d, \"seconds\": %s, \"ops_per_second\": %s, \"rss_kb\": %s, \"peak_rss_kb\": %s}\n",
+                g.name, g.nodes.length, g.n_links, operation, ops,
+                seconds.to_string(), (seconds > 0 ? ops / seconds : 0).to_string(),
+                read_status_field("VmRSS"), read_status_field("VmHWM")
+            );
+            output.flush();
+        }
+
+        public void run(Graph g, bool propagate) throws GLib.Error {
+            int64 start = get_monotonic_time();
+            g.link_all();
+            this.report(g, "link", g.n_links, get_monotonic_time() - start);
+
+            var first = g.nodes[0];
+            var last = g.nodes[g.nodes.length - 1];
+            int checks = 100;
+            start = get_monotonic_time();
+            for (int i = 0; i < checks; i++) {
+                first.is_recursive_forward(last);
+                last.is_recursive_backward(first);
+            }
+            this.report(g, "cycle-check", checks * 2, get_monotonic_time() - start);
+
+            if (propagate) {
+                foreach (var n in g.nodes) {
+                    n.enable_forwarding();
+                }
+                int values = 100;
+                start = get_monotonic_time();
+                for (int i = 0; i < values; i++) {
+                    first.source.set_value((double)i, "benchmark-%d".printf(i));
+                }
+                // Every value travels over every link once
+                this.report(g, "propagate", values * g.n_links, get_monotonic_time() - start);
+            }
+
+            start = get_monotonic_time();
+            g.unlink_all();
+            this.report(g, "unlink", g.n_links, get_monotonic_time() - start);
+        }
+    }
+
+    public class Main {
+        private static string? sizes_arg = null;
+        private static string? output_path = null;
+
+        private const OptionEntry[] options = {
+            { "sizes", 's', 0, OptionArg.STRING, ref sizes_arg, "Comma separated node counts (default: 1000,10000)", "N,..." },
+            { "output", 'o', 0, OptionArg.FILENAME, ref output_path, "Write results to FILE instead of stdout", "FILE" },
+            { null }
+        };
+
+        public static int main(string[] args) {
+            var ctx = new OptionContext("- benchmark libgflow graph operations");
+            ctx.add_main_entries(options, null);
+            try {
+                ctx.parse(ref args);
+            } catch (OptionError e) {
+                stderr.printf("%s\n", e.message);
+                return 1;
+            }
+
+            int[] sizes = {};
+            foreach (string s in (sizes_arg ?? "1000,10000").split(",")) {
+                sizes += int.parse(s);
+            }
+
+            unowned FileStream output = stdout;
+            FileStream? file = null;
+            if (output_path != null) {
+                file = FileStream.open(output_path, "w");
+                if (file == null) {
+                    stderr.printf("Could not open %s\n", output_path);
+                    return 1;
+                }
+                output = file;
+            }
+            var benchmark = new Benchmark(output);
+
+            try {
+                foreach (int size in sizes) {
+                    benchmark.run(Graph.chain(size), size <= MAX_PROPAGATION_DEPTH);
+                    benchmark.run(Graph.fan_out(size), true);
+                    // Propagation over converging paths forwards every value once
+                    // per path, which grows exponentially for both of these
+                    benchmark.run(Graph.diamonds(size), false);
+                    benchmark.run(Graph.random_dag(size, 3, 42), false);
+                }
+            } catch (GLib.Error e) {
+                stderr.printf("Benchmark failed: %s\n", e.message);
+                return 1;
+            }
+            return 0;
+        }
+    }
+}
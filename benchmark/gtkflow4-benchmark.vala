@@ -0,0 +1,333 @@
+/********************************************************************
+# Copyright 2014-2022 Daniel 'grindhold' Brendle
+#
+# This file is part of libgtkflow.
+#
+# libgtkflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+/**
+ * Offscreen frame time benchmarks for {@link GtkFlow.NodeView} and
+ * {@link GtkFlow.Minimap}
+ *
+ * Every frame is laid out, snapshotted and rasterized into a texture
+ * with a {@link Gsk.CairoRenderer}, independent of the frame clock of
+ * the display. User interaction is simulated by emitting the signals
+ * of the widgets' event controllers. Like the GFlow benchmark, results
+ * are written as JSON lines.
+ */
+namespace GtkFlowBenchmark {
+
+#if HAVE_MALLINFO2
+    [CCode (cname = "struct mallinfo2", cheader_filename = "malloc.h", has_type_id = false, destroy_function = "")]
+    private struct MallInfo {
+        public size_t uordblks;
+    }
+
+    [CCode (cname = "mallinfo2", cheader_filename = "malloc.h")]
+    private extern MallInfo mallinfo();
+
+    private const bool HAVE_HEAP_STATS = true;
+
+    private int64 get_heap_size() {
+        return (int64)mallinfo().uordblks;
+    }
+#else
+    // mallinfo2() is specific to glibc. Elsewhere the heap growth is not measured.
+    private const bool HAVE_HEAP_STATS = false;
+
+    private int64 get_heap_size() {
+        return 0;
+    }
+#endif
+
+    private const int VIEW_WIDTH = 1280;
+    private const int VIEW_HEIGHT = 800;
+    private const int MINIMAP_SIZE = 200;
+
+    private class BenchNode : GFlow.SimpleNode {
+        public GFlow.SimpleSink sink;
+        public GFlow.SimpleSource source;
+
+        public BenchNode(int i) {
+            this.name = "Node %d".printf(i);
+            this.sink = new GFlow.SimpleSink.with_type(typeof(double));
+            this.sink.name = "in";
+            this.source = new GFlow.SimpleSource.with_type(typeof(double));
+            this.source.name = "out";
+            try {
+                this.add_sink(this.sink);
+                this.add_source(this.source);
+            } catch (GFlow.NodeError e) {
+                error("Could not build node: %s", e.message);
+            }
+        }
+    }
+
+    /**
+     * Collects the duration and heap growth of every frame of a scenario
+     */
+    private class FrameStats {
+        private int64[] durations = {};
+        private int64 heap_growth = 0;
+
+        public void add(int64 usec, int64 heap) {
+            this.durations += usec;
+            this.heap_growth += heap;
+        }
+
+        /**
+         * Returns the given percentile of the frame durations in milliseconds
+         */
+        public double percentile(double p) {
+            if (this.durations.length == 0) return 0;
+            int64[] sorted = this.durations;
+            for (int i = 1; i < sorted.length; i++) {
+                int64 d = sorted[i];
+                int j = i - 1;
+                while (j >= 0 && sorted[j] > d) {
+                    sorted[j+1] = sorted[j];
+                    j--;
+                }
+                sorted[j+1] = d;
+            }
+            int index = (int)Math.ceil(p * sorted.length) - 1;
+            return sorted[int.max(index, 0)] / 1000.0;
+        }
+
+        public int n_frames {
+            get { return this.durations.length; }
+        }
+
+        public int64 heap_per_frame {
+            get { return this.n_frames > 0 ? this.heap_growth / this.n_frames : 0; }
+        }
+    }
+
+    private class Benchmark {
+        private unowned FileStream output;
+        private Gsk.Renderer renderer;
+
+        private Gtk.Window window;
+        private Gtk.ScrolledWindow sw;
+        private GtkFlow.NodeView nv;
+        private GtkFlow.Minimap mm;
+        private BenchNode[] nodes = {};
+        private GtkFlow.Node[] node_widgets = {};
+
+        public Benchmark(FileStream output) throws GLib.Error {
+            this.output = output;
+            this.renderer = new Gsk.CairoRenderer();
+            this.renderer.realize(null);
+        }
+
+        private static Gtk.EventController? find_controller(Gtk.Widget w, Type t) {
+            var controllers = w.observe_controllers();
+            for (uint i = 0; i < controllers.get_n_items(); i++) {
+                var c = controllers.get_item(i);
+                if (c.get_type().is_a(t)) {
+                    return (Gtk.EventController)c;
+                }
+            }
+            return null;
+        }
+
+        private void build(int n_nodes) {
+            if (this.window != null) {
+                this.window.destroy();
+            }
+            // Widgets are only rendered once they are mapped, so the window
+            // has to be presented, although it is never drawn to
+            this.window = new Gtk.Window();
+            var box = new Gtk.Box(Gtk.Orientation.VERTICAL, 0);
+            this.sw = new Gtk.ScrolledWindow();
+            this.nv = new GtkFlow.NodeView();
+            this.sw.child = this.nv;
+            this.mm = new GtkFlow.Minimap();
+            box.append(this.mm);
+            box.append(this.sw);
+            this.window.child = box;
+            this.window.present();
+            this.mm.nodeview = this.nv;
+            this.nodes = {};
+            this.node_widgets = {};
+
+            int columns = (int)Math.ceil(Math.sqrt(n_nodes));
+            for (int i = 0; i < n_nodes; i++) {
+                var n = new BenchNode(i);
+                var w = new GtkFlow.Node(n);
+                this.nv.add(w);
+                // Leave the top left corner empty for the rubber band
+                w.set_position(300 + (i % columns) * 220, 300 + (i / columns) * 140);
+                this.nodes += n;
+                this.node_widgets += w;
+            }
+            for (int i = 0; i + 1 < n_nodes; i++) {
+                try {
+                    this.nodes[i].source.link(this.nodes[i+1].sink);
+                } catch (GLib.Error e) {
+                    warning("Could not link nodes: %s", e.message);
+                }
+            }
+        }
+
+        private void allocate() {
+            int min, nat, _;
+            this.sw.measure(Gtk.Orientation.HORIZONTAL, -1, out min, out nat, out _, out _);
+            this.sw.measure(Gtk.Orientation.VERTICAL, VIEW_WIDTH, out min, out nat, out _, out _);
+            this.sw.allocate(VIEW_WIDTH, VIEW_HEIGHT, -1, null);
+            this.mm.measure(Gtk.Orientation.HORIZONTAL, -1, out min, out nat, out _, out _);
+            this.mm.measure(Gtk.Orientation.VERTICAL, MINIMAP_SIZE, out min, out nat, out _, out _);
+            this.mm.allocate(MINIMAP_SIZE, MINIMAP_SIZE, -1, null);
+        }
+
+        private void render(Gtk.Widget w, int width, int height) {
+            var paintable = new Gtk.WidgetPaintable(w);
+            var sn = new Gtk.Snapshot();
+            paintable.snapshot(sn, width, height);
+            var node = sn.to_node();
+            if (node != null) {
+                this.renderer.render_texture(node, Graphene.Rect().init(0, 0, width, height));
+            }
+        }
+
+        private delegate void FrameFunc(int frame);
+
+        private void measure_frames(string scenario, int n_frames, FrameFunc step) {
+            var nv_stats = new FrameStats();
+            var mm_stats = new FrameStats();
+            for (int frame = 0; frame < n_frames; frame++) {
+                step(frame);
+
+                var heap = get_heap_size();
+                var start = get_monotonic_time();
+                this.allocate();
+                this.render(this.nv, VIEW_WIDTH, VIEW_HEIGHT);
+                nv_stats.add(get_monotonic_time() - start, get_heap_size() - heap);
+
+                heap = get_heap_size();
+                start = get_monotonic_time();
+                this.render(this.mm, MINIMAP_SIZE, MINIMAP_SIZE);
+                mm_stats.add(get_monotonic_time() - start, get_heap_size() - heap);
+            }
+            this.report("nodeview", scenario, nv_stats);
+            this.report("minimap", scenario, mm_stats);
+        }
+
+        private void report(string widget, string scenario, FrameStats stats) {
+            output.printf(
+                "{\"widget\": \"%s\", \"scenario\": \"%s\", \"nodes\": %d, \"frames\": %d, \"p50_ms\": %s, \"p99_ms\": %s, \"heap_bytes_per_frame\": %s}\n",
+                widget, scenario, this.nodes.length, stats.n_frames,
+                stats.percentile(0.5).to_string(), stats.percentile(0.99).to_string(),
+                HAVE_HEAP_STATS ? stats.heap_per_frame.to_string() : "\"n/a\""
+            );
+            output.flush();
+        }
+
+        public void run(int n_nodes, int n_frames) {
+            this.build(n_nodes);
+            this.allocate();
+
+            var motion = (Gtk.EventControllerMotion)find_controller(this.nv, typeof(Gtk.EventControllerMotion));
+            var click = (Gtk.GestureClick)find_controller(this.nv, typeof(Gtk.GestureClick));
+
+            this.measure_frames("idle", n_frames, (frame) => {
+                this.nv.queue_draw();
+            });
+
+            // Drag the first node around in a circle
+            var dragged = this.node_widgets[0];
+            var drag = (Gtk.GestureDrag)find_controller(dragged, typeof(Gtk.GestureDrag));
+            drag.drag_begin(20, 5);
+            drag.drag_update(10, 10);
+            this.measure_frames("drag", n_frames, (frame) => {
+                double angle = frame * 0.1;
+                motion.motion(200 + 100 * Math.cos(angle), 200 + 100 * Math.sin(angle));
+            });
+            drag.drag_end(0, 0);
+
+            // Rubber band selection from the empty corner of the view
+            click.pressed(1, 5, 5);
+            this.measure_frames("rubberband", n_frames, (frame) => {
+                double t = (double)(frame + 1) / n_frames;
+                motion.motion(5 + t * (VIEW_WIDTH - 10), 5 + t * (VIEW_HEIGHT - 10));
+            });
+            click.released(1, VIEW_WIDTH - 5, VIEW_HEIGHT - 5);
+
+            // Temporary connector from the last node's source
+            var dock = this.nv.retrieve_dock(this.nodes[this.nodes.length-1].source);
+            var dock_click = (Gtk.GestureClick)find_controller(dock, typeof(Gtk.GestureClick));
+            dock_click.pressed(1, 8, 8);
+            this.measure_frames("temp-connector", n_frames, (frame) => {
+                double angle = frame * 0.1;
+                motion.motion(VIEW_WIDTH / 2 + 300 * Math.cos(angle), VIEW_HEIGHT / 2 + 300 * Math.sin(angle));
+            });
+            click.released(1, 5, 5);
+        }
+    }
+
+    public class Main {
+        private static string? sizes_arg = null;
+        private static int n_frames = 200;
+        private static string? output_path = null;
+
+        private const OptionEntry[] options = {
+            { "sizes", 's', 0, OptionArg.STRING, ref sizes_arg, "Comma separated node counts (default: 100,1000)", "N,..." },
+            { "frames", 'f', 0, OptionArg.INT, ref n_frames, "Frames rendered per scenario (default: 200)", "N" },
+            { "output", 'o', 0, OptionArg.FILENAME, ref output_path, "Write results to FILE instead of stdout", "FILE" },
+            { null }
+        };
+
+        public static int main(string[] args) {
+            var ctx = new OptionContext("- benchmark rendering of libgtkflow4 widgets");
+            ctx.add_main_entries(options, null);
+            try {
+                ctx.parse(ref args);
+            } catch (OptionError e) {
+                stderr.printf("%s\n", e.message);
+                return 1;
+            }
+            Gtk.init();
+
+            int[] sizes = {};
+            foreach (string s in (sizes_arg ?? "100,1000").split(",")) {
+                sizes += int.parse(s);
+            }
+
+            unowned FileStream output = stdout;
+            FileStream? file = null;
+            if (output_path != null) {
+                file = FileStream.open(output_path, "w");
+                if (file == null) {
+                    stderr.printf("Could not open %s\n", output_path);
+                    return 1;
+                }
+                output = file;
+            }
+
+            try {
+                var benchmark = new Benchmark(output);
+                foreach (int size in sizes) {
+                    benchmark.run(size, n_frames);
+                }
+            } catch (GLib.Error e) {
+                stderr.printf("Benchmark failed: %s\n", e.message);
+                return 1;
+            }
+            return 0;
+        }
+    }
+}
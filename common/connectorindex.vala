@@ -0,0 +1,578 @@
+/********************************************************************
+# Copyright 2014-2022 Daniel 'grindhold' Brendle
+#
+# This file is part of libgtkflow.
+#
+# libgtkflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+namespace GtkFlow {
+    /**
+     * The geometry of the connector between a source and a sink, in the
+     * coordinate system that the nodes of the nodeview are positioned in
+     */
+    internal class Connector {
+        public GFlow.Source source;
+        public GFlow.Sink sink;
+        /**
+         * The start and end points of the curves that make up this
+         * connector in the order x0, y0, x1, y1. A bundled connector
+         * starts with the trunk that it shares with the other connectors
+         * of its source, followed by its own branch.
+         */
+        public double[] segments;
+        public bool is_bundled;
+
+        private double min_x;
+        private double min_y;
+        private double max_x;
+        private double max_y;
+
+        public Connector(GFlow.Source source, GFlow.Sink sink, double x0, double y0, double x1, double y1) {
+            this.source = source;
+            this.sink = sink;
+            this.segments = {x0, y0, x1, y1};
+            this.is_bundled = false;
+            this.update_bounds();
+        }
+
+        /**
+         * Creates a connector that runs along the trunk from the source
+         * to the given branch point and from there to the sink
+         */
+        public Connector.bundled(GFlow.Source source, GFlow.Sink sink, double x0, double y0,
+                                 double branch_x, double branch_y, double x1, double y1) {
+            this.source = source;
+            this.sink = sink;
+            this.segments = {x0, y0, branch_x, branch_y, branch_x, branch_y, x1, y1};
+            this.is_bundled = true;
+            this.update_bounds();
+        }
+
+        /**
+         * Returns the control points of the curve between the given points
+         * in the order x0, y0 … x3, y3 matching the curves that the
+         * nodeviews draw
+         */
+        public static double[] get_curve(double x0, double y0, double x1, double y1) {
+            double w = x1 - x0;
+            double h = y1 - y0;
+            if (w > 0) {
+                return {x0, y0, x0 + w/3, y0, x0 + 2*w/3, y0 + h, x1, y1};
+            }
+            return {x0, y0, x0 - w/3, y0, x0 + 1.3*w, y0 + h, x1, y1};
+        }
+
+        private void update_bounds() {
+            this.min_x = this.max_x = this.segments[0];
+            this.min_y = this.max_y = this.segments[1];
+            // Every curve stays within the hull of its control points
+            for (int i = 0; i < this.segments.length; i += 4) {
+                var p = get_curve(this.segments[i], this.segments[i+1], this.segments[i+2], this.segments[i+3]);
+                for (int j = 0; j < p.length; j += 2) {
+                    this.min_x = double.min(this.min_x, p[j]);
+                    this.max_x = double.max(this.max_x, p[j]);
+                    this.min_y = double.min(this.min_y, p[j+1]);
+                    this.max_y = double.max(this.max_y, p[j+1]);
+                }
+            }
+        }
+
+        public void get_bounds(out double min_x, out double min_y, out double max_x, out double max_y) {
+            min_x = this.min_x;
+            min_y = this.min_y;
+            max_x = this.max_x;
+            max_y = this.max_y;
+        }
+
+        /**
+         * Returns the distance of the given point to the connector,
+         * approximating each of its curves by a polyline
+         */
+        public double distance_to(double x, double y) {
+            const int STEPS = 24;
+            double best = double.MAX;
+            for (int i = 0; i < this.segments.length; i += 4) {
+                var p = get_curve(this.segments[i], this.segments[i+1], this.segments[i+2], this.segments[i+3]);
+                double px = p[0], py = p[1];
+                for (int j = 1; j <= STEPS; j++) {
+                    double t = (double)j / STEPS;
+                    double u = 1 - t;
+                    double a = u*u*u, b = 3*u*u*t, c = 3*u*t*t, d = t*t*t;
+                    double qx = a*p[0] + b*p[2] + c*p[4] + d*p[6];
+                    double qy = a*p[1] + b*p[3] + c*p[5] + d*p[7];
+                    best = double.min(best, distance_to_segment(x, y, px, py, qx, qy));
+                    px = qx;
+                    py = qy;
+                }
+            }
+            return best;
+        }
+
+        private static double distance_to_segment(double x, double y, double ax, double ay, double bx, double by) {
+            double dx = bx - ax, dy = by - ay;
+            double len = dx*dx + dy*dy;
+            double t = len > 0 ? ((x - ax) * dx + (y - ay) * dy) / len : 0;
+            t = t.clamp(0, 1);
+            double cx = ax + t * dx - x, cy = ay + t * dy - y;
+            return Math.sqrt(cx*cx + cy*cy);
+        }
+    }
+
+    /**
+     * One level of the grid of a {@link ConnectorIndex}
+     */
+    private class ConnectorCells {
+        private double cell_size;
+        private HashTable<int64?, GenericArray<Connector>> cells =
+            new HashTable<int64?, GenericArray<Connector>>(int64_hash, int64_equal);
+
+        public ConnectorCells(double cell_size) {
+            this.cell_size = cell_size;
+        }
+
+        /**
+         * Packs the coordinates of a cell into a single key,
+         * so looking up a cell does not allocate
+         */
+        private static int64 get_key(int cx, int cy) {
+            return ((int64)cx << 32) | (uint32)cy;
+        }
+
+        private int to_cell(double coordinate) {
+            return (int)Math.floor(coordinate / this.cell_size);
+        }
+
+        /**
+         * Returns the amount of cells that the bounds of the given connector cover
+         */
+        public int64 count_cells(Connector c) {
+            double min_x, min_y, max_x, max_y;
+            c.get_bounds(out min_x, out min_y, out max_x, out max_y);
+            return (int64)(this.to_cell(max_x) - this.to_cell(min_x) + 1)
+                 * (this.to_cell(max_y) - this.to_cell(min_y) + 1);
+        }
+
+        public void add(Connector c) {
+            double min_x, min_y, max_x, max_y;
+            c.get_bounds(out min_x, out min_y, out max_x, out max_y);
+            for (int cx = this.to_cell(min_x); cx <= this.to_cell(max_x); cx++) {
+                for (int cy = this.to_cell(min_y); cy <= this.to_cell(max_y); cy++) {
+                    int64 key = get_key(cx, cy);
+                    var cell = this.cells.get(key);
+                    if (cell == null) {
+                        cell = new GenericArray<Connector>();
+                        this.cells.insert(key, cell);
+                    }
+                    cell.add(c);
+                }
+            }
+        }
+
+        public void remove(Connector c) {
+            double min_x, min_y, max_x, max_y;
+            c.get_bounds(out min_x, out min_y, out max_x, out max_y);
+            for (int cx = this.to_cell(min_x); cx <= this.to_cell(max_x); cx++) {
+                for (int cy = this.to_cell(min_y); cy <= this.to_cell(max_y); cy++) {
+                    int64 key = get_key(cx, cy);
+                    var cell = this.cells.get(key);
+                    if (cell == null) {
+                        continue;
+                    }
+                    cell.remove_fast(c);
+                    if (cell.length == 0) {
+                        this.cells.remove(key);
+                    }
+                }
+            }
+        }
+
+        public void clear() {
+            this.cells.remove_all();
+        }
+
+        /**
+         * Returns the connector of the cells around the given point that
+         * is closer to it than the given distance, and narrows the
+         * distance down to the one of that connector
+         */
+        public Connector? closest(double x, double y, ref double best_distance) {
+            Connector? best = null;
+            double min_x, min_y, max_x, max_y;
+            // The tolerance may reach into neighbouring cells
+            int cx0 = this.to_cell(x - best_distance);
+            int cy0 = this.to_cell(y - best_distance);
+            int cx1 = this.to_cell(x + best_distance);
+            int cy1 = this.to_cell(y + best_distance);
+            for (int cx = cx0; cx <= cx1; cx++) {
+                for (int cy = cy0; cy <= cy1; cy++) {
+                    var cell = this.cells.get(get_key(cx, cy));
+                    if (cell == null) {
+                        continue;
+                    }
+                    foreach (Connector c in cell) {
+                        c.get_bounds(out min_x, out min_y, out max_x, out max_y);
+                        if (x < min_x - best_distance || x > max_x + best_distance
+                         || y < min_y - best_distance || y > max_y + best_distance) {
+                            continue;
+                        }
+                        double d = c.distance_to(x, y);
+                        if (d <= best_distance) {
+                            best_distance = d;
+                            best = c;
+                        }
+                    }
+                }
+            }
+            return best;
+        }
+    }
+
+    /**
+     * Keeps the connectors of a nodeview, so finding the connector under
+     * the pointer only tests the few connectors that pass the pointer's
+     * cell instead of every connector
+     *
+     * The bounds of the connectors are bucketed into grids of growing
+     * cell sizes. Each connector goes into the finest grid in which it
+     * covers only a few cells, so long connectors don't fill the cells
+     * of the fine grids. Connectors are looked up by their docks through
+     * a hash table, so the views can replace the connectors of a single
+     * node when it moves or its links change.
+     */
+    internal class ConnectorIndex {
+        private const double CELL_SIZE = 128.0;
+        private const double LEVEL_FACTOR = 8.0;
+        private const int N_LEVELS = 4;
+        /**
+         * The amount of cells a connector may cover in one
+         * level before it is moved to the next coarser one
+         */
+        private const int MAX_CELLS = 16;
+
+        private ConnectorCells[] levels = {};
+        private HashTable<GFlow.Source, HashTable<GFlow.Sink, Connector>> sources =
+            new HashTable<GFlow.Source, HashTable<GFlow.Sink, Connector>>(direct_hash, direct_equal);
+        private uint n_connectors = 0;
+
+        public ConnectorIndex() {
+            double cell_size = CELL_SIZE;
+            for (int i = 0; i < N_LEVELS; i++) {
+                this.levels += new ConnectorCells(cell_size);
+                cell_size *= LEVEL_FACTOR;
+            }
+        }
+
+        public uint length {
+            get { return this.n_connectors; }
+        }
+
+        public void clear() {
+            foreach (ConnectorCells level in this.levels) {
+                level.clear();
+            }
+            this.sources.remove_all();
+            this.n_connectors = 0;
+        }
+
+        private unowned ConnectorCells get_level(Connector c) {
+            for (int i = 0; i < N_LEVELS - 1; i++) {
+                if (this.levels[i].count_cells(c) <= MAX_CELLS) {
+                    return this.levels[i];
+                }
+            }
+            return this.levels[N_LEVELS - 1];
+        }
+
+        /**
+         * Stores the given connector in place of the one that
+         * has been stored for the same docks before
+         */
+        public void add(Connector c) {
+            var sinks = this.sources.get(c.source);
+            if (sinks == null) {
+                sinks = new HashTable<GFlow.Sink, Connector>(direct_hash, direct_equal);
+                this.sources.insert(c.source, sinks);
+            }
+            var old = sinks.get(c.sink);
+            if (old != null) {
+                this.get_level(old).remove(old);
+            } else {
+                this.n_connectors++;
+            }
+            sinks.insert(c.sink, c);
+            this.get_level(c).add(c);
+        }
+
+        /**
+         * Removes the connector between the given docks
+         */
+        public void remove(GFlow.Source source, GFlow.Sink sink) {
+            var sinks = this.sources.get(source);
+            if (sinks == null) {
+                return;
+            }
+            var c = sinks.get(sink);
+            if (c == null) {
+                return;
+            }
+            this.get_level(c).remove(c);
+            sinks.remove(sink);
+            this.n_connectors--;
+            if (sinks.size() == 0) {
+                this.sources.remove(source);
+            }
+        }
+
+        /**
+         * Removes all connectors that leave the given source
+         */
+        public void remove_source(GFlow.Source source) {
+            var sinks = this.sources.get(source);
+            if (sinks == null) {
+                return;
+            }
+            foreach (Connector c in sinks.get_values()) {
+                this.get_level(c).remove(c);
+            }
+            this.n_connectors -= sinks.size();
+            this.sources.remove(source);
+        }
+
+        /**
+         * Returns the connector closest to the given point if
+         * it is no further away than the given tolerance
+         */
+        public Connector? pick(double x, double y, double tolerance) {
+            Connector? best = null;
+            double best_distance = tolerance;
+            foreach (ConnectorCells level in this.levels) {
+                best = level.closest(x, y, ref best_distance) ?? best;
+            }
+            return best;
+        }
+
+        /**
+         * Returns the connector between the given docks, if there is one
+         */
+        public Connector? find(GFlow.Source source, GFlow.Sink sink) {
+            var sinks = this.sources.get(source);
+            if (sinks == null) {
+                return null;
+            }
+            return sinks.get(sink);
+        }
+
+        /**
+         * Calls the given function for every connector that leaves the given source
+         */
+        public void foreach_source_connector(GFlow.Source source, GLib.Func<Connector> func) {
+            var sinks = this.sources.get(source);
+            if (sinks == null) {
+                return;
+            }
+            sinks.foreach((sink, c) => {
+                func(c);
+            });
+        }
+
+        /**
+         * Calls the given function for every connector
+         */
+        public void foreach_connector(GLib.Func<Connector> func) {
+            this.sources.foreach((source, sinks) => {
+                sinks.foreach((sink, c) => {
+                    func(c);
+                });
+            });
+        }
+    }
+
+    /**
+     * Watches the links and docks of the nodes of a nodeview and
+     * collects the sources whose connectors have to be computed again
+     */
+    internal class ConnectorUpdates : GLib.Object {
+        private HashTable<GFlow.Node, GFlow.Node> nodes =
+            new HashTable<GFlow.Node, GFlow.Node>(direct_hash, direct_equal);
+        private HashTable<GFlow.Source, GFlow.Source> stale =
+            new HashTable<GFlow.Source, GFlow.Source>(direct_hash, direct_equal);
+        private bool all_stale = false;
+
+        /**
+         * Emitted when connectors have been marked as stale
+         */
+        public signal void changed();
+
+        /**
+         * Watches the links and docks of the given node
+         */
+        public void watch(GFlow.Node n) {
+            if (this.nodes.contains(n)) {
+                return;
+            }
+            this.nodes.insert(n, n);
+            foreach (GFlow.Source s in n.get_sources()) {
+                this.watch_dock(s);
+            }
+            foreach (GFlow.Sink s in n.get_sinks()) {
+                this.watch_dock(s);
+            }
+            n.source_added.connect(this.source_added);
+            n.sink_added.connect(this.sink_added);
+            n.source_removed.connect(this.source_removed);
+            n.sink_removed.connect(this.sink_removed);
+            this.invalidate_node(n);
+        }
+
+        /**
+         * Stops watching the given node
+         */
+        public void unwatch(GFlow.Node n) {
+            if (!this.nodes.contains(n)) {
+                return;
+            }
+            this.invalidate_node(n);
+            this.nodes.remove(n);
+            SignalHandler.disconnect_matched(n, SignalMatchType.DATA, 0, 0, null, null, this);
+            foreach (GFlow.Source s in n.get_sources()) {
+                this.unwatch_dock(s);
+            }
+            foreach (GFlow.Sink s in n.get_sinks()) {
+                this.unwatch_dock(s);
+            }
+        }
+
+        /**
+         * Stops watching all nodes
+         */
+        public void clear() {
+            foreach (GFlow.Node n in this.nodes.get_values()) {
+                this.unwatch(n);
+            }
+            this.stale.remove_all();
+            this.all_stale = false;
+        }
+
+        private void watch_dock(GFlow.Dock d) {
+            d.linked.connect(this.dock_linked);
+            d.unlinked.connect(this.dock_unlinked);
+        }
+
+        private void unwatch_dock(GFlow.Dock d) {
+            SignalHandler.disconnect_matched(d, SignalMatchType.DATA, 0, 0, null, null, this);
+        }
+
+        private void source_added(GFlow.Node n, GFlow.Source s) {
+            this.watch_dock(s);
+            // The other docks of the node may have moved
+            this.invalidate_node(n);
+        }
+
+        private void sink_added(GFlow.Node n, GFlow.Sink s) {
+            this.watch_dock(s);
+            this.invalidate_node(n);
+        }
+
+        private void source_removed(GFlow.Node n, GFlow.Source s) {
+            this.unwatch_dock(s);
+            // The node no longer lists the source, so its
+            // connectors have to be dropped on their own
+            this.invalidate_source(s);
+            this.invalidate_node(n);
+        }
+
+        private void sink_removed(GFlow.Node n, GFlow.Sink s) {
+            this.unwatch_dock(s);
+            foreach (GFlow.Source src in s.sources) {
+                this.stale.insert(src, src);
+            }
+            this.invalidate_node(n);
+        }
+
+        private void dock_linked(GFlow.Dock d, GFlow.Dock other) {
+            this.invalidate_source((GFlow.Source)(d is GFlow.Source ? d : other));
+        }
+
+        private void dock_unlinked(GFlow.Dock d, GFlow.Dock other, bool last) {
+            this.invalidate_source((GFlow.Source)(d is GFlow.Source ? d : other));
+        }
+
+        /**
+         * Marks the connectors of the given source as stale
+         */
+        public void invalidate_source(GFlow.Source s) {
+            this.stale.insert(s, s);
+            this.changed();
+        }
+
+        /**
+         * Marks the connectors that leave or reach the given node as stale
+         */
+        public void invalidate_node(GFlow.Node n) {
+            foreach (GFlow.Source s in n.get_sources()) {
+                this.stale.insert(s, s);
+            }
+            foreach (GFlow.Sink snk in n.get_sinks()) {
+                foreach (GFlow.Source s in snk.sources) {
+                    this.stale.insert(s, s);
+                }
+            }
+            this.changed();
+        }
+
+        /**
+         * Marks all connectors as stale
+         */
+        public void invalidate_all() {
+            this.all_stale = true;
+            this.changed();
+        }
+
+        /**
+         * Returns true if there are stale connectors
+         */
+        public bool is_stale() {
+            return this.all_stale || this.stale.size() > 0;
+        }
+
+        /**
+         * Returns the sources whose connectors are stale and forgets them
+         *
+         * If all connectors are stale, all is set to true and the sources
+         * of all watched nodes are returned. The index has to be cleared
+         * before their connectors are added again.
+         */
+        public GenericArray<GFlow.Source> take_stale(out bool all) {
+            all = this.all_stale;
+            var result = new GenericArray<GFlow.Source>();
+            if (this.all_stale) {
+                foreach (GFlow.Node n in this.nodes.get_values()) {
+                    foreach (GFlow.Source s in n.get_sources()) {
+                        result.add(s);
+                    }
+                }
+            } else {
+                foreach (GFlow.Source s in this.stale.get_values()) {
+                    result.add(s);
+                }
+            }
+            this.stale.remove_all();
+            this.all_stale = false;
+            return result;
+        }
+    }
+}
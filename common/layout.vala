@@ -0,0 +1,320 @@
+/********************************************************************
+# Copyright 2014-2022 Daniel 'grindhold' Brendle
+#
+# This file is part of libgtkflow.
+#
+# libgtkflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+
+namespace GtkFlow {
+    /**
+     * An algorithm that arranges the nodes of a {@link NodeView}
+     */
+    public interface Layout : GLib.Object {
+        /**
+         * Rearranges the nodes of the given graph according to the
+         * algorithm that implements this method
+         *
+         * This runs on a worker thread, so implementations may only
+         * touch the graph. Intermediate positions can be shown by
+         * publishing them. Implementations should return early once
+         * the cancellable has been cancelled.
+         */
+        internal abstract void compute(LayoutGraph graph, GLib.Cancellable cancellable);
+    }
+
+    /**
+     * The nodes that a {@link Layout} arranges as plain numbers
+     *
+     * Layouts work on this copy of the positions, sizes and links of the
+     * nodes instead of the widgets, so they can run on a worker thread
+     * while the nodeview keeps handling input.
+     */
+    internal class LayoutGraph {
+        public double[] x;
+        public double[] y;
+        public double[] width;
+        public double[] height;
+        /**
+         * The neighbours of node i are stored in
+         * neighbors[offsets[i]] to neighbors[offsets[i+1]-1]
+         */
+        public int[] offsets;
+        public int[] neighbors;
+
+        private double[]? published_x = null;
+        private double[]? published_y = null;
+        private uint serial = 0;
+
+        /**
+         * Creates a graph of the given nodes. The edges are given as
+         * pairs of indices and are treated as undirected.
+         */
+        public LayoutGraph(double[] x, double[] y, double[] width, double[] height, int[] edges) {
+            this.x = x;
+            this.y = y;
+            this.width = width;
+            this.height = height;
+            int n = x.length;
+            var degree = new int[n];
+            for (int i = 0; i < edges.length; i += 2) {
+                degree[edges[i]]++;
+                degree[edges[i+1]]++;
+            }
+            this.offsets = new int[n + 1];
+            for (int i = 0; i < n; i++) {
+                this.offsets[i+1] = this.offsets[i] + degree[i];
+            }
+            this.neighbors = new int[this.offsets[n]];
+            var filled = new int[n];
+            for (int i = 0; i < edges.length; i += 2) {
+                int a = edges[i], b = edges[i+1];
+                this.neighbors[this.offsets[a] + filled[a]++] = b;
+                this.neighbors[this.offsets[b] + filled[b]++] = a;
+            }
+        }
+
+        public int n_nodes {
+            get { return this.x.length; }
+        }
+
+        /**
+         * Makes the current positions available to the main thread
+         */
+        public void publish() {
+            lock (this.serial) {
+                this.published_x = this.x;
+                this.published_y = this.y;
+                this.serial++;
+            }
+        }
+
+        /**
+         * Takes the positions that have been published last if they are
+         * newer than the given serial
+         */
+        public bool fetch(ref uint last_serial, out double[] x, out double[] y) {
+            lock (this.serial) {
+                if (last_serial == this.serial || this.published_x == null) {
+                    x = {};
+                    y = {};
+                    return false;
+                }
+                last_serial = this.serial;
+                x = (owned) this.published_x;
+                y = (owned) this.published_y;
+                return true;
+            }
+        }
+    }
+
+    /**
+     * Runs a {@link Layout} on a worker thread and moves the shown
+     * positions of the nodes towards the positions it publishes
+     */
+    internal class LayoutRun {
+        /**
+         * The part of the remaining distance that
+         * nodes move in one frame when animated
+         */
+        private const double EASING = 0.25;
+
+        private Layout layout;
+        private LayoutGraph graph;
+        private GLib.Cancellable cancellable = new GLib.Cancellable();
+        private Thread<bool>? thread = null;
+        private int finished = 0;
+        private uint serial = 0;
+        private double[] target_x;
+        private double[] target_y;
+
+        /**
+         * The positions that the nodes should be displayed at right now
+         */
+        public double[] shown_x;
+        public double[] shown_y;
+
+        public LayoutRun(Layout layout, LayoutGraph graph) {
+            this.layout = layout;
+            this.graph = graph;
+            this.shown_x = graph.x;
+            this.shown_y = graph.y;
+            this.target_x = graph.x;
+            this.target_y = graph.y;
+        }
+
+        public void start() throws GLib.Error {
+            this.thread = new Thread<bool>.try("gtkflow-layout", this.run);
+        }
+
+        private bool run() {
+            this.layout.compute(this.graph, this.cancellable);
+            AtomicInt.set(ref this.finished, 1);
+            return true;
+        }
+
+        /**
+         * Stops the worker without waiting for it
+         */
+        public void cancel() {
+            this.cancellable.cancel();
+            this.thread = null;
+        }
+
+        /**
+         * Advances the shown positions by one frame
+         *
+         * Returns false once the layout has finished and every
+         * node has arrived at its final position.
+         */
+        public bool step(bool animate) {
+            // Everything has been published once the worker is done, so
+            // checking first guarantees that the final positions are fetched
+            bool done = AtomicInt.get(ref this.finished) == 1;
+            double[] x, y;
+            if (this.graph.fetch(ref this.serial, out x, out y)) {
+                this.target_x = (owned) x;
+                this.target_y = (owned) y;
+            }
+            bool moving = false;
+            for (int i = 0; i < this.shown_x.length; i++) {
+                double dx = this.target_x[i] - this.shown_x[i];
+                double dy = this.target_y[i] - this.shown_y[i];
+                if (!animate || (Math.fabs(dx) < 0.5 && Math.fabs(dy) < 0.5)) {
+                    this.shown_x[i] = this.target_x[i];
+                    this.shown_y[i] = this.target_y[i];
+                } else {
+                    this.shown_x[i] += dx * EASING;
+                    this.shown_y[i] += dy * EASING;
+                    moving = true;
+                }
+            }
+            if (moving || !done) {
+                return true;
+            }
+            if (this.thread != null) {
+                this.thread.join();
+                this.thread = null;
+            }
+            return false;
+        }
+    }
+
+    /**
+     * Spring-Simulation mechanism autolayouter
+     *
+     * THIS FEATURE IS VERY EXPERIMENTAL. USE AT YOUR OWN RISK.
+     * IT WILL VERY LIKELY SEGFAULT AND MAYBE RID YOUR ACCOUNT
+     * OF ALL YOUR METICUOUSLY COLLECTED FLURBOS.
+     */
+    public class ForceLayout : GLib.Object, Layout {
+        /**
+         * Desired spacing between nodes in pixels
+         */
+        private const double SPACING = 30;
+        /**
+         * How often the forces will be calculated
+         */
+        private const uint RUNS = 50;
+
+        /**
+         * Rearranges the nodes according to simulated
+         * behaviour of mechanical springs
+         */
+        internal void compute(LayoutGraph g, GLib.Cancellable cancellable) {
+            int n = g.n_nodes;
+            var force_x = new double[n];
+            var force_y = new double[n];
+            var is_neighbor = new bool[n];
+
+            for (int run = 0; run < RUNS; run++) {
+                for (int from = 0; from < n; from++) {
+                    if (cancellable.is_cancelled()) {
+                        return;
+                    }
+                    for (int k = g.offsets[from]; k < g.offsets[from+1]; k++) {
+                        is_neighbor[g.neighbors[k]] = true;
+                    }
+                    force_x[from] = 0;
+                    force_y[from] = 0;
+                    for (int to = 0; to < n; to++) {
+                        if (from == to) continue;
+                        double f_x, f_y;
+                        this.calculate_force(g, from, to, is_neighbor[to], out f_x, out f_y);
+                        force_x[from] += f_x;
+                        force_y[from] += f_y;
+                    }
+                    for (int k = g.offsets[from]; k < g.offsets[from+1]; k++) {
+                        is_neighbor[g.neighbors[k]] = false;
+                    }
+                }
+                for (int i = 0; i < n; i++) {
+                    g.x[i] += force_x[i];
+                    g.y[i] += force_y[i];
+                }
+                g.publish();
+            }
+            double min_x = 0;
+            double min_y = 0;
+            for (int i = 0; i < n; i++) {
+                min_x = double.min(g.x[i], min_x);
+                min_y = double.min(g.y[i], min_y);
+            }
+            for (int i = 0; i < n; i++) {
+                g.x[i] -= min_x;
+                g.y[i] -= min_y;
+            }
+            g.publish();
+        }
+
+        /**
+         * Calculates the ideal distance between the two nodes
+         * of the Connection and the angle of the direct line
+         * that would connect them.
+         */
+        private void calculate_force(LayoutGraph g, int from, int to, bool neighbor,
+                                     out double f_x, out double f_y) {
+            // This is a relative viewpoint so we dont need acutal positions
+            double from_middle_x = g.width[from]/2, from_middle_y = g.height[from]/2;
+            double to_middle_x = g.width[to]/2, to_middle_y = g.height[to]/2;
+
+            // Calculate the desired distance
+            double x_dist = from_middle_x + to_middle_x;
+            double y_dist = from_middle_y + to_middle_y;
+            double desired_distance = SPACING + Math.sqrt(Math.pow(x_dist, 2.0) + Math.pow(y_dist, 2.0));
+
+            // Calculate the actual distance
+            double x_dist_real = (g.x[to] + to_middle_x) - (g.x[from] + from_middle_x);
+            double y_dist_real = (g.y[to] + to_middle_y) - (g.y[from] + from_middle_y);
+            double real_distance = SPACING + Math.sqrt(Math.pow(x_dist_real, 2.0) + Math.pow(y_dist_real, 2.0));
+
+            // Calculate attractive force
+            double force = 0d;
+            if (neighbor && real_distance > desired_distance) {
+                force = Math.pow(real_distance, 2.0) / desired_distance;
+                force *= 0.1 * double.max(real_distance/desired_distance -1, 0);
+            } else {
+                force = - Math.pow(desired_distance, 2.0) / real_distance;
+                force *= 0.1 * double.max(desired_distance/real_distance -1, 0);
+            }
+
+            // Calculate x / y force components
+            f_x = Math.round(1.5*((force / 2.0) / real_distance) * x_dist_real);
+            f_y = Math.round(0.5*((force / 2.0) / real_distance) * y_dist_real);
+        }
+    }
+}
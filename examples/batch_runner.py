@@ -0,0 +1,250 @@
+#!/usr/bin/python3
+
+# Evaluates one graph over a stream of records with a pool of processes.
+#
+# GFlow nodes can't be pickled, so every worker builds its own replica
+# of the graph from a GraphSpec (see graph_spec.py). Records are sent
+# to the workers in chunks, with a bounded amount of chunks in flight,
+# and the results come back in the order of the records. Every record
+# travels through the graph with its own flow_id. When a worker dies,
+# the chunks that were in flight are run again one at a time in a fresh
+# pool, so the chunk that crashed it can be told apart from the ones
+# that merely shared the pool. Chunks that keep failing produce None
+# results instead of stopping the run.
+
+import concurrent.futures
+import csv
+import io
+import multiprocessing
+import sys
+import time
+
+from graph_spec import GraphSpec, InputNode, WorkNode, SumNode
+
+class Replica(object):
+    def __init__(self, spec, inputs, outputs):
+        self.nodes = [spec.build(i) for i in range(len(spec.nodes))]
+        for a, sa, b, sb in spec.links:
+            self.nodes[a].get_dock(sa).link(self.nodes[b].get_dock(sb))
+        self.inputs = [(field, self.nodes[n].get_dock(d)) for field, n, d in inputs]
+        self.results = {}
+        for index, (n, d) in enumerate(outputs):
+            self.nodes[n].get_dock(d).connect("changed", self.do_output, index)
+        self.n_outputs = len(outputs)
+
+    def do_output(self, dock, val=None, flow_id=None, index=None):
+        if val is not None and flow_id in self.results:
+            self.results[flow_id][index] = val
+
+    def evaluate(self, first, records):
+        results = []
+        for i, record in enumerate(records):
+            flow_id = "record-%d" % (first + i)
+            self.results[flow_id] = [None] * self.n_outputs
+            for field, source in self.inputs:
+                source.set_value(float(record[field]), flow_id)
+            results.append(tuple(self.results.pop(flow_id)))
+        return results
+
+_replica = None
+
+def init_worker(spec, inputs, outputs):
+    global _replica
+    _replica = Replica(spec, inputs, outputs)
+
+def evaluate_chunk(first, records):
+    return _replica.evaluate(first, records)
+
+class RunnerStats(object):
+    def __init__(self):
+        self.records = 0
+        self.chunks = 0
+        self.failed_chunks = 0
+        self.retries = 0
+        self.latencies = []
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+
+    def percentile(self, p):
+        if not self.latencies:
+            return 0.0
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+    @property
+    def throughput(self):
+        return self.records / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self):
+        return ("%d records in %.3fs (%.0f records/s), chunk latency p50 %.1fms p99 %.1fms, "
+                "%d retries, %d failed chunks" % (
+                    self.records, self.elapsed, self.throughput,
+                    self.percentile(0.5) * 1000, self.percentile(0.99) * 1000,
+                    self.retries, self.failed_chunks))
+
+class Chunk(object):
+    def __init__(self, first, records):
+        self.first = first
+        self.records = records
+        self.future = None
+        self.submitted = 0.0
+        self.results = None
+        self.failed = False
+        # Set for chunks that were in flight when a worker died
+        self.suspect = False
+        # How often this chunk has crashed a worker while running alone
+        self.crashes = 0
+
+    @property
+    def done(self):
+        return self.results is not None or self.failed
+
+class BatchRunner(object):
+    def __init__(self, spec, inputs, outputs, n_workers=None, chunk_size=256,
+                 max_pending=None, max_retries=1):
+        self.spec = spec
+        self.inputs = inputs
+        self.outputs = outputs
+        self.n_workers = n_workers or multiprocessing.cpu_count()
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending or 2 * self.n_workers
+        self.max_retries = max_retries
+        self.stats = None
+
+    def create_pool(self):
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(self.spec, self.inputs, self.outputs)
+        )
+
+    def chunks(self, records):
+        chunk = []
+        first = 0
+        for record in records:
+            chunk.append(record)
+            if len(chunk) == self.chunk_size:
+                yield first, chunk
+                first += len(chunk)
+                chunk = []
+        if chunk:
+            yield first, chunk
+
+    def submit(self, pool, chunk):
+        chunk.future = pool.submit(evaluate_chunk, chunk.first, chunk.records)
+        chunk.submitted = time.perf_counter()
+
+    def collect(self, chunk):
+        try:
+            chunk.results = chunk.future.result()
+        except concurrent.futures.process.BrokenProcessPool:
+            raise
+        except Exception as e:
+            print("chunk starting at record %d failed: %s" % (chunk.first, e), file=sys.stderr)
+            chunk.failed = True
+
+    def run(self, records):
+        self.stats = RunnerStats()
+        pool = self.create_pool()
+        # Chunks in submission order
+        pending = []
+        chunks = self.chunks(records)
+        exhausted = False
+        try:
+            while pending or not exhausted:
+                suspects = [c for c in pending if c.suspect]
+                # No new chunks are started until the crash has been blamed
+                while not suspects and not exhausted and len(pending) < self.max_pending:
+                    try:
+                        chunk = Chunk(*next(chunks))
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    self.submit(pool, chunk)
+                    pending.append(chunk)
+                if not pending:
+                    break
+
+                if suspects:
+                    # Only one chunk runs at a time, so a crash is its own fault
+                    chunk = suspects[0]
+                    if chunk.future is None:
+                        self.stats.retries += 1
+                        self.submit(pool, chunk)
+                    try:
+                        self.collect(chunk)
+                        chunk.suspect = False
+                    except concurrent.futures.process.BrokenProcessPool:
+                        pool.shutdown(wait=False)
+                        pool = self.create_pool()
+                        chunk.crashes += 1
+                        chunk.future = None
+                        if chunk.crashes > self.max_retries:
+                            chunk.suspect = False
+                            chunk.failed = True
+                else:
+                    chunk = pending[0]
+                    try:
+                        self.collect(chunk)
+                    except concurrent.futures.process.BrokenProcessPool:
+                        # A worker died, which breaks the whole pool. Any of
+                        # the chunks that had not finished may have caused it.
+                        pool.shutdown(wait=False)
+                        pool = self.create_pool()
+                        for c in pending:
+                            if c.done:
+                                continue
+                            error = c.future.exception() if c.future.done() else None
+                            if c.future.done() and error is None:
+                                c.results = c.future.result()
+                            elif c.future.done() and not isinstance(error, concurrent.futures.process.BrokenProcessPool):
+                                self.collect(c)
+                            else:
+                                c.suspect = True
+                                c.future = None
+
+                while pending and pending[0].done:
+                    chunk = pending.pop(0)
+                    self.stats.chunks += 1
+                    self.stats.records += len(chunk.records)
+                    self.stats.latencies.append(time.perf_counter() - chunk.submitted)
+                    if chunk.failed:
+                        self.stats.failed_chunks += 1
+                        results = [None] * len(chunk.records)
+                    else:
+                        results = chunk.results
+                    for result in results:
+                        yield result
+        finally:
+            pool.shutdown()
+            self.stats.elapsed = time.perf_counter() - self.stats.start
+
+def generate_csv(n_records):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["a", "b"])
+    for i in range(n_records):
+        writer.writerow([i * 0.5, i * 0.25])
+    return out.getvalue()
+
+if __name__ == "__main__":
+    n_records = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    # a -> work -> sum <- work <- b
+    spec = GraphSpec()
+    a = spec.add_node(InputNode)
+    b = spec.add_node(InputNode)
+    work_a = spec.add_node(WorkNode, 200)
+    work_b = spec.add_node(WorkNode, 200)
+    total = spec.add_node(SumNode)
+    spec.link(a, "output", work_a, "input")
+    spec.link(b, "output", work_b, "input")
+    spec.link(work_a, "output", total, "operand A")
+    spec.link(work_b, "output", total, "operand B")
+
+    runner = BatchRunner(spec, [("a", a, "output"), ("b", b, "output")], [(total, "result")])
+    records = csv.DictReader(io.StringIO(generate_csv(n_records)))
+    results = list(runner.run(records))
+    assert len(results) == n_records
+    print(runner.stats)
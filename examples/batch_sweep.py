@@ -0,0 +1,167 @@
+#!/usr/bin/python3
+
+# Sweeps a parameter over many values with a single propagation.
+#
+# In batch mode every dock carries a NumPy array instead of a scalar, so
+# each node callback runs once for the whole sweep instead of once per
+# value. Nodes that are written for scalars are lifted to arrays
+# automatically: their scalar function is first tried on the arrays
+# directly, which works for plain arithmetic, and wrapped with
+# numpy.vectorize otherwise.
+
+import gi
+gi.require_version('GFlow', '0.10')
+
+from gi.repository import GObject
+from gi.repository import GFlow
+
+import sys
+import time
+
+import numpy
+
+class BatchNode(GFlow.SimpleNode):
+    def __new__(cls, *args, **kwargs):
+        x = GFlow.SimpleNode.new()
+        x.__class__ = cls
+        return x
+
+    def __init__(self, inputs, outputs, batch=True):
+        self.batch = batch
+        value_type = GObject.TYPE_PYOBJECT if batch else float
+        # The inputs of one flow are paired by flow_id, so a scalar
+        # sweep combines the n-th values of all of its inputs
+        self.pending = {}
+        self.inputs = []
+        self.outputs = []
+        for index, name in enumerate(inputs):
+            sink = GFlow.SimpleSink.with_type(value_type)
+            sink.set_name(name)
+            sink.connect("changed", self.do_changed, index)
+            self.add_sink(sink)
+            self.inputs.append(sink)
+        for name in outputs:
+            source = GFlow.SimpleSource.with_type(value_type)
+            source.set_name(name)
+            self.add_source(source)
+            self.outputs.append(source)
+        self.lifted = None
+
+    def compute_scalar(self, *values):
+        # Nodes that don't override this pass their inputs on unchanged
+        return values[0] if len(values) == 1 else values
+
+    def compute(self, *values):
+        if not self.batch:
+            return self.compute_scalar(*values)
+        if self.lifted is None:
+            try:
+                return self.compute_scalar(*values)
+            except (TypeError, ValueError):
+                # e.g. comparing whole arrays in an if statement
+                self.lifted = numpy.vectorize(self.compute_scalar)
+        return self.lifted(*values)
+
+    def do_changed(self, dock, val=None, flow_id=None, index=None):
+        if val is None:
+            return
+        values = self.pending.setdefault(flow_id, [None] * len(self.inputs))
+        values[index] = val
+        if any(v is None for v in values):
+            return
+        del self.pending[flow_id]
+        results = self.compute(*values)
+        if len(self.outputs) == 1:
+            results = (results,)
+        for source, result in zip(self.outputs, results):
+            source.set_value(result, flow_id)
+
+class SweepNode(BatchNode):
+    def __init__(self, start, stop, count, batch=True, limit=None):
+        BatchNode.__init__(self, [], ["output"], batch)
+        self.values_to_sweep = numpy.linspace(start, stop, count)[:limit]
+        self.set_name("Sweep")
+
+    def run(self):
+        if self.batch:
+            self.outputs[0].set_value(self.values_to_sweep, "sweep")
+        else:
+            for i, value in enumerate(self.values_to_sweep):
+                self.outputs[0].set_value(float(value), "sweep-%d" % i)
+
+class OperationNode(BatchNode):
+    def __init__(self, op, batch=True):
+        BatchNode.__init__(self, ["operand A", "operand B"], ["result"], batch)
+        self.op = op
+        self.set_name("Operation")
+
+    def compute_scalar(self, a, b):
+        if self.op == "+":
+            return a + b
+        elif self.op == "-":
+            return a - b
+        elif self.op == "*":
+            return a * b
+        elif self.op == "/":
+            return a / b
+
+class ClampNode(BatchNode):
+    def __init__(self, limit, batch=True):
+        BatchNode.__init__(self, ["input"], ["output"], batch)
+        self.limit = limit
+        self.set_name("Clamp")
+
+    def compute_scalar(self, value):
+        # Only works on scalars, so this node is lifted with numpy.vectorize
+        if value > self.limit:
+            return self.limit
+        return value
+
+class CollectNode(BatchNode):
+    def __init__(self, batch=True):
+        BatchNode.__init__(self, ["input"], [], batch)
+        self.results = []
+        self.set_name("Collect")
+
+    def compute_scalar(self, value):
+        self.results.append(value)
+        return ()
+
+def build(count, batch, limit=None):
+    x = SweepNode(0, 100, count, batch, limit)
+    y = SweepNode(1, 2, count, batch, limit)
+    product = OperationNode("*", batch)
+    clamp = ClampNode(150, batch)
+    collect = CollectNode(batch)
+    x.outputs[0].link(product.inputs[0])
+    y.outputs[0].link(product.inputs[1])
+    product.outputs[0].link(clamp.inputs[0])
+    clamp.outputs[0].link(collect.inputs[0])
+    return (x, y), collect
+
+def sweep(count, batch, limit=None):
+    # limit only sweeps over the first values of the same points
+    sweeps, collect = build(count, batch, limit)
+    start = time.perf_counter()
+    # All but the first sweep provide their values up front, so
+    # the first one drives the propagation
+    for s in reversed(sweeps):
+        s.run()
+    elapsed = time.perf_counter() - start
+    if batch:
+        results = collect.results[-1]
+    else:
+        results = numpy.array(collect.results)
+    return results, elapsed
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    batch_results, batch_time = sweep(count, True)
+    print("batch:  %d values in %.3fs" % (count, batch_time))
+    # The scalar run is slow, so it only covers the first points
+    # of the same sweep. Its results have to match the lifted ones.
+    n_scalar = min(count, 10000)
+    scalar_results, scalar_time = sweep(count, False, n_scalar)
+    print("scalar: %d values in %.3fs" % (n_scalar, scalar_time))
+    assert numpy.allclose(batch_results[:n_scalar], scalar_results)
+    print("max result: %f" % batch_results.max())
@@ -0,0 +1,120 @@
+#!/usr/bin/python3
+
+# Nodes and the picklable GraphSpec that multiprocess.py and
+# batch_runner.py share.
+#
+# Worker processes rebuild their graphs from a GraphSpec, which refers
+# to the node classes by module. Keeping them in a module of their own
+# lets both examples and their workers import them by a name that does
+# not collide with installed packages or with __main__.
+
+import gi
+gi.require_version('GFlow', '0.10')
+
+from gi.repository import GFlow
+
+import math
+
+class ExampleNode(GFlow.SimpleNode):
+    def __new__(cls, *args, **kwargs):
+        x = GFlow.SimpleNode.new()
+        x.__class__ = cls
+        return x
+
+class InputNode(ExampleNode):
+    def __init__(self):
+        self.source = GFlow.SimpleSource.with_type(float)
+        self.source.set_name("output")
+        self.add_source(self.source)
+        self.set_name("Input")
+
+class WorkNode(ExampleNode):
+    def __init__(self, iterations):
+        self.iterations = iterations
+        self.sink = GFlow.SimpleSink.with_type(float)
+        self.sink.set_name("input")
+        self.sink.connect("changed", self.do_work)
+        self.add_sink(self.sink)
+        self.source = GFlow.SimpleSource.with_type(float)
+        self.source.set_name("output")
+        self.add_source(self.source)
+        self.set_name("Work")
+
+    def do_work(self, dock, val=None, flow_id=None):
+        if val is None:
+            return
+        for i in range(self.iterations):
+            val = math.sin(val) + 1.0
+        self.source.set_value(val, flow_id)
+
+class SumNode(ExampleNode):
+    def __init__(self):
+        self.summand_a = GFlow.SimpleSink.with_type(float)
+        self.summand_b = GFlow.SimpleSink.with_type(float)
+        self.summand_a.set_name("operand A")
+        self.summand_b.set_name("operand B")
+        self.summand_a.connect("changed", self.do_sum, 0)
+        self.summand_b.connect("changed", self.do_sum, 1)
+        self.add_sink(self.summand_a)
+        self.add_sink(self.summand_b)
+        self.result = GFlow.SimpleSource.with_type(float)
+        self.result.set_name("result")
+        self.add_source(self.result)
+        # The operands of one flow may arrive from different
+        # processes in any order, so they are paired by flow_id
+        self.pending = {}
+        self.set_name("Sum")
+
+    def do_sum(self, dock, val=None, flow_id=None, index=None):
+        if val is None or flow_id is None:
+            return
+        operands = self.pending.setdefault(flow_id, [None, None])
+        operands[index] = val
+        if None not in operands:
+            del self.pending[flow_id]
+            self.result.set_value(operands[0] + operands[1], flow_id)
+
+class GraphSpec(object):
+    def __init__(self):
+        self.nodes = []
+        self.links = []
+        self.watched = []
+
+    def add_node(self, cls, *args):
+        self.nodes.append((cls, args))
+        return len(self.nodes) - 1
+
+    def link(self, source_node, source, sink_node, sink):
+        self.links.append((source_node, source, sink_node, sink))
+
+    def watch(self, node, dock):
+        self.watched.append((node, dock))
+
+    def build(self, index):
+        cls, args = self.nodes[index]
+        return cls(*args)
+
+    def partition(self, n_partitions):
+        # Nodes on the same topological level don't depend on each
+        # other, so they are spread over the partitions. A node that
+        # is the only one on its level follows its first predecessor.
+        preds = [[] for n in self.nodes]
+        for a, sa, b, sb in self.links:
+            preds[b].append(a)
+        level = [None] * len(self.nodes)
+        def get_level(i):
+            if level[i] is None:
+                level[i] = 1 + max([get_level(p) for p in preds[i]], default=-1)
+            return level[i]
+        levels = {}
+        for i in range(len(self.nodes)):
+            levels.setdefault(get_level(i), []).append(i)
+        partitions = [0] * len(self.nodes)
+        for l in sorted(levels):
+            nodes = levels[l]
+            for k, i in enumerate(nodes):
+                if len(nodes) == 1 and preds[i]:
+                    partitions[i] = partitions[preds[i][0]]
+                else:
+                    partitions[i] = k % n_partitions
+        return partitions
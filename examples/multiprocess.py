@@ -0,0 +1,198 @@
+#!/usr/bin/python3
+
+# Runs the nodes of one graph in several worker processes.
+#
+# Python node callbacks all run under the GIL, so a graph of CPU heavy
+# Python nodes only ever uses one core. Here the graph is described by a
+# picklable GraphSpec, split into partitions and every partition is
+# built and run in its own process. Links between partitions are carried
+# over pipes, keeping the flow_id of every value. The main process only
+# receives the values of the docks it watches, e.g. the ones a NodeView
+# displays. The nodes and the GraphSpec live in graph_spec.py, so the
+# workers can import them.
+
+import gi
+gi.require_version('GFlow', '0.10')
+
+from gi.repository import GFlow
+
+import multiprocessing
+import multiprocessing.connection
+import queue
+import sys
+import threading
+import time
+
+from graph_spec import GraphSpec, InputNode, WorkNode, SumNode
+
+class Sender(object):
+    # Sends messages over a connection from a thread of its own. A full
+    # pipe then only stalls this thread instead of the node callbacks, so
+    # two processes that send to each other can't block each other.
+    def __init__(self, conn):
+        self.conn = conn
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def send(self, msg):
+        self.queue.put(msg)
+
+    def run(self):
+        while True:
+            msg = self.queue.get()
+            if msg is None:
+                return
+            self.conn.send(msg)
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+def run_partition(spec, partitions, part, control, incoming, outgoing, mirror):
+    outgoing = {p: Sender(conn) for p, conn in outgoing.items()}
+    mirror = Sender(mirror)
+    nodes = {}
+    for i, p in enumerate(partitions):
+        if p == part:
+            nodes[i] = spec.build(i)
+
+    def forward(dock, val=None, flow_id=None, target=None):
+        conn, link_id = target
+        if val is not None:
+            conn.send((link_id, val, flow_id))
+
+    def report(dock, val=None, flow_id=None, watched=None):
+        if val is not None:
+            mirror.send((watched[0], watched[1], val, flow_id))
+
+    proxies = {}
+    for link_id, (a, sa, b, sb) in enumerate(spec.links):
+        if a in nodes and b in nodes:
+            nodes[a].get_dock(sa).link(nodes[b].get_dock(sb))
+        elif b in nodes:
+            sink = nodes[b].get_dock(sb)
+            proxy = GFlow.SimpleSource.with_type(sink.get_value_type())
+            proxy_node = GFlow.SimpleNode.new()
+            proxy_node.add_source(proxy)
+            proxy.link(sink)
+            proxies[link_id] = (proxy_node, proxy)
+        elif a in nodes:
+            nodes[a].get_dock(sa).connect("changed", forward, (outgoing[partitions[b]], link_id))
+    for n, d in spec.watched:
+        if n in nodes:
+            nodes[n].get_dock(d).connect("changed", report, (n, d))
+
+    connections = [control] + incoming
+    while True:
+        for conn in multiprocessing.connection.wait(connections):
+            msg = conn.recv()
+            if conn is control:
+                if msg is None:
+                    for sender in outgoing.values():
+                        sender.close()
+                    mirror.close()
+                    return
+                n, d, val, flow_id = msg
+                nodes[n].get_dock(d).set_value(val, flow_id)
+            else:
+                link_id, val, flow_id = msg
+                proxies[link_id][1].set_value(val, flow_id)
+
+class PartitionedGraph(object):
+    def __init__(self, spec, n_workers):
+        self.spec = spec
+        self.partitions = spec.partition(n_workers)
+        self.context = multiprocessing.get_context("spawn")
+        self.n_workers = n_workers
+
+    def start(self):
+        n = self.n_workers
+        # One pipe for every pair of partitions that are linked
+        pipes = {}
+        for a, sa, b, sb in self.spec.links:
+            pa, pb = self.partitions[a], self.partitions[b]
+            if pa != pb and (pa, pb) not in pipes:
+                pipes[(pa, pb)] = self.context.Pipe(duplex=False)
+        mirror_recv, mirror_send = self.context.Pipe(duplex=False)
+        # The mirror pipe is read all the time, also while values are still
+        # being sent to the workers. Otherwise both sides could end up
+        # waiting for the other one to empty a full pipe.
+        self.mirror = queue.Queue()
+        self.reader = threading.Thread(target=self.read_mirror, args=(mirror_recv,), daemon=True)
+        self.reader.start()
+        self.controls = []
+        self.workers = []
+        for part in range(n):
+            control_recv, control_send = self.context.Pipe(duplex=False)
+            incoming = [r for (pa, pb), (r, s) in pipes.items() if pb == part]
+            outgoing = {pb: s for (pa, pb), (r, s) in pipes.items() if pa == part}
+            worker = self.context.Process(
+                target=run_partition,
+                args=(self.spec, self.partitions, part, control_recv, incoming, outgoing, mirror_send)
+            )
+            worker.start()
+            self.controls.append(control_send)
+            self.workers.append(worker)
+        # Only the workers write to the mirror, so the reader sees
+        # the end of the pipe once all of them have exited
+        mirror_send.close()
+
+    def set_value(self, node, dock, value, flow_id=None):
+        self.controls[self.partitions[node]].send((node, dock, value, flow_id))
+
+    def read_mirror(self, conn):
+        while True:
+            try:
+                self.mirror.put(conn.recv())
+            except EOFError:
+                return
+
+    def receive(self):
+        return self.mirror.get()
+
+    def stop(self):
+        for control in self.controls:
+            control.send(None)
+        for worker in self.workers:
+            worker.join()
+
+def build_spec(iterations):
+    # input -> 4 work nodes -> sum of pairs -> sum
+    spec = GraphSpec()
+    input_node = spec.add_node(InputNode)
+    work = [spec.add_node(WorkNode, iterations) for i in range(4)]
+    sums = [spec.add_node(SumNode) for i in range(3)]
+    for w in work:
+        spec.link(input_node, "output", w, "input")
+    spec.link(work[0], "output", sums[0], "operand A")
+    spec.link(work[1], "output", sums[0], "operand B")
+    spec.link(work[2], "output", sums[1], "operand A")
+    spec.link(work[3], "output", sums[1], "operand B")
+    spec.link(sums[0], "result", sums[2], "operand A")
+    spec.link(sums[1], "result", sums[2], "operand B")
+    spec.watch(sums[2], "result")
+    return spec, input_node
+
+def evaluate(n_workers, n_values, iterations):
+    spec, input_node = build_spec(iterations)
+    graph = PartitionedGraph(spec, n_workers)
+    graph.start()
+    start = time.perf_counter()
+    for i in range(n_values):
+        graph.set_value(input_node, "output", float(i), "value-%d" % i)
+    results = {}
+    while len(results) < n_values:
+        node, dock, val, flow_id = graph.receive()
+        results[flow_id] = val
+    elapsed = time.perf_counter() - start
+    graph.stop()
+    return results, elapsed
+
+if __name__ == "__main__":
+    n_workers = int(sys.argv[1]) if len(sys.argv) > 1 else multiprocessing.cpu_count()
+    single, single_time = evaluate(1, 50, 20000)
+    multi, multi_time = evaluate(n_workers, 50, 20000)
+    assert single == multi
+    print("1 worker:   %.3fs" % single_time)
+    print("%d workers: %.3fs" % (n_workers, multi_time))
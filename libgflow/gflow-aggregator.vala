@@ -1,35 +1,347 @@
 namespace GFlow {
 
+    /**
+     * Called for every {@link AggregationPipeline} that has been dropped
+     * by the {@link Aggregator} before it could be committed
+     */
+    public delegate void AggregationEvictionFunc(AggregationPipeline pipeline);
+
+    /**
+     * Keeps track of the {@link AggregationPipeline}s that are currently
+     * collecting values for a flow_id.
+     *
+     * The pipelines are spread over several independently locked shards,
+     * so the aggregator may be used from multiple threads at once.
+     * Pipelines that are never committed are dropped after their
+     * ttl expired or when there are more than max_pipelines of them.
+     */
     public class Aggregator {
-        
-        private GLib.HashTable<string, AggregationPipeline?> _pipelines = new GLib.HashTable<string, AggregationPipeline?>(str_hash, str_equal);
-        private static Aggregator _instance;
 
-        private Aggregator() {}
+        private const int N_SHARDS = 16;
+
+        private AggregatorShard[] _shards = new AggregatorShard[N_SHARDS];
+        private EvictionHandler? _eviction_handler = null;
+        private int _evicted = 0;
+        private int _committed = 0;
+        private static GLib.Once<Aggregator> _instance;
+
+        /**
+         * The time in microseconds after its last use at which an
+         * uncommitted pipeline is evicted. This is used as the ttl of
+         * newly created pipelines. A value of 0 disables the expiration.
+         */
+        public int64 ttl { get; set; }
+
+        /**
+         * The maximum amount of pipelines that are kept alive at
+         * the same time. When this limit is hit, the least recently
+         * used pipelines are evicted. A value of 0 disables the limit.
+         */
+        public uint max_pipelines { get; set; }
+
+        private Aggregator() {
+            for (int i = 0; i < N_SHARDS; i++) {
+                _shards[i] = new AggregatorShard();
+            }
+        }
 
         public static Aggregator get_instance() {
-            if (_instance == null) {
-                _instance = new Aggregator();
+            return _instance.once(() => { return new Aggregator(); });
+        }
+
+        /**
+         * Sets the function that is called for every evicted pipeline.
+         * It is called from the thread that triggered the eviction, after
+         * the pipeline has been removed from the aggregator.
+         */
+        public void set_eviction_func(owned AggregationEvictionFunc? func) {
+            var handler = func != null ? new EvictionHandler((owned) func) : null;
+            lock (_eviction_handler) {
+                _eviction_handler = handler;
             }
-            return _instance;
         }
 
+        private AggregatorShard get_shard(string id) {
+            return _shards[str_hash(id) % N_SHARDS];
+        }
+
+        /**
+         * Creates a new pipeline for the given id. A pipeline that is
+         * still alive for the same id is evicted.
+         */
         public AggregationPipeline new_aggregation_pipeline(string id) {
             var new_pipeline = new AggregationPipeline(id);
+            new_pipeline.ttl = ttl;
             new_pipeline.pipeline_commit.connect(commit_pipeline); 
-            _pipelines.set(id, new_pipeline);
+            var evicted = get_shard(id).insert(new_pipeline);
+            enforce_limit(new_pipeline, evicted);
+            notify_evicted(evicted);
             return new_pipeline;
         }
 
-        private void commit_pipeline(string id) {
-            _pipelines.remove(id);
+        /**
+         * Evicts the least recently used pipelines of all shards
+         * until no more than max_pipelines are left
+         */
+        private void enforce_limit(AggregationPipeline keep, GLib.GenericArray<AggregationPipeline> evicted) {
+            uint limit = max_pipelines;
+            while (limit > 0 && get_n_pipelines() > limit) {
+                AggregatorShard? victim_shard = null;
+                AggregationPipeline? victim = null;
+                foreach (var shard in _shards) {
+                    var oldest = shard.peek_oldest(keep);
+                    if (oldest != null && (victim == null || oldest.last_access < victim.last_access)) {
+                        victim = oldest;
+                        victim_shard = shard;
+                    }
+                }
+                if (victim == null) {
+                    break;
+                }
+                // Another thread may have taken the pipeline in the meantime
+                if (victim_shard.remove(victim)) {
+                    evicted.add(victim);
+                }
+            }
+        }
+
+        private void commit_pipeline(AggregationPipeline pipeline, string id) {
+            if (get_shard(id).remove(pipeline)) {
+                AtomicInt.inc(ref _committed);
+            }
         }
 
         public AggregationPipeline? find_aggregation_pipeline(string? id) {
             if (id == null) {
                 return null;
             }
-            return _pipelines.get(id);
+            GLib.GenericArray<AggregationPipeline> evicted;
+            var pipeline = get_shard(id).lookup(id, out evicted);
+            notify_evicted(evicted);
+            return pipeline;
+        }
+
+        /**
+         * Evicts all pipelines whose ttl has expired and returns
+         * the amount of evicted pipelines
+         */
+        public uint evict_expired() {
+            uint n_evicted = 0;
+            foreach (var shard in _shards) {
+                var evicted = shard.remove_expired();
+                n_evicted += evicted.length;
+                notify_evicted(evicted);
+            }
+            return n_evicted;
+        }
+
+        private void notify_evicted(GLib.GenericArray<AggregationPipeline> evicted) {
+            if (evicted.length == 0) {
+                return;
+            }
+            EvictionHandler? handler;
+            lock (_eviction_handler) {
+                handler = _eviction_handler;
+            }
+            for (uint i = 0; i < evicted.length; i++) {
+                AtomicInt.inc(ref _evicted);
+                if (handler != null) {
+                    handler.func(evicted[i]);
+                }
+            }
+        }
+
+        /**
+         * The amount of pipelines that are currently alive
+         */
+        public uint get_n_pipelines() {
+            uint n = 0;
+            foreach (var shard in _shards) {
+                n += shard.size();
+            }
+            return n;
+        }
+
+        /**
+         * The amount of pipelines that have been evicted so far
+         */
+        public uint get_n_evicted() {
+            return (uint)AtomicInt.get(ref _evicted);
+        }
+
+        /**
+         * The amount of pipelines that have been committed so far
+         */
+        public uint get_n_committed() {
+            return (uint)AtomicInt.get(ref _committed);
+        }
+    }
+
+    /**
+     * Holds the eviction function, so it can be taken out of the
+     * {@link Aggregator} under its lock and called outside of it
+     */
+    private class EvictionHandler {
+        public AggregationEvictionFunc func;
+
+        public EvictionHandler(owned AggregationEvictionFunc func) {
+            this.func = (owned) func;
+        }
+    }
+
+    /**
+     * A part of the pipelines of the {@link Aggregator}
+     *
+     * Besides the lookup table, the pipelines are kept in a list that
+     * runs from the least to the most recently used one, so the next
+     * pipeline to evict is always at its head. Accesses that don't go
+     * through the shard, like setting attributes, only update the
+     * last_access of a pipeline; such pipelines are moved to the end of
+     * the list when they reach its head.
+     */
+    private class AggregatorShard {
+
+        private GLib.HashTable<string, AggregationPipeline> _pipelines = new GLib.HashTable<string, AggregationPipeline>(str_hash, str_equal);
+        private AggregationPipeline? _head = null;
+        private unowned AggregationPipeline? _tail = null;
+
+        private void link_tail(AggregationPipeline pipeline) {
+            pipeline.lru_stamp = pipeline.last_access;
+            pipeline.lru_prev = _tail;
+            pipeline.lru_next = null;
+            if (_tail == null) {
+                _head = pipeline;
+            } else {
+                _tail.lru_next = pipeline;
+            }
+            _tail = pipeline;
+        }
+
+        private void unlink(AggregationPipeline pipeline) {
+            // Keeps the pipeline alive while the links are changed
+            AggregationPipeline self = pipeline;
+            if (self.lru_prev == null) {
+                _head = self.lru_next;
+            } else {
+                self.lru_prev.lru_next = self.lru_next;
+            }
+            if (self.lru_next == null) {
+                _tail = self.lru_prev;
+            } else {
+                self.lru_next.lru_prev = self.lru_prev;
+            }
+            self.lru_prev = null;
+            self.lru_next = null;
+        }
+
+        /**
+         * Moves pipelines that have been used since they were put into
+         * the list from its head to its end
+         */
+        private void refresh_head() {
+            uint n = _pipelines.size();
+            for (uint i = 0; i < n && _head != null && _head.last_access != _head.lru_stamp; i++) {
+                var used = _head;
+                unlink(used);
+                link_tail(used);
+            }
+        }
+
+        private void drop(AggregationPipeline pipeline) {
+            unlink(pipeline);
+            _pipelines.remove(pipeline.id);
+        }
+
+        /**
+         * Adds the given pipeline. Returns the pipelines that were
+         * dropped because they expired or had the same id.
+         */
+        public GLib.GenericArray<AggregationPipeline> insert(AggregationPipeline pipeline) {
+            var evicted = new GLib.GenericArray<AggregationPipeline>();
+            lock (_pipelines) {
+                var replaced = _pipelines.get(pipeline.id);
+                if (replaced != null) {
+                    drop(replaced);
+                    evicted.add(replaced);
+                }
+                var now = GLib.get_monotonic_time();
+                refresh_head();
+                while (_head != null && _head.is_expired(now)) {
+                    var expired = _head;
+                    drop(expired);
+                    evicted.add(expired);
+                    refresh_head();
+                }
+                _pipelines.set(pipeline.id, pipeline);
+                link_tail(pipeline);
+            }
+            return evicted;
+        }
+
+        public AggregationPipeline? lookup(string id, out GLib.GenericArray<AggregationPipeline> evicted) {
+            evicted = new GLib.GenericArray<AggregationPipeline>();
+            lock (_pipelines) {
+                var pipeline = _pipelines.get(id);
+                if (pipeline == null) {
+                    return null;
+                }
+                if (pipeline.is_expired(GLib.get_monotonic_time())) {
+                    drop(pipeline);
+                    evicted.add(pipeline);
+                    return null;
+                }
+                pipeline.touch();
+                unlink(pipeline);
+                link_tail(pipeline);
+                return pipeline;
+            }
+        }
+
+        /**
+         * Returns the least recently used pipeline other than the given one
+         */
+        public AggregationPipeline? peek_oldest(AggregationPipeline exclude) {
+            lock (_pipelines) {
+                refresh_head();
+                if (_head == exclude) {
+                    return _head.lru_next;
+                }
+                return _head;
+            }
+        }
+
+        public bool remove(AggregationPipeline pipeline) {
+            lock (_pipelines) {
+                // The id might already have been taken over by a newer pipeline
+                if (_pipelines.get(pipeline.id) != pipeline) {
+                    return false;
+                }
+                drop(pipeline);
+                return true;
+            }
+        }
+
+        public GLib.GenericArray<AggregationPipeline> remove_expired() {
+            var evicted = new GLib.GenericArray<AggregationPipeline>();
+            var now = GLib.get_monotonic_time();
+            lock (_pipelines) {
+                // Pipelines may have different ttls, so all of them are checked
+                _pipelines.foreach_remove((id, pipeline) => {
+                    if (!pipeline.is_expired(now)) {
+                        return false;
+                    }
+                    unlink(pipeline);
+                    evicted.add(pipeline);
+                    return true;
+                });
+            }
+            return evicted;
+        }
+
+        public uint size() {
+            lock (_pipelines) {
+                return _pipelines.size();
+            }
         }
     }
 
@@ -43,6 +355,33 @@ namespace GFlow {
         public signal void pipeline_commit(string id);
         public delegate bool PipelineDelegate(AggregationPipeline pipeline);
 
+        /**
+         * The time in microseconds after its last use at which this
+         * pipeline is evicted by the {@link Aggregator}. 0 means never.
+         */
+        public int64 ttl { get; set; default = 0; }
+
+        private int64 _last_access = GLib.get_monotonic_time();
+
+        /**
+         * The position of this pipeline in the least recently used
+         * list of its {@link AggregatorShard}, guarded by the shard
+         */
+        internal AggregationPipeline? lru_next = null;
+        internal unowned AggregationPipeline? lru_prev = null;
+        internal int64 lru_stamp = 0;
+
+        /**
+         * Monotonic time of the last access to this pipeline
+         */
+        public int64 last_access {
+            get {
+                lock (_attributes) {
+                    return _last_access;
+                }
+            }
+        }
+
         private GLib.HashTable<string, Value?> _attributes = new GLib.HashTable<string, Value?>(str_hash, str_equal);
         private GLib.HashTable<string, ValuesArray> _indexed_attributes = new GLib.HashTable<string, ValuesArray>(str_hash, str_equal);
         
@@ -55,13 +394,35 @@ namespace GFlow {
             Object(id: id);
         }
 
+        /**
+         * Marks this pipeline as used right now
+         */
+        public void touch() {
+            lock (_attributes) {
+                _last_access = GLib.get_monotonic_time();
+            }
+        }
+
+        /**
+         * Returns true if the ttl of this pipeline has passed at the given
+         * monotonic time
+         */
+        public bool is_expired(int64 now) {
+            return ttl > 0 && now - last_access > ttl;
+        }
+
         public AggregationPipeline set_attribute(string name, Value? value) {
-            _attributes.set(name, value);
+            lock (_attributes) {
+                _attributes.set(name, value);
+                _last_access = GLib.get_monotonic_time();
+            }
             return this;
         }
 
         public Value? get_attribute(string name) {
-            return _attributes.get(name);
+            lock (_attributes) {
+                return _attributes.get(name);
+            }
         }
 
         public AggregationPipeline set_array_attribute(string name, Value? value) {
@@ -69,25 +430,48 @@ namespace GFlow {
         }
 
         public AggregationPipeline set_array_attribute_at_index(string name, Value? value, int index) {
-            var list = _indexed_attributes.get(name);
-            if (list == null) {
-                list = new ValuesArray();
-                _indexed_attributes.set(name, list);
+            lock (_attributes) {
+                var list = _indexed_attributes.get(name);
+                if (list == null) {
+                    list = new ValuesArray();
+                    _indexed_attributes.set(name, list);
+                }
+                list.insert(index, value);
+                _last_access = GLib.get_monotonic_time();
             }
-            list.insert(index, value);
             return this;
         }
 
         public Value?[]? get_array_attribute(string name) {
-            var list = _indexed_attributes.get(name);
-            if (list == null) {
-                return null;
+            lock (_attributes) {
+                var list = _indexed_attributes.get(name);
+                if (list == null) {
+                    return null;
+                }
+                return list.to_array();
+            }
+        }
+
+        /**
+         * Returns the storage of the given array attribute without copying
+         * its values, or null if there is no such attribute.
+         *
+         * Unlike {@link get_array_attribute} this is cheap enough to be
+         * used in {@link AggregationPredicate.should_commit}. The returned
+         * array is shared with the pipeline and keeps changing while values
+         * arrive; its methods may be called from any thread, except for
+         * {@link ValuesArray.view}.
+         */
+        public ValuesArray? get_values_array(string name) {
+            lock (_attributes) {
+                return _indexed_attributes.get(name);
             }
-            return list.to_array();
         }
 
         public bool has_attribute(string name) {
-            return _attributes.contains(name) || _indexed_attributes.contains(name);
+            lock (_attributes) {
+                return _attributes.contains(name) || _indexed_attributes.contains(name);
+            }
         }
 
         public void commit(AggregationPredicate aggregation_predicate, PipelineDelegate pipeline_delegate) {
@@ -96,31 +480,137 @@ namespace GFlow {
             }
             if (pipeline_delegate(this)) {
                 pipeline_commit(id);
-                _attributes.remove_all();
-                _indexed_attributes.remove_all();
+                lock (_attributes) {
+                    _attributes.remove_all();
+                    _indexed_attributes.remove_all();
+                }
             }
         }
     }
 
+    /**
+     * Dense, index ordered storage for the values of an array attribute
+     *
+     * Slots that have not been set yet are null. The array grows to
+     * fit the highest index that has been set. All methods except
+     * {@link view} may be called from multiple threads at once.
+     */
     public class ValuesArray : Object {
 
-        private GLib.HashTable<int, Value?> _array = new GLib.HashTable<int, Value?>(direct_hash, direct_equal);
+        private const uint INITIAL_CAPACITY = 4;
+
+        private Value?[] _values = new Value?[INITIAL_CAPACITY];
+        private bool[] _filled = new bool[INITIAL_CAPACITY];
+        private uint _length = 0;
+        private uint _n_filled = 0;
+        /**
+         * The amount of slots from 0 on that have all been set
+         */
+        private uint _n_prefix = 0;
+
+        /**
+         * One past the highest index that has been set
+         */
+        public uint length {
+            get {
+                lock (_values) {
+                    return _length;
+                }
+            }
+        }
+
+        /**
+         * The amount of slots that have been set
+         */
+        public uint n_filled {
+            get {
+                lock (_values) {
+                    return _n_filled;
+                }
+            }
+        }
+
+        private void grow(uint min_capacity) {
+            uint capacity = _values.length;
+            while (capacity < min_capacity) {
+                capacity *= 2;
+            }
+            var values = new Value?[capacity];
+            var filled = new bool[capacity];
+            for (uint i = 0; i < _length; i++) {
+                values[i] = (owned) _values[i];
+                filled[i] = _filled[i];
+            }
+            _values = (owned) values;
+            _filled = (owned) filled;
+        }
     
         public void insert(uint index, Value? value) {
-            _array.set((int)index, value);
+            lock (_values) {
+                if (index >= _values.length) {
+                    grow(index + 1);
+                }
+                if (!_filled[index]) {
+                    _filled[index] = true;
+                    _n_filled++;
+                }
+                _values[index] = value;
+                _length = uint.max(_length, index + 1);
+                while (_n_prefix < _length && _filled[_n_prefix]) {
+                    _n_prefix++;
+                }
+            }
         }
         
         public Value? get_value(uint index) {
-            return _array.get((int)index);
+            lock (_values) {
+                if (index >= _length) {
+                    return null;
+                }
+                return _values[index];
+            }
+        }
+
+        /**
+         * Returns true if all slots from 0 to n-1 have been set
+         */
+        public bool is_complete(uint n) {
+            lock (_values) {
+                return _n_prefix >= n;
+            }
+        }
+
+        /**
+         * Returns the stored values without copying them, including
+         * null for the slots that have not been set
+         *
+         * The returned array is only valid until the next call to
+         * {@link insert}, so this must not be used while other threads
+         * may insert values. Use {@link to_array} in that case.
+         */
+        public unowned Value?[] view() {
+            lock (_values) {
+                return _values[0:(int)_length];
+            }
         }
 
+        /**
+         * Returns a copy of the values that have been set, in index order
+         *
+         * Slots that have not been set are left out, so the position of a
+         * value in the result only matches its index if there are no gaps.
+         */
         public Value?[] to_array() {
-            var ret = new Value?[_array.length];
-            int i = 0;
-            foreach (Value? v in _array.get_values()) {
-                ret[i++] = v;
+            lock (_values) {
+                var ret = new Value?[_n_filled];
+                int i = 0;
+                for (uint index = 0; index < _length; index++) {
+                    if (_filled[index]) {
+                        ret[i++] = _values[index];
+                    }
+                }
+                return ret;
             }
-            return ret;
         }
     }
 }
@@ -0,0 +1,213 @@
+/********************************************************************
+# Copyright 2014-2022 Daniel 'grindhold' Brendle, 2015 Daniel Espinosa <esodan@gmail.com>
+#
+# This file is part of libgtkflow.
+#
+# libgtkflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+
+namespace GFlow {
+    /**
+     * The outcome of a bulk operation such as {@link SimpleNode.add_sinks}
+     * or {@link Batch.link}
+     *
+     * Bulk operations don't stop at the first failing item. Every item
+     * either succeeds or records the message of the error that it failed
+     * with, so callers can handle all failures after a single call.
+     */
+    public class BulkResult : Object {
+        private string?[] errors;
+        private Dock?[] docks;
+
+        /**
+         * The amount of items that the operation was called with
+         */
+        public uint n_items {
+            get { return this.errors.length; }
+        }
+
+        /**
+         * The amount of items that failed
+         */
+        public uint n_failed { get; private set; default = 0; }
+
+        internal BulkResult(int n_items) {
+            this.errors = new string?[n_items];
+            this.docks = new Dock?[n_items];
+        }
+
+        internal void fail(int index, string message) {
+            if (this.errors[index] == null) {
+                this.n_failed++;
+            }
+            this.errors[index] = message;
+        }
+
+        internal void set_dock(int index, Dock d) {
+            this.docks[index] = d;
+        }
+
+        /**
+         * Returns true if every item succeeded
+         */
+        public bool is_ok() {
+            return this.n_failed == 0;
+        }
+
+        /**
+         * Returns the error message of the given item
+         * or null if the item succeeded
+         */
+        public string? get_error(uint index) {
+            return index < this.errors.length ? this.errors[index] : null;
+        }
+
+        /**
+         * Returns the indices of all items that failed
+         */
+        public uint[] get_failed() {
+            uint[] failed = {};
+            for (uint i = 0; i < this.errors.length; i++) {
+                if (this.errors[i] != null) {
+                    failed += i;
+                }
+            }
+            return failed;
+        }
+
+        /**
+         * Returns the dock that has been created for the given item
+         * or null if the operation creates no docks or the item failed
+         */
+        public Dock? get_dock(uint index) {
+            return index < this.docks.length ? this.docks[index] : null;
+        }
+    }
+
+    /**
+     * Operations on many docks at once
+     *
+     * Each call replaces a loop of single calls, which matters for
+     * language bindings where every call into the library has a fixed
+     * overhead. Items that fail are reported in the returned
+     * {@link BulkResult} instead of aborting the whole call.
+     */
+    public class Batch : Object {
+        /**
+         * Records an error for the given item if one of the two
+         * sequences is too short to contain it
+         */
+        private static bool is_complete(BulkResult result, int index, int n_first, int n_second,
+                                        string first, string second) {
+            if (index < n_first && index < n_second) {
+                return true;
+            }
+            result.fail(index, "Item %d has no %s".printf(index, index >= n_first ? first : second));
+            return false;
+        }
+
+        /**
+         * Links each source to the sink at the same position
+         */
+        public static BulkResult link(Source[] sources, Sink[] sinks) {
+            int n = int.max(sources.length, sinks.length);
+            var result = new BulkResult(n);
+            for (int i = 0; i < n; i++) {
+                if (!is_complete(result, i, sources.length, sinks.length, "source", "sink")) {
+                    continue;
+                }
+                try {
+                    sources[i].link(sinks[i]);
+                } catch (GLib.Error e) {
+                    result.fail(i, e.message);
+                }
+            }
+            return result;
+        }
+
+        /**
+         * Unlinks each source from the sink at the same position
+         */
+        public static BulkResult unlink(Source[] sources, Sink[] sinks) {
+            int n = int.max(sources.length, sinks.length);
+            var result = new BulkResult(n);
+            for (int i = 0; i < n; i++) {
+                if (!is_complete(result, i, sources.length, sinks.length, "source", "sink")) {
+                    continue;
+                }
+                try {
+                    sources[i].unlink(sinks[i]);
+                } catch (GLib.Error e) {
+                    result.fail(i, e.message);
+                }
+            }
+            return result;
+        }
+
+        /**
+         * Sets each value to the source at the same position
+         */
+        public static BulkResult set_values(SimpleSource[] sources, GLib.Value[] values, string? flow_id = null) {
+            int n = int.max(sources.length, values.length);
+            var result = new BulkResult(n);
+            for (int i = 0; i < n; i++) {
+                if (!is_complete(result, i, sources.length, values.length, "source", "value")) {
+                    continue;
+                }
+                try {
+                    sources[i].set_value(values[i], flow_id);
+                } catch (GLib.Error e) {
+                    result.fail(i, e.message);
+                }
+            }
+            return result;
+        }
+
+        /**
+         * Sets each double to the source at the same position
+         *
+         * {@link DoubleSource}s receive the values without boxing them.
+         */
+        public static BulkResult set_doubles(SimpleSource[] sources, double[] values, string? flow_id = null) {
+            int n = int.max(sources.length, values.length);
+            var result = new BulkResult(n);
+            for (int i = 0; i < n; i++) {
+                if (!is_complete(result, i, sources.length, values.length, "source", "value")) {
+                    continue;
+                }
+                if (sources[i] is DoubleSource) {
+                    ((DoubleSource) sources[i]).set_double(values[i], flow_id);
+                    continue;
+                }
+                try {
+                    sources[i].set_value(values[i], flow_id);
+                } catch (GLib.Error e) {
+                    result.fail(i, e.message);
+                }
+            }
+            return result;
+        }
+
+        /**
+         * Sets doubles that are packed in native byte order, e.g. the
+         * buffer of a NumPy float64 array, to the sources
+         */
+        public static BulkResult set_doubles_from_bytes(SimpleSource[] sources, Bytes packed, string? flow_id = null) {
+            return set_doubles(sources, unpack_doubles(packed), flow_id);
+        }
+    }
+}
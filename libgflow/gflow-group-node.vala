@@ -0,0 +1,293 @@
+/********************************************************************
+# Copyright 2014-2022 Daniel 'grindhold' Brendle
+#
+# This file is part of libgtkflow.
+#
+# libgtkflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+namespace GFlow {
+    /**
+     * A node that stands for a group of other nodes
+     *
+     * The group does not take part in the data flow. Every dock of the
+     * grouped nodes that is linked to a node outside of the group is
+     * represented by a proxy dock of the group, so a view can display
+     * the whole group as a single node. Links stay where they are: the
+     * proxies are only updated when the boundary of the group changes and
+     * proxy sources repeat the values of the docks they stand for.
+     *
+     * Groups may contain other groups. Their proxies then cover the
+     * boundary of all nodes that are nested in them.
+     */
+    public class GroupNode : SimpleNode {
+        private List<Node> members = new List<Node>();
+        /**
+         * All nodes of this group including the ones in nested groups
+         */
+        private HashTable<Node, Node> all_members = new HashTable<Node, Node>(direct_hash, direct_equal);
+        /**
+         * The grouped docks that currently have a proxy, in the
+         * order their proxies were created
+         */
+        private List<Dock> boundary = new List<Dock>();
+        private HashTable<Dock, Dock> proxies = new HashTable<Dock, Dock>(direct_hash, direct_equal);
+        private HashTable<Dock, Dock> inner_docks = new HashTable<Dock, Dock>(direct_hash, direct_equal);
+        /**
+         * The docks of the grouped nodes whose signals this group watches
+         */
+        private HashTable<Dock, Dock> watched = new HashTable<Dock, Dock>(direct_hash, direct_equal);
+
+        /**
+         * Creates a group of the given nodes
+         */
+        public GroupNode(string name, Node[] members) {
+            base();
+            this.name = name;
+            foreach (Node n in members) {
+                this.members.append(n);
+                this.add_member(n);
+            }
+            this.update_proxies();
+        }
+
+        private void add_member(Node n) {
+            this.all_members.insert(n, n);
+            if (n is GroupNode) {
+                foreach (Node m in ((GroupNode)n).get_members()) {
+                    this.add_member(m);
+                }
+            }
+        }
+
+        /**
+         * Returns the nodes that are directly contained in this group
+         */
+        public unowned List<Node> get_members() {
+            return this.members;
+        }
+
+        /**
+         * Returns all nodes in this group that are not groups
+         * themselves, including the ones in nested groups
+         */
+        public List<Node> get_leaf_nodes() {
+            var leaves = new List<Node>();
+            foreach (Node n in this.members) {
+                if (n is GroupNode) {
+                    foreach (Node leaf in ((GroupNode)n).get_leaf_nodes()) {
+                        leaves.append(leaf);
+                    }
+                } else {
+                    leaves.append(n);
+                }
+            }
+            return leaves;
+        }
+
+        /**
+         * Returns true if the given node is part of this group
+         * or one of its nested groups
+         */
+        public bool contains(Node n) {
+            return this.all_members.contains(n);
+        }
+
+        /**
+         * Returns the proxy dock of this group that stands for the given
+         * dock of a grouped node or null if that dock is not linked to
+         * anything outside of the group
+         */
+        public Dock? get_proxy(Dock inner) {
+            return this.proxies.get(inner);
+        }
+
+        /**
+         * Returns the dock of a grouped node that the given proxy stands for
+         */
+        public Dock? get_inner(Dock proxy) {
+            return this.inner_docks.get(proxy);
+        }
+
+        /**
+         * Returns the docks of the grouped nodes that are
+         * linked to nodes outside of this group
+         */
+        public unowned List<Dock> get_boundary_docks() {
+            return this.boundary;
+        }
+
+        private bool crosses_boundary(Dock d) {
+            if (d is Sink) {
+                foreach (Source s in ((Sink)d).sources) {
+                    if (s.node == null || !this.contains(s.node)) return true;
+                }
+            } else if (d is Source) {
+                foreach (Sink s in ((Source)d).sinks) {
+                    if (s.node == null || !this.contains(s.node)) return true;
+                }
+            }
+            return false;
+        }
+
+        /**
+         * Adds and removes proxies so that they match the
+         * current links of the grouped nodes
+         *
+         * Whenever one of the docks of the grouped nodes is linked or
+         * unlinked, the proxy of that dock is updated automatically.
+         * Call this after adding or removing docks of grouped nodes.
+         */
+        public void update_proxies() {
+            var seen = new HashTable<Dock, Dock>(direct_hash, direct_equal);
+            foreach (Node n in this.get_leaf_nodes()) {
+                foreach (Sink s in n.get_sinks()) {
+                    this.update_proxy(s);
+                    seen.insert(s, s);
+                }
+                foreach (Source s in n.get_sources()) {
+                    this.update_proxy(s);
+                    seen.insert(s, s);
+                }
+            }
+            // Docks that have been removed from the grouped nodes
+            foreach (Dock d in this.watched.get_keys()) {
+                if (!seen.contains(d)) {
+                    this.remove_proxy(d);
+                    this.unwatch(d);
+                }
+            }
+        }
+
+        private void update_proxy(Dock d) {
+            if (!this.watched.contains(d)) {
+                d.linked.connect(this.on_linked);
+                d.unlinked.connect(this.on_unlinked);
+                this.watched.insert(d, d);
+            }
+            bool crossing = this.crosses_boundary(d);
+            if (crossing && !this.proxies.contains(d)) {
+                this.add_proxy(d);
+            } else if (!crossing && this.proxies.contains(d)) {
+                this.remove_proxy(d);
+            }
+        }
+
+        private void add_proxy(Dock inner) {
+            string name = "%s: %s".printf(inner.node.name, inner.name ?? "");
+            try {
+                if (inner is Sink) {
+                    var proxy = new SimpleSink.with_type(inner.value_type);
+                    proxy.name = name;
+                    this.add_sink(proxy);
+                    this.register_proxy(inner, proxy);
+                } else {
+                    var proxy = new SimpleSource.with_type(inner.value_type);
+                    proxy.name = name;
+                    this.add_source(proxy);
+                    this.register_proxy(inner, proxy);
+                }
+            } catch (NodeError e) {
+                warning("Could not add a proxy for %s: %s", name, e.message);
+            }
+        }
+
+        private void unwatch(Dock d) {
+            SignalHandler.disconnect_matched(d, SignalMatchType.DATA, 0, 0, null, null, this);
+            this.watched.remove(d);
+        }
+
+        /**
+         * Updates the proxies of both ends of a link. Unlinking only
+         * notifies one of them, and only grouped docks are watched.
+         */
+        private void update_link(Dock inner, Dock other) {
+            this.update_proxy(inner);
+            if (this.watched.contains(other)) {
+                this.update_proxy(other);
+            }
+        }
+
+        private void on_linked(Dock inner, Dock other) {
+            this.update_link(inner, other);
+        }
+
+        private void on_unlinked(Dock inner, Dock other, bool last) {
+            this.update_link(inner, other);
+        }
+
+        /**
+         * Repeats the values of boundary sources on their proxies
+         */
+        private void on_inner_changed(Dock inner, Value? v, string? flow_id) {
+            var proxy = this.proxies.get(inner) as SimpleSource;
+            if (proxy == null) {
+                return;
+            }
+            try {
+                proxy.set_value(v, flow_id);
+            } catch (GLib.Error e) {
+                warning("Could not mirror the value of %s: %s", proxy.name, e.message);
+            }
+        }
+
+        /**
+         * Only boundary sources are watched for values, so typed
+         * sources inside of the group keep skipping their boxed signal
+         */
+        private void register_proxy(Dock inner, Dock proxy) {
+            this.proxies.insert(inner, proxy);
+            this.inner_docks.insert(proxy, inner);
+            this.boundary.append(inner);
+            if (inner is Source) {
+                inner.changed.connect(this.on_inner_changed);
+            }
+        }
+
+        private void remove_proxy(Dock inner) {
+            var proxy = this.proxies.get(inner);
+            if (proxy == null) {
+                return;
+            }
+            this.proxies.remove(inner);
+            this.inner_docks.remove(proxy);
+            this.boundary.remove(inner);
+            if (inner is Source) {
+                inner.changed.disconnect(this.on_inner_changed);
+            }
+            try {
+                if (proxy is Sink) {
+                    this.remove_sink((Sink)proxy);
+                } else {
+                    this.remove_source((Source)proxy);
+                }
+            } catch (NodeError e) {
+                warning("Could not remove a proxy: %s", e.message);
+            }
+        }
+
+        /**
+         * Stops watching the docks of the grouped nodes
+         */
+        public override void dispose() {
+            foreach (Dock d in this.watched.get_keys()) {
+                SignalHandler.disconnect_matched(d, SignalMatchType.DATA, 0, 0, null, null, this);
+            }
+            this.watched.remove_all();
+            base.dispose();
+        }
+    }
+}
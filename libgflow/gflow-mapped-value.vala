@@ -0,0 +1,144 @@
+/********************************************************************
+# Copyright 2014-2022 Daniel 'grindhold' Brendle
+#
+# This file is part of libgtkflow.
+#
+# libgtkflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+namespace GFlow {
+    /**
+     * The mapping of one file, shared by all views of it
+     */
+    private class MappedFileHandle {
+        public string path;
+        private MappedFile? file = null;
+        private Bytes? bytes = null;
+
+        public MappedFileHandle(string path) {
+            this.path = path;
+        }
+
+        public Bytes get_bytes() throws FileError {
+            lock (this.file) {
+                if (this.file == null) {
+                    this.file = new MappedFile(this.path, false);
+                    this.bytes = this.file.get_bytes();
+                }
+                return this.bytes;
+            }
+        }
+    }
+
+    /**
+     * A handle to a byte range of a file, to pass large payloads
+     * between docks without loading them into memory
+     *
+     * Sources publish the handle, which only carries the path and the range
+     * of the file. Copying the {@link GLib.Value} that holds it only adds a
+     * reference. The file is memory mapped when a range is first requested,
+     * so only the pages that are actually read are loaded. All views of one
+     * handle share a single mapping, which is released together with the
+     * last of them.
+     */
+    public class MappedValue : Object {
+        private MappedFileHandle handle;
+
+        /**
+         * The file that holds the payload
+         */
+        public string path {
+            get { return this.handle.path; }
+        }
+
+        /**
+         * The start of this view in the file
+         */
+        public uint64 offset { get; private set; default = 0; }
+
+        /**
+         * The length of this view in bytes
+         */
+        public uint64 size { get; private set; default = 0; }
+
+        /**
+         * Creates a view of the whole given file. The file is not read
+         * until a range of it is requested.
+         */
+        public MappedValue(string path) throws FileError {
+            this.handle = new MappedFileHandle(path);
+            this.size = (uint64)file_size(path);
+        }
+
+        private MappedValue.for_range(MappedFileHandle handle, uint64 offset, uint64 size) {
+            this.handle = handle;
+            this.offset = offset;
+            this.size = size;
+        }
+
+        private static int64 file_size(string path) throws FileError {
+            if (!FileUtils.test(path, FileTest.IS_REGULAR)) {
+                throw new FileError.NOENT("%s is not a regular file".printf(path));
+            }
+            Stat st;
+            if (FileUtils.stat(path, out st) != 0) {
+                throw new FileError.FAILED("Could not query the size of %s".printf(path));
+            }
+            return (int64)st.st_size;
+        }
+
+        private void check_range(uint64 offset, uint64 length) throws FileError {
+            if (offset > this.size || length > this.size - offset) {
+                throw new FileError.INVAL(
+                    "Range %s+%s exceeds the %s bytes of this view".printf(
+                        offset.to_string(), length.to_string(), this.size.to_string())
+                );
+            }
+        }
+
+        /**
+         * Returns a view of a range of this view, sharing its mapping
+         */
+        public MappedValue view(uint64 offset, uint64 length) throws FileError {
+            this.check_range(offset, length);
+            return new MappedValue.for_range(this.handle, this.offset + offset, length);
+        }
+
+        /**
+         * Returns the bytes of a range of this view without copying them
+         */
+        public Bytes get_range(uint64 offset, uint64 length) throws FileError {
+            this.check_range(offset, length);
+            return new Bytes.from_bytes(this.handle.get_bytes(), (size_t)(this.offset + offset), (size_t)length);
+        }
+
+        /**
+         * Returns the bytes of this whole view without copying them
+         */
+        public Bytes get_bytes() throws FileError {
+            return this.get_range(0, this.size);
+        }
+
+        /**
+         * Describes the payload without reading it, e.g. for display
+         */
+        public string to_string() {
+            return "%s [%s+%s]".printf(
+                Path.get_basename(this.path), this.offset.to_string(), this.size.to_string()
+            );
+        }
+    }
+}
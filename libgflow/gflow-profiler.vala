@@ -0,0 +1,478 @@
+/********************************************************************
+# Copyright 2014-2022 Daniel 'grindhold' Brendle
+#
+# This file is part of libgtkflow.
+#
+# libgtkflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+namespace GFlow {
+
+#if HAVE_SYSPROF
+    [CCode (cname = "sysprof_collector_mark", cheader_filename = "sysprof-capture.h")]
+    private extern void sysprof_collector_mark(int64 time, int64 duration, string group, string mark, string? message);
+#endif
+
+    /**
+     * Timing statistics of one {@link Node} or one named span
+     *
+     * All times are given in microseconds.
+     */
+    public class ProfileStats : Object {
+        /**
+         * The category of the measured code, e.g. "node"
+         */
+        public string category { get; construct; }
+
+        /**
+         * The name of the measured node or span
+         */
+        public string name { get; construct; }
+
+        /**
+         * How often the measured code has run
+         */
+        public uint count { get; private set; default = 0; }
+
+        /**
+         * The time spent in the measured code, including
+         * the time spent in nodes further downstream
+         */
+        public int64 total_time { get; private set; default = 0; }
+
+        /**
+         * The time spent in the measured code itself
+         */
+        public int64 self_time { get; private set; default = 0; }
+
+        /**
+         * The longest single run of the measured code
+         */
+        public int64 max_time { get; private set; default = 0; }
+
+        internal ProfileStats(string category, string name) {
+            Object(category: category, name: name);
+        }
+
+        internal void add(int64 duration, int64 self_duration) {
+            this.count++;
+            this.total_time += duration;
+            this.self_time += self_duration;
+            if (duration > this.max_time) {
+                this.max_time = duration;
+            }
+        }
+    }
+
+    private class ProfileEvent {
+        public string category;
+        public string name;
+        public int64 start;
+        public int64 duration;
+        public int tid;
+    }
+
+    /**
+     * A sink whose changed handlers are currently running
+     */
+    private class ProfileFrame {
+        public Node? node;
+        public int64 start;
+        public int64 child_time = 0;
+    }
+
+    private class ProfileThread {
+        public int tid;
+        public GLib.GenericArray<ProfileFrame> frames = new GLib.GenericArray<ProfileFrame>();
+    }
+
+    /**
+     * Records where the time of a running graph is spent
+     *
+     * While enabled, the profiler measures how long the changed
+     * handlers of every {@link Sink} run and attributes this time to
+     * the sink's {@link Node}. It counts the changed emissions of every
+     * {@link Dock} and the amount of hops each flow_id has travelled.
+     * Widget libraries add their own spans with {@link begin_span} and
+     * {@link end_span}.
+     *
+     * The profiler is disabled by default. While disabled, every hook
+     * costs a single check of a static flag. The results can be queried
+     * directly or exported as Chrome trace JSON, which can be opened in
+     * chrome://tracing or Perfetto. When libgflow is built with sysprof
+     * support, every span is also emitted as a sysprof mark.
+     *
+     * Overlays that run permanently only need the statistics of the
+     * nodes and the changed counts of the docks. They use
+     * {@link hold_counters} instead, which records neither flow depths,
+     * spans nor trace events, so its memory use is bounded by the size
+     * of the graph. The profiler does not keep nodes and docks alive;
+     * their data is dropped when they are finalized.
+     */
+    public class Profiler : Object {
+
+        /**
+         * Whether any of the hooks have to record something
+         */
+        internal static bool active = false;
+        /**
+         * Whether everything is recorded, see {@link set_enabled}
+         */
+        private static bool tracing = false;
+        private static int n_counter_users = 0;
+        private static GLib.Once<Profiler> _instance;
+
+        private HashTable<unowned Node, ProfileStats> _nodes
+            = new HashTable<unowned Node, ProfileStats>(direct_hash, direct_equal);
+        private HashTable<string, ProfileStats> _spans
+            = new HashTable<string, ProfileStats>(str_hash, str_equal);
+        private HashTable<unowned Dock, uint> _emissions
+            = new HashTable<unowned Dock, uint>(direct_hash, direct_equal);
+        /**
+         * The nodes and docks whose finalization the profiler is notified of
+         */
+        private HashTable<unowned Object, bool> _watched
+            = new HashTable<unowned Object, bool>(direct_hash, direct_equal);
+        private HashTable<string, uint> _flow_depths
+            = new HashTable<string, uint>(str_hash, str_equal);
+        private HashTable<void*, ProfileThread> _threads
+            = new HashTable<void*, ProfileThread>(direct_hash, direct_equal);
+        private GLib.GenericArray<ProfileEvent> _events = new GLib.GenericArray<ProfileEvent>();
+        private uint _n_dropped_events = 0;
+
+        /**
+         * The maximum amount of events that are kept for the
+         * trace export. Statistics are still collected once
+         * this limit has been reached.
+         */
+        public uint max_events { get; set; default = 100000; }
+
+        private Profiler() {}
+
+        public static Profiler get_default() {
+            return _instance.once(() => { return new Profiler(); });
+        }
+
+        /**
+         * Enables or disables the recording of profiling data
+         */
+        public static void set_enabled(bool enabled) {
+            get_default();
+            tracing = enabled;
+            update_active();
+        }
+
+        public static bool is_enabled() {
+            return tracing;
+        }
+
+        /**
+         * Starts recording the node statistics and changed counts
+         * until {@link release_counters} is called
+         *
+         * Calls may be nested. Flow depths, spans and trace events are
+         * only recorded while the profiler is enabled with {@link set_enabled}.
+         */
+        public static void hold_counters() {
+            get_default();
+            AtomicInt.inc(ref n_counter_users);
+            update_active();
+        }
+
+        /**
+         * Stops the recording started with {@link hold_counters}
+         */
+        public static void release_counters() {
+            AtomicInt.dec_and_test(ref n_counter_users);
+            update_active();
+        }
+
+        private static void update_active() {
+            active = tracing || AtomicInt.get(ref n_counter_users) > 0;
+        }
+
+        /**
+         * Starts measuring a span. The returned timestamp
+         * has to be passed to {@link end_span}.
+         */
+        public static int64 begin_span() {
+            return tracing ? get_monotonic_time() : 0;
+        }
+
+        /**
+         * Finishes measuring a span started with {@link begin_span}
+         */
+        public static void end_span(string category, string name, int64 start) {
+            if (!tracing || start == 0) {
+                return;
+            }
+            get_default().record_span(category, name, start, get_monotonic_time() - start);
+        }
+
+        private void record_span(string category, string name, int64 start, int64 duration) {
+            lock (_nodes) {
+                var key = category + ":" + name;
+                var stats = _spans.get(key);
+                if (stats == null) {
+                    stats = new ProfileStats(category, name);
+                    _spans.insert(key, stats);
+                }
+                stats.add(duration, duration);
+                add_event(category, name, start, duration, get_thread().tid);
+            }
+        }
+
+        private ProfileThread get_thread() {
+            void* key = (void*)Thread.self<void*>();
+            var thread = _threads.get(key);
+            if (thread == null) {
+                thread = new ProfileThread();
+                thread.tid = (int)_threads.size() + 1;
+                _threads.insert(key, thread);
+            }
+            return thread;
+        }
+
+        private void add_event(string category, string name, int64 start, int64 duration, int tid) {
+#if HAVE_SYSPROF
+            sysprof_collector_mark(start * 1000, duration * 1000, category, name, null);
+#endif
+            if (_events.length >= max_events) {
+                _n_dropped_events++;
+                return;
+            }
+            var ev = new ProfileEvent();
+            ev.category = category;
+            ev.name = name;
+            ev.start = start;
+            ev.duration = duration;
+            ev.tid = tid;
+            _events.add(ev);
+        }
+
+        /**
+         * Makes sure the entries of the given object are
+         * dropped when it is finalized
+         */
+        private void watch(Object o) {
+            if (!_watched.contains(o)) {
+                _watched.insert(o, true);
+                o.weak_ref(this.forget);
+            }
+        }
+
+        private void forget(Object o) {
+            lock (_nodes) {
+                _watched.remove(o);
+                if (o is Node) {
+                    _nodes.remove((Node)o);
+                }
+                if (o is Dock) {
+                    _emissions.remove((Dock)o);
+                }
+            }
+        }
+
+        private void count_emission(Dock dock) {
+            watch(dock);
+            _emissions.insert(dock, _emissions.get(dock) + 1);
+        }
+
+        /**
+         * Called by a {@link Source} before it emits a new value
+         */
+        internal void record_emission(Dock dock, string? flow_id) {
+            lock (_nodes) {
+                count_emission(dock);
+                if (tracing && flow_id != null) {
+                    uint depth = get_thread().frames.length + 1;
+                    if (depth > _flow_depths.get(flow_id)) {
+                        _flow_depths.insert(flow_id, depth);
+                    }
+                }
+            }
+        }
+
+        /**
+         * Called by a {@link Sink} before its changed handlers run
+         */
+        internal void enter_sink(Dock dock) {
+            lock (_nodes) {
+                count_emission(dock);
+                var frame = new ProfileFrame();
+                frame.node = dock.node;
+                frame.start = get_monotonic_time();
+                get_thread().frames.add(frame);
+            }
+        }
+
+        /**
+         * Called by a {@link Sink} after its changed handlers ran
+         */
+        internal void leave_sink() {
+            int64 end = get_monotonic_time();
+            lock (_nodes) {
+                var thread = get_thread();
+                // The profiler may have been enabled while the handlers ran
+                if (thread.frames.length == 0) {
+                    return;
+                }
+                var frame = thread.frames[thread.frames.length - 1];
+                thread.frames.remove_index(thread.frames.length - 1);
+                int64 duration = end - frame.start;
+                if (thread.frames.length > 0) {
+                    thread.frames[thread.frames.length - 1].child_time += duration;
+                }
+                if (frame.node == null) {
+                    return;
+                }
+                var stats = _nodes.get(frame.node);
+                if (stats == null) {
+                    stats = new ProfileStats("node", frame.node.name ?? "");
+                    watch(frame.node);
+                    _nodes.insert(frame.node, stats);
+                }
+                stats.add(duration, duration - frame.child_time);
+                if (tracing) {
+                    add_event("node", stats.name, frame.start, duration, thread.tid);
+                }
+            }
+        }
+
+        /**
+         * Returns the statistics of the given node or null if
+         * none of its sinks has received a value while profiling
+         */
+        public ProfileStats? get_node_stats(Node node) {
+            lock (_nodes) {
+                return _nodes.get(node);
+            }
+        }
+
+        /**
+         * Returns the statistics of all nodes, the node
+         * with the highest self time first
+         */
+        public List<ProfileStats> get_hotspots() {
+            var hotspots = new List<ProfileStats>();
+            lock (_nodes) {
+                foreach (var stats in _nodes.get_values()) {
+                    hotspots.prepend(stats);
+                }
+            }
+            hotspots.sort((a, b) => {
+                return a.self_time > b.self_time ? -1 : (a.self_time < b.self_time ? 1 : 0);
+            });
+            return hotspots;
+        }
+
+        /**
+         * Returns the statistics of a span recorded with {@link end_span}
+         */
+        public ProfileStats? get_span_stats(string category, string name) {
+            lock (_nodes) {
+                return _spans.get(category + ":" + name);
+            }
+        }
+
+        /**
+         * Returns how often the given dock has emitted changed
+         */
+        public uint get_changed_count(Dock dock) {
+            lock (_nodes) {
+                return _emissions.get(dock);
+            }
+        }
+
+        /**
+         * Returns the highest amount of sources a value with the
+         * given flow_id has passed, or 0 if it has not been seen
+         */
+        public uint get_flow_depth(string flow_id) {
+            lock (_nodes) {
+                return _flow_depths.get(flow_id);
+            }
+        }
+
+        /**
+         * The amount of events that did not fit into max_events
+         */
+        public uint get_n_dropped_events() {
+            lock (_nodes) {
+                return _n_dropped_events;
+            }
+        }
+
+        /**
+         * Drops all recorded data
+         */
+        public void reset() {
+            lock (_nodes) {
+                _nodes.remove_all();
+                _spans.remove_all();
+                _emissions.remove_all();
+                _flow_depths.remove_all();
+                _threads.remove_all();
+                _events = new GLib.GenericArray<ProfileEvent>();
+                _n_dropped_events = 0;
+            }
+        }
+
+        private static string escape_json(string s) {
+            var builder = new StringBuilder();
+            for (int i = 0; i < s.length; i++) {
+                char c = s[i];
+                if (c == '"' || c == '\\') {
+                    builder.append_c('\\');
+                    builder.append_c(c);
+                } else if ((uchar)c < 0x20) {
+                    builder.append_printf("\\u%04x", (uchar)c);
+                } else {
+                    builder.append_c(c);
+                }
+            }
+            return builder.str;
+        }
+
+        /**
+         * Returns all recorded events in the Chrome trace event format
+         */
+        public string to_chrome_trace() {
+            var builder = new StringBuilder("{\"traceEvents\": [");
+            lock (_nodes) {
+                for (uint i = 0; i < _events.length; i++) {
+                    var ev = _events[i];
+                    builder.append(i == 0 ? "\n" : ",\n");
+                    builder.append_printf(
+                        "{\"name\": \"%s\", \"cat\": \"%s\", \"ph\": \"X\", \"ts\": %s, \"dur\": %s, \"pid\": 1, \"tid\": %d}",
+                        escape_json(ev.name), escape_json(ev.category),
+                        ev.start.to_string(), ev.duration.to_string(), ev.tid
+                    );
+                }
+            }
+            builder.append("\n], \"displayTimeUnit\": \"ms\"}\n");
+            return builder.str;
+        }
+
+        /**
+         * Writes all recorded events to the given file in
+         * the Chrome trace event format
+         */
+        public void write_chrome_trace(string path) throws GLib.Error {
+            FileUtils.set_contents(path, this.to_chrome_trace());
+        }
+    }
+}
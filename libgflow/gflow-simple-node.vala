@@ -76,6 +76,105 @@ namespace GFlow {
             sink_added (s);
         }
 
+        /**
+         * Creates a sink for the given type, preferring the typed
+         * sinks that don't box their values
+         */
+        private static Sink create_sink(GLib.Type type) {
+            if (type == typeof(double)) return new DoubleSink();
+            if (type == typeof(int64)) return new Int64Sink();
+            if (type == typeof(bool)) return new BooleanSink();
+            return new SimpleSink.with_type(type);
+        }
+
+        /**
+         * Creates a source for the given type, preferring the typed
+         * sources that don't box their values
+         */
+        private static Source create_source(GLib.Type type) {
+            if (type == typeof(double)) return new DoubleSource();
+            if (type == typeof(int64)) return new Int64Source();
+            if (type == typeof(bool)) return new BooleanSource();
+            return new SimpleSource.with_type(type);
+        }
+
+        private static bool is_valid_spec(BulkResult result, int index, string[] names, GLib.Type[] types) {
+            if (index >= names.length || index >= types.length) {
+                result.fail(index, "Item %d has no %s".printf(index, index >= names.length ? "name" : "type"));
+                return false;
+            }
+            if (types[index] == GLib.Type.INVALID || types[index] == GLib.Type.NONE) {
+                result.fail(index, "Dock %s has no valid type".printf(names[index]));
+                return false;
+            }
+            return true;
+        }
+
+        /**
+         * Adds one {@link Sink} for each name and the type at the same position
+         *
+         * Sinks for double, int64 and boolean values are created as
+         * {@link DoubleSink}, {@link Int64Sink} and {@link BooleanSink}.
+         * The new sinks and the errors of the items that failed can be
+         * retrieved from the returned {@link BulkResult}.
+         */
+        public BulkResult add_sinks(string[] names, GLib.Type[] types) {
+            int n = int.max(names.length, types.length);
+            var result = new BulkResult(n);
+            var added = new List<Sink>();
+            for (int i = 0; i < n; i++) {
+                if (!is_valid_spec(result, i, names, types)) {
+                    continue;
+                }
+                var s = create_sink(types[i]);
+                s.name = names[i];
+                s.node = this;
+                added.prepend(s);
+                result.set_dock(i, s);
+            }
+            // New docks can't be part of this node yet, so the list is
+            // extended once instead of being searched for every dock
+            added.reverse();
+            this.sinks.concat((owned) added);
+            for (int i = 0; i < n; i++) {
+                var d = result.get_dock(i);
+                if (d != null) {
+                    sink_added((Sink) d);
+                }
+            }
+            return result;
+        }
+
+        /**
+         * Adds one {@link Source} for each name and the type at the same position
+         *
+         * Works like {@link add_sinks}.
+         */
+        public BulkResult add_sources(string[] names, GLib.Type[] types) {
+            int n = int.max(names.length, types.length);
+            var result = new BulkResult(n);
+            var added = new List<Source>();
+            for (int i = 0; i < n; i++) {
+                if (!is_valid_spec(result, i, names, types)) {
+                    continue;
+                }
+                var s = create_source(types[i]);
+                s.name = names[i];
+                s.node = this;
+                added.prepend(s);
+                result.set_dock(i, s);
+            }
+            added.reverse();
+            this.sources.concat((owned) added);
+            for (int i = 0; i < n; i++) {
+                var d = result.get_dock(i);
+                if (d != null) {
+                    source_added((Source) d);
+                }
+            }
+            return result;
+        }
+
         /**
          * Remove the given {@link Source} from this SimpleNode
          */
@@ -157,10 +256,23 @@ namespace GFlow {
         public bool is_recursive_forward(Node from, bool initial=true) {
             if (!initial && this == from)
                 return true;
-            foreach (Source source in this.get_sources()) {
-                foreach (Sink sink in source.sinks) {
-                    if (sink.node.is_recursive_forward(from, false))
-                        return true;
+            // Every node is only visited once. Following each path separately
+            // takes exponential time on graphs with many converging paths
+            var visited = new HashTable<unowned Node, unowned Node>(direct_hash, direct_equal);
+            var pending = new Queue<unowned Node>();
+            pending.push_tail(this);
+            while (!pending.is_empty()) {
+                unowned Node n = pending.pop_head();
+                foreach (Source source in n.get_sources()) {
+                    foreach (Sink sink in source.sinks) {
+                        unowned Node? next = sink.node;
+                        if (next == null || visited.contains(next))
+                            continue;
+                        if (next == from)
+                            return true;
+                        visited.add(next);
+                        pending.push_tail(next);
+                    }
                 }
             }
             return false;
@@ -173,10 +285,21 @@ namespace GFlow {
         public bool is_recursive_backward(Node from, bool initial=true) {
             if (!initial && this == from)
                 return true;
-            foreach (Sink sink in this.sinks) {
-                foreach (Source source in sink.sources) {
-                    if (source.node.is_recursive_backward(from, false))
-                        return true;
+            var visited = new HashTable<unowned Node, unowned Node>(direct_hash, direct_equal);
+            var pending = new Queue<unowned Node>();
+            pending.push_tail(this);
+            while (!pending.is_empty()) {
+                unowned Node n = pending.pop_head();
+                foreach (Sink sink in n.get_sinks()) {
+                    foreach (Source source in sink.sources) {
+                        unowned Node? next = source.node;
+                        if (next == null || visited.contains(next))
+                            continue;
+                        if (next == from)
+                            return true;
+                        visited.add(next);
+                        pending.push_tail(next);
+                    }
                 }
             }
             return false;
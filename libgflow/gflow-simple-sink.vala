@@ -93,9 +93,23 @@ namespace GFlow {
                 );
             }
             this._sources.append(s);
+            this.attach_source(s);
+        }
+
+        /**
+         * Starts listening to the values of a newly linked {@link Source}
+         */
+        protected virtual void attach_source(Source s) {
             s.changed.connect(this.do_source_changed);
         }
 
+        /**
+         * Stops listening to the values of an unlinked {@link Source}
+         */
+        protected virtual void detach_source(Source s) {
+            s.changed.disconnect(this.do_source_changed);
+        }
+
         /**
          * Destroys the connection between this SimpleSink and the given {@link Source}
          */
@@ -148,11 +162,26 @@ namespace GFlow {
                 this.remove_source((Source) dock);
                 this.do_source_changed();
                 dock.unlinked(this, this.sources.length() == 0);
-                dock.changed.disconnect(this.do_source_changed);
+                this.detach_source((Source) dock);
             }
         }
 
         private void do_source_changed(Value? source_value = null, string? flow_id = null) {
+            if (!Profiler.active) {
+                this.deliver(source_value, flow_id);
+                return;
+            }
+            var profiler = Profiler.get_default();
+            profiler.enter_sink(this);
+            this.deliver(source_value, flow_id);
+            profiler.leave_sink();
+        }
+
+        /**
+         * Passes a value that arrived from a {@link Source} on to the
+         * handlers of {@link Dock.changed}
+         */
+        protected virtual void deliver(Value? source_value, string? flow_id) {
             changed(source_value, flow_id);
         }
 
@@ -167,7 +167,7 @@ namespace GFlow {
         /**
          * Set the value of this SimpleSource
          */
-        public void set_value (GLib.Value? v, string? flow_id = null) throws GLib.Error
+        public virtual void set_value (GLib.Value? v, string? flow_id = null) throws GLib.Error
         {
             if (v != null && this.value_type != v.type())
                 throw new NodeError.INCOMPATIBLE_VALUE(
@@ -175,13 +175,16 @@ namespace GFlow {
                         v.type().name(), this.value_type.name())
                 );
             this.last_value = v;
+            if (Profiler.active) {
+                Profiler.get_default().record_emission(this, flow_id);
+            }
             this.changed(v, flow_id);
         }
 
         /**
          * {@inheritDoc}
          */
-        public new GLib.Value? get_last_value() {
+        public virtual GLib.Value? get_last_value() {
             return this.last_value;
         }
     }
@@ -0,0 +1,397 @@
+/********************************************************************
+# Copyright 2014-2022 Daniel 'grindhold' Brendle
+#
+# This file is part of libgtkflow.
+#
+# libgtkflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+namespace GFlow {
+    public errordomain TrafficError {
+        /**
+         * Throw when a trace file is damaged or has an unknown format
+         */
+        INVALID_TRACE
+    }
+
+    /**
+     * The format of trace files
+     *
+     * A trace starts with the magic string followed by records. Every record
+     * is a little endian uint32 length followed by a serialized GVariant of
+     * this type: source id, timestamp in microseconds, flow_id and value.
+     * Numbers are stored in their widest variant type and converted back to
+     * the value type of the source when they are replayed. Values of types
+     * that have no serialization are stored as the unit variant "()".
+     */
+    private const string TRACE_MAGIC = "GFLOWTR1";
+    private const string TRACE_RECORD_TYPE = "(sxmsmv)";
+
+    /**
+     * Returns the serialization of the given value or the unit
+     * variant "()" if its type is not supported
+     */
+    private Variant value_to_variant(GLib.Value v) {
+        var type = v.type();
+        if (type.is_enum()) {
+            return new Variant.int64(v.get_enum());
+        }
+        if (type.is_flags()) {
+            return new Variant.uint64(v.get_flags());
+        }
+        if (type == typeof(bool)) return new Variant.boolean(v.get_boolean());
+        if (type == typeof(int)) return new Variant.int64(v.get_int());
+        if (type == typeof(long)) return new Variant.int64(v.get_long());
+        if (type == typeof(int64)) return new Variant.int64(v.get_int64());
+        if (type == typeof(uint)) return new Variant.uint64(v.get_uint());
+        if (type == typeof(ulong)) return new Variant.uint64(v.get_ulong());
+        if (type == typeof(uint64)) return new Variant.uint64(v.get_uint64());
+        if (type == typeof(char)) return new Variant.int64(v.get_schar());
+        if (type == typeof(uchar)) return new Variant.uint64(v.get_uchar());
+        if (type == typeof(float)) return new Variant.double(v.get_float());
+        if (type == typeof(double)) return new Variant.double(v.get_double());
+        if (type == typeof(string)) return new Variant.string(v.get_string() ?? "");
+        return new Variant.tuple({});
+    }
+
+    private bool variant_to_value(Variant variant, GLib.Type type, out GLib.Value v) {
+        v = GLib.Value(type);
+        int64 i = variant.is_of_type(VariantType.INT64) ? variant.get_int64() : 0;
+        uint64 u = variant.is_of_type(VariantType.UINT64) ? variant.get_uint64() : 0;
+        if (type.is_enum()) {
+            v.set_enum((int)i);
+        } else if (type.is_flags()) {
+            v.set_flags((uint)u);
+        } else if (type == typeof(bool) && variant.is_of_type(VariantType.BOOLEAN)) {
+            v.set_boolean(variant.get_boolean());
+        } else if (type == typeof(int)) {
+            v.set_int((int)i);
+        } else if (type == typeof(long)) {
+            v.set_long((long)i);
+        } else if (type == typeof(int64)) {
+            v.set_int64(i);
+        } else if (type == typeof(uint)) {
+            v.set_uint((uint)u);
+        } else if (type == typeof(ulong)) {
+            v.set_ulong((ulong)u);
+        } else if (type == typeof(uint64)) {
+            v.set_uint64(u);
+        } else if (type == typeof(char)) {
+            v.set_schar((int8)i);
+        } else if (type == typeof(uchar)) {
+            v.set_uchar((uchar)u);
+        } else if (type == typeof(float) && variant.is_of_type(VariantType.DOUBLE)) {
+            v.set_float((float)variant.get_double());
+        } else if (type == typeof(double) && variant.is_of_type(VariantType.DOUBLE)) {
+            v.set_double(variant.get_double());
+        } else if (type == typeof(string) && variant.is_of_type(VariantType.STRING)) {
+            v.set_string(variant.get_string());
+        } else {
+            return false;
+        }
+        return true;
+    }
+
+    /**
+     * Writes every value that is set to the registered sources into
+     * an append-only trace file, which can be fed back into the graph
+     * by a {@link TrafficReplayer}
+     *
+     * Booleans, numbers, enums, flags and strings are supported. Values
+     * of other types are recorded as unsupported and skipped on replay.
+     *
+     * The handlers that are connected to the registered sources hold a
+     * reference to the recorder, so it stays alive and keeps recording
+     * until {@link close} is called or all sources have been removed.
+     */
+    public class TrafficRecorder : Object {
+        private FileStream? file;
+        private HashTable<Source, ulong> handlers
+            = new HashTable<Source, ulong>(direct_hash, direct_equal);
+        private uint _n_records = 0;
+
+        /**
+         * The amount of values that have been recorded so far
+         */
+        public uint n_records {
+            get { return this._n_records; }
+        }
+
+        /**
+         * Opens the given trace file for appending. A new
+         * file is created if it does not exist yet.
+         */
+        public TrafficRecorder(string path) throws GLib.Error {
+            bool exists = FileUtils.test(path, FileTest.EXISTS);
+            this.file = FileStream.open(path, "ab");
+            if (this.file == null) {
+                throw new FileError.FAILED("Could not open %s for writing".printf(path));
+            }
+            if (!exists) {
+                this.file.write(TRACE_MAGIC.data);
+            }
+        }
+
+        ~TrafficRecorder() {
+            this.close();
+        }
+
+        /**
+         * Records all values of the given source under the given id.
+         * The replayer uses the id to find the source again.
+         *
+         * The source keeps this recorder alive until it is removed
+         * with {@link remove_source} or the recorder is closed.
+         */
+        public void add_source(Source source, string id) {
+            if (this.handlers.contains(source)) {
+                return;
+            }
+            this.handlers.insert(source, source.changed.connect((v, flow_id) => {
+                this.record(id, v, flow_id);
+            }));
+        }
+
+        /**
+         * Stops recording the given source
+         */
+        public void remove_source(Source source) {
+            if (this.handlers.contains(source)) {
+                SignalHandler.disconnect(source, this.handlers.get(source));
+                this.handlers.remove(source);
+            }
+        }
+
+        private void record(string id, GLib.Value? v, string? flow_id) {
+            Variant? value = v != null ? value_to_variant((GLib.Value)v) : null;
+            var record = new Variant.tuple({
+                new Variant.string(id),
+                new Variant.int64(get_monotonic_time()),
+                new Variant.maybe(VariantType.STRING, flow_id != null ? new Variant.string(flow_id) : null),
+                new Variant.maybe(VariantType.VARIANT, value != null ? new Variant.variant(value) : null)
+            });
+            var data = record.get_data_as_bytes();
+            uint32 length = (uint32)data.get_size();
+            uint8[] prefix = {
+                (uint8)(length & 0xff), (uint8)((length >> 8) & 0xff),
+                (uint8)((length >> 16) & 0xff), (uint8)((length >> 24) & 0xff)
+            };
+            lock (this.file) {
+                if (this.file == null) {
+                    return;
+                }
+                this.file.write(prefix);
+                this.file.write(data.get_data());
+                this._n_records++;
+            }
+        }
+
+        /**
+         * Writes all buffered records to the file
+         */
+        public void flush() {
+            lock (this.file) {
+                if (this.file != null) {
+                    this.file.flush();
+                }
+            }
+        }
+
+        /**
+         * Stops recording and closes the trace file
+         */
+        public void close() {
+            this.handlers.foreach((source, handler) => {
+                SignalHandler.disconnect(source, handler);
+            });
+            this.handlers.remove_all();
+            lock (this.file) {
+                this.file = null;
+            }
+        }
+    }
+
+    /**
+     * The throughput and latency of one replay
+     *
+     * Latencies are the time that setting a value and running all
+     * handlers it triggered took, in microseconds.
+     */
+    public class ReplayReport : Object {
+        /**
+         * The amount of values that have been set
+         */
+        public uint n_values { get; internal set; default = 0; }
+
+        /**
+         * The amount of records whose source id was not registered, whose
+         * value could not be converted or whose value type was not supported
+         * by the recorder
+         */
+        public uint n_skipped { get; internal set; default = 0; }
+
+        /**
+         * The duration of the whole replay in microseconds
+         */
+        public int64 elapsed { get; internal set; default = 0; }
+
+        /**
+         * The highest amount of microseconds that a value was set
+         * behind its schedule. Always 0 when replaying as fast as possible.
+         */
+        public int64 max_lag { get; internal set; default = 0; }
+
+        private GenericArray<int64?> latencies = new GenericArray<int64?>();
+
+        internal void add_latency(int64 latency) {
+            this.latencies.add(latency);
+            this.n_values++;
+        }
+
+        internal void finish() {
+            // Sorted once, so percentiles are cheap to query
+            this.latencies.sort((a, b) => {
+                return a < b ? -1 : (a > b ? 1 : 0);
+            });
+        }
+
+        /**
+         * The values set per second
+         */
+        public double get_throughput() {
+            return this.elapsed > 0 ? this.n_values * 1000000.0 / this.elapsed : 0;
+        }
+
+        /**
+         * Returns the given percentile of the latencies, e.g. 0.99
+         */
+        public int64 get_latency_percentile(double p) {
+            if (this.latencies.length == 0) {
+                return 0;
+            }
+            int index = (int)Math.ceil(p.clamp(0, 1) * this.latencies.length) - 1;
+            return this.latencies[int.max(index, 0)];
+        }
+    }
+
+    /**
+     * Feeds a trace written by a {@link TrafficRecorder} back into a graph
+     *
+     * The trace file is memory mapped, so traces larger than the
+     * available memory can be replayed.
+     */
+    public class TrafficReplayer : Object {
+        private MappedFile mapped;
+        private HashTable<string, SimpleSource> sources
+            = new HashTable<string, SimpleSource>(str_hash, str_equal);
+
+        /**
+         * The factor that the recorded pace is sped up with.
+         * 1 replays at the original pace, 2 twice as fast and
+         * 0 sets the values as fast as possible.
+         */
+        public double speed { get; set; default = 1.0; }
+
+        public TrafficReplayer(string path) throws GLib.Error {
+            this.mapped = new MappedFile(path, false);
+            var bytes = this.mapped.get_bytes();
+            if (bytes.get_size() < TRACE_MAGIC.length
+             || Memory.cmp(bytes.get_data(), TRACE_MAGIC.data, TRACE_MAGIC.length) != 0) {
+                throw new TrafficError.INVALID_TRACE("%s is not a GFlow trace".printf(path));
+            }
+        }
+
+        /**
+         * Replays the values recorded under the given id into the given source
+         */
+        public void add_source(SimpleSource source, string id) {
+            this.sources.insert(id, source);
+        }
+
+        /**
+         * Replays the whole trace in the calling thread and
+         * returns when the last value has been set
+         */
+        public ReplayReport run() throws GLib.Error {
+            var report = new ReplayReport();
+            var bytes = this.mapped.get_bytes();
+            unowned uint8[] data = bytes.get_data();
+            var record_type = new VariantType(TRACE_RECORD_TYPE);
+
+            int64 start = get_monotonic_time();
+            int64 first_timestamp = -1;
+            size_t offset = TRACE_MAGIC.length;
+            while (offset < data.length) {
+                if (offset + 4 > data.length) {
+                    throw new TrafficError.INVALID_TRACE("Truncated record at offset %s".printf(offset.to_string()));
+                }
+                uint32 length = (uint32)data[offset] | (uint32)data[offset+1] << 8
+                              | (uint32)data[offset+2] << 16 | (uint32)data[offset+3] << 24;
+                offset += 4;
+                if (offset + length > data.length) {
+                    throw new TrafficError.INVALID_TRACE("Truncated record at offset %s".printf(offset.to_string()));
+                }
+                var record = new Variant.from_bytes(record_type, new Bytes.from_bytes(bytes, offset, length), false);
+                offset += length;
+
+                int64 timestamp = record.get_child_value(1).get_int64();
+                if (first_timestamp < 0) {
+                    first_timestamp = timestamp;
+                }
+                if (this.speed > 0) {
+                    int64 due = start + (int64)((timestamp - first_timestamp) / this.speed);
+                    int64 now = get_monotonic_time();
+                    if (due > now) {
+                        Thread.usleep((ulong)(due - now));
+                    } else if (now - due > report.max_lag) {
+                        report.max_lag = now - due;
+                    }
+                }
+
+                var source = this.sources.get(record.get_child_value(0).get_string());
+                if (source == null) {
+                    report.n_skipped++;
+                    continue;
+                }
+                var maybe_flow_id = record.get_child_value(2).get_maybe();
+                string? flow_id = maybe_flow_id != null ? maybe_flow_id.get_string() : null;
+                var maybe_value = record.get_child_value(3).get_maybe();
+                GLib.Value? v = null;
+                if (maybe_value != null) {
+                    var variant = maybe_value.get_variant();
+                    // The recorder could not serialize the original value
+                    if (variant.is_of_type(VariantType.UNIT)) {
+                        report.n_skipped++;
+                        continue;
+                    }
+                    GLib.Value converted;
+                    if (!variant_to_value(variant, source.value_type, out converted)) {
+                        report.n_skipped++;
+                        continue;
+                    }
+                    v = converted;
+                }
+
+                int64 set_start = get_monotonic_time();
+                source.set_value(v, flow_id);
+                report.add_latency(get_monotonic_time() - set_start);
+            }
+            report.elapsed = get_monotonic_time() - start;
+            report.finish();
+            return report;
+        }
+    }
+}
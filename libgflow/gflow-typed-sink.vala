@@ -0,0 +1,385 @@
+/********************************************************************
+# Copyright 2014-2022 Daniel 'grindhold' Brendle, 2015 Daniel Espinosa <esodan@gmail.com>
+#
+# This file is part of libgtkflow.
+#
+# libgtkflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+
+
+namespace GFlow {
+    /**
+     * Base class of the {@link SimpleSink}s that receive values
+     * without boxing them
+     *
+     * Values of a linked {@link TypedSource} of the matching kind arrive
+     * through its typed signal, values of any other source are unboxed
+     * once. {@link Dock.changed} is still emitted for handlers that
+     * expect boxed values.
+     */
+    public abstract class TypedSink : SimpleSink {
+        /**
+         * Triggers when a linked source passes null
+         *
+         * The last value that arrived stays available.
+         */
+        public signal void reset(string? flow_id);
+
+        protected TypedSink(GLib.Type type) {
+            base.with_type(type);
+        }
+
+        /**
+         * Connects to the typed signal of the given source. Returns
+         * false if the source does not pass values of this sink's kind.
+         */
+        protected abstract bool connect_typed(TypedSource s);
+
+        /**
+         * Disconnects from the typed signal of the given source. Returns
+         * false if the source does not pass values of this sink's kind.
+         */
+        protected abstract bool disconnect_typed(TypedSource s);
+
+        /**
+         * Emits the typed signal of this sink with the current value
+         */
+        protected abstract void emit_typed(string? flow_id);
+
+        /**
+         * Stores the given boxed value as the current value. Returns
+         * false if the value holds nothing to store.
+         */
+        protected abstract bool from_value(GLib.Value v);
+
+        /**
+         * Boxes the current value
+         */
+        protected abstract GLib.Value to_value();
+
+        protected override void attach_source(Source s) {
+            var typed = s as TypedSource;
+            if (typed != null && this.connect_typed(typed)) {
+                typed.reset.connect(this.receive_reset);
+            } else {
+                base.attach_source(s);
+            }
+        }
+
+        protected override void detach_source(Source s) {
+            var typed = s as TypedSource;
+            if (typed != null && this.disconnect_typed(typed)) {
+                typed.reset.disconnect(this.receive_reset);
+            } else {
+                base.detach_source(s);
+            }
+        }
+
+        protected override void deliver(Value? source_value, string? flow_id) {
+            if (source_value != null && this.from_value(source_value)) {
+                this.emit_typed(flow_id);
+            } else {
+                this.reset(flow_id);
+            }
+            base.deliver(source_value, flow_id);
+        }
+
+        /**
+         * Passes on a value that a subclass has stored after it
+         * arrived through the typed signal of a source
+         */
+        protected void receive(string? flow_id) {
+            bool profiling = Profiler.active;
+            if (profiling) {
+                Profiler.get_default().enter_sink(this);
+            }
+            this.emit_typed(flow_id);
+            if (has_boxed_handlers(this)) {
+                this.changed(this.to_value(), flow_id);
+            }
+            if (profiling) {
+                Profiler.get_default().leave_sink();
+            }
+        }
+
+        private void receive_reset(string? flow_id) {
+            bool profiling = Profiler.active;
+            if (profiling) {
+                Profiler.get_default().enter_sink(this);
+            }
+            this.reset(flow_id);
+            if (has_boxed_handlers(this)) {
+                this.changed(null, flow_id);
+            }
+            if (profiling) {
+                Profiler.get_default().leave_sink();
+            }
+        }
+    }
+
+    /**
+     * A {@link TypedSink} for double values
+     *
+     * Values of a linked {@link DoubleSource} arrive through
+     * {@link changed_double} without being wrapped into a {@link GLib.Value}.
+     * Values of any other double source are unboxed once. {@link Dock.changed}
+     * is still emitted for handlers that expect boxed values.
+     */
+    public class DoubleSink : TypedSink {
+        private double current = 0;
+
+        /**
+         * Triggers when a linked source passes a new value
+         */
+        public signal void changed_double(double value, string? flow_id);
+
+        public DoubleSink() {
+            base(typeof(double));
+        }
+
+        /**
+         * Returns the last value that arrived at this DoubleSink
+         */
+        public double get_double() {
+            return this.current;
+        }
+
+        protected override bool connect_typed(TypedSource s) {
+            if (!(s is DoubleSource)) {
+                return false;
+            }
+            ((DoubleSource) s).changed_double.connect(this.receive_double);
+            return true;
+        }
+
+        protected override bool disconnect_typed(TypedSource s) {
+            if (!(s is DoubleSource)) {
+                return false;
+            }
+            ((DoubleSource) s).changed_double.disconnect(this.receive_double);
+            return true;
+        }
+
+        protected override void emit_typed(string? flow_id) {
+            this.changed_double(this.current, flow_id);
+        }
+
+        protected override bool from_value(GLib.Value v) {
+            this.current = v.get_double();
+            return true;
+        }
+
+        protected override GLib.Value to_value() {
+            return this.current;
+        }
+
+        private void receive_double(double value, string? flow_id) {
+            this.current = value;
+            this.receive(flow_id);
+        }
+    }
+
+    /**
+     * A {@link TypedSink} for int64 values
+     *
+     * Works like {@link DoubleSink}.
+     */
+    public class Int64Sink : TypedSink {
+        private int64 current = 0;
+
+        /**
+         * Triggers when a linked source passes a new value
+         */
+        public signal void changed_int64(int64 value, string? flow_id);
+
+        public Int64Sink() {
+            base(typeof(int64));
+        }
+
+        /**
+         * Returns the last value that arrived at this Int64Sink
+         */
+        public int64 get_int64() {
+            return this.current;
+        }
+
+        protected override bool connect_typed(TypedSource s) {
+            if (!(s is Int64Source)) {
+                return false;
+            }
+            ((Int64Source) s).changed_int64.connect(this.receive_int64);
+            return true;
+        }
+
+        protected override bool disconnect_typed(TypedSource s) {
+            if (!(s is Int64Source)) {
+                return false;
+            }
+            ((Int64Source) s).changed_int64.disconnect(this.receive_int64);
+            return true;
+        }
+
+        protected override void emit_typed(string? flow_id) {
+            this.changed_int64(this.current, flow_id);
+        }
+
+        protected override bool from_value(GLib.Value v) {
+            this.current = v.get_int64();
+            return true;
+        }
+
+        protected override GLib.Value to_value() {
+            return this.current;
+        }
+
+        private void receive_int64(int64 value, string? flow_id) {
+            this.current = value;
+            this.receive(flow_id);
+        }
+    }
+
+    /**
+     * A {@link TypedSink} for boolean values
+     *
+     * Works like {@link DoubleSink}.
+     */
+    public class BooleanSink : TypedSink {
+        private bool current = false;
+
+        /**
+         * Triggers when a linked source passes a new value
+         */
+        public signal void changed_boolean(bool value, string? flow_id);
+
+        public BooleanSink() {
+            base(typeof(bool));
+        }
+
+        /**
+         * Returns the last value that arrived at this BooleanSink
+         */
+        public bool get_boolean() {
+            return this.current;
+        }
+
+        protected override bool connect_typed(TypedSource s) {
+            if (!(s is BooleanSource)) {
+                return false;
+            }
+            ((BooleanSource) s).changed_boolean.connect(this.receive_boolean);
+            return true;
+        }
+
+        protected override bool disconnect_typed(TypedSource s) {
+            if (!(s is BooleanSource)) {
+                return false;
+            }
+            ((BooleanSource) s).changed_boolean.disconnect(this.receive_boolean);
+            return true;
+        }
+
+        protected override void emit_typed(string? flow_id) {
+            this.changed_boolean(this.current, flow_id);
+        }
+
+        protected override bool from_value(GLib.Value v) {
+            this.current = v.get_boolean();
+            return true;
+        }
+
+        protected override GLib.Value to_value() {
+            return this.current;
+        }
+
+        private void receive_boolean(bool value, string? flow_id) {
+            this.current = value;
+            this.receive(flow_id);
+        }
+    }
+
+    /**
+     * A {@link TypedSink} for arrays of doubles packed into a {@link GLib.Bytes}
+     *
+     * Counterpart of {@link DoubleArraySource}.
+     */
+    public class DoubleArraySink : TypedSink {
+        private Bytes? current = null;
+
+        /**
+         * Triggers when a linked source passes new values
+         */
+        public signal void changed_array(Bytes values, string? flow_id);
+
+        public DoubleArraySink() {
+            base(typeof(Bytes));
+        }
+
+        /**
+         * Returns the last values that arrived at this DoubleArraySink
+         * without copying them
+         */
+        public Bytes? get_bytes() {
+            return this.current;
+        }
+
+        /**
+         * Returns a copy of the last values that arrived at this DoubleArraySink
+         */
+        public double[] get_doubles() {
+            return unpack_doubles(this.current);
+        }
+
+        protected override bool connect_typed(TypedSource s) {
+            if (!(s is DoubleArraySource)) {
+                return false;
+            }
+            ((DoubleArraySource) s).changed_array.connect(this.receive_array);
+            return true;
+        }
+
+        protected override bool disconnect_typed(TypedSource s) {
+            if (!(s is DoubleArraySource)) {
+                return false;
+            }
+            ((DoubleArraySource) s).changed_array.disconnect(this.receive_array);
+            return true;
+        }
+
+        protected override void emit_typed(string? flow_id) {
+            this.changed_array(this.current, flow_id);
+        }
+
+        protected override bool from_value(GLib.Value v) {
+            if (v.get_boxed() == null) {
+                return false;
+            }
+            this.current = (Bytes) v.get_boxed();
+            return true;
+        }
+
+        protected override GLib.Value to_value() {
+            var v = GLib.Value(typeof(Bytes));
+            v.set_boxed(this.current);
+            return v;
+        }
+
+        private void receive_array(Bytes values, string? flow_id) {
+            this.current = values;
+            this.receive(flow_id);
+        }
+    }
+}
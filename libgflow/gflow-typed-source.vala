@@ -0,0 +1,348 @@
+/********************************************************************
+# Copyright 2014-2022 Daniel 'grindhold' Brendle, 2015 Daniel Espinosa <esodan@gmail.com>
+#
+# This file is part of libgtkflow.
+#
+# libgtkflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+
+
+namespace GFlow {
+    /**
+     * Returns true if anything listens to the boxed {@link Dock.changed}
+     * signal of the given dock, so typed docks can skip boxing otherwise
+     */
+    internal bool has_boxed_handlers(Dock d) {
+        return SignalHandler.has_handler_pending(d, Signal.lookup("changed", typeof(Dock)), 0, false);
+    }
+
+    internal void check_value_type(Dock d, GLib.Value v) throws NodeError {
+        if (d.value_type != v.type()) {
+            throw new NodeError.INCOMPATIBLE_VALUE(
+                "Cannot set a %s value to this %s Source".printf(
+                    v.type().name(), d.value_type.name())
+            );
+        }
+    }
+
+    internal Bytes pack_doubles(double[] values) {
+        var data = new uint8[values.length * sizeof(double)];
+        Memory.copy(data, values, data.length);
+        return new Bytes.take((owned) data);
+    }
+
+    internal double[] unpack_doubles(Bytes? packed) {
+        if (packed == null) {
+            return {};
+        }
+        var values = new double[packed.get_size() / sizeof(double)];
+        Memory.copy(values, packed.get_data(), values.length * sizeof(double));
+        return values;
+    }
+
+    /**
+     * Base class of the {@link SimpleSource}s that pass their values
+     * on without boxing them
+     *
+     * Subclasses store the value in a field of its own type and emit
+     * it through a signal of that type. A boxed value is only created
+     * if something listens to {@link Dock.changed} or when
+     * {@link get_last_value} is called.
+     */
+    public abstract class TypedSource : SimpleSource {
+        private bool has_value = false;
+
+        /**
+         * Triggers when this source is set to null
+         *
+         * Linked {@link TypedSink}s listen to this instead of
+         * {@link Dock.changed}, so they learn that the value is gone.
+         */
+        public signal void reset(string? flow_id);
+
+        protected TypedSource(GLib.Type type) {
+            base.with_type(type);
+        }
+
+        /**
+         * Emits the typed signal of this source with the current value
+         */
+        protected abstract void emit_typed(string? flow_id);
+
+        /**
+         * Stores the given boxed value as the current value. Returns
+         * false if the value holds nothing to store.
+         */
+        protected abstract bool from_value(GLib.Value v);
+
+        /**
+         * Boxes the current value
+         */
+        protected abstract GLib.Value to_value();
+
+        /**
+         * Passes on the current value after a subclass has stored it
+         */
+        protected void pass_on(string? flow_id) {
+            this.has_value = true;
+            if (Profiler.active) {
+                Profiler.get_default().record_emission(this, flow_id);
+            }
+            this.emit_typed(flow_id);
+            if (has_boxed_handlers(this)) {
+                this.changed(this.to_value(), flow_id);
+            }
+        }
+
+        /**
+         * {@inheritDoc}
+         */
+        public override void set_value(GLib.Value? v, string? flow_id = null) throws GLib.Error {
+            if (v != null) {
+                check_value_type(this, v);
+                if (this.from_value(v)) {
+                    this.pass_on(flow_id);
+                    return;
+                }
+            }
+            this.has_value = false;
+            base.set_value(v, flow_id);
+            this.reset(flow_id);
+        }
+
+        /**
+         * {@inheritDoc}
+         */
+        public override GLib.Value? get_last_value() {
+            if (!this.has_value) {
+                return null;
+            }
+            return this.to_value();
+        }
+    }
+
+    /**
+     * A {@link TypedSource} for double values
+     *
+     * Values set with {@link set_double} reach a linked {@link DoubleSink}
+     * through {@link changed_double} without being wrapped into a
+     * {@link GLib.Value}. A boxed value is only created if something
+     * listens to {@link Dock.changed}, e.g. a plain {@link SimpleSink},
+     * or when {@link get_last_value} is called.
+     */
+    public class DoubleSource : TypedSource {
+        private double current = 0;
+
+        /**
+         * Triggers when the value of this source changes
+         */
+        public signal void changed_double(double value, string? flow_id);
+
+        public DoubleSource() {
+            base(typeof(double));
+        }
+
+        /**
+         * Set the value of this DoubleSource
+         */
+        public void set_double(double value, string? flow_id = null) {
+            this.current = value;
+            this.pass_on(flow_id);
+        }
+
+        /**
+         * Returns the last value of this DoubleSource
+         */
+        public double get_double() {
+            return this.current;
+        }
+
+        protected override void emit_typed(string? flow_id) {
+            this.changed_double(this.current, flow_id);
+        }
+
+        protected override bool from_value(GLib.Value v) {
+            this.current = v.get_double();
+            return true;
+        }
+
+        protected override GLib.Value to_value() {
+            return this.current;
+        }
+    }
+
+    /**
+     * A {@link TypedSource} for int64 values
+     *
+     * Works like {@link DoubleSource}.
+     */
+    public class Int64Source : TypedSource {
+        private int64 current = 0;
+
+        /**
+         * Triggers when the value of this source changes
+         */
+        public signal void changed_int64(int64 value, string? flow_id);
+
+        public Int64Source() {
+            base(typeof(int64));
+        }
+
+        /**
+         * Set the value of this Int64Source
+         */
+        public void set_int64(int64 value, string? flow_id = null) {
+            this.current = value;
+            this.pass_on(flow_id);
+        }
+
+        /**
+         * Returns the last value of this Int64Source
+         */
+        public int64 get_int64() {
+            return this.current;
+        }
+
+        protected override void emit_typed(string? flow_id) {
+            this.changed_int64(this.current, flow_id);
+        }
+
+        protected override bool from_value(GLib.Value v) {
+            this.current = v.get_int64();
+            return true;
+        }
+
+        protected override GLib.Value to_value() {
+            return this.current;
+        }
+    }
+
+    /**
+     * A {@link TypedSource} for boolean values
+     *
+     * Works like {@link DoubleSource}.
+     */
+    public class BooleanSource : TypedSource {
+        private bool current = false;
+
+        /**
+         * Triggers when the value of this source changes
+         */
+        public signal void changed_boolean(bool value, string? flow_id);
+
+        public BooleanSource() {
+            base(typeof(bool));
+        }
+
+        /**
+         * Set the value of this BooleanSource
+         */
+        public void set_boolean(bool value, string? flow_id = null) {
+            this.current = value;
+            this.pass_on(flow_id);
+        }
+
+        /**
+         * Returns the last value of this BooleanSource
+         */
+        public bool get_boolean() {
+            return this.current;
+        }
+
+        protected override void emit_typed(string? flow_id) {
+            this.changed_boolean(this.current, flow_id);
+        }
+
+        protected override bool from_value(GLib.Value v) {
+            this.current = v.get_boolean();
+            return true;
+        }
+
+        protected override GLib.Value to_value() {
+            return this.current;
+        }
+    }
+
+    /**
+     * A {@link TypedSource} for arrays of doubles
+     *
+     * The doubles are packed into a single {@link GLib.Bytes}, which is
+     * also the type of this source. Passing the array on only adds a
+     * reference, and bindings receive one buffer instead of a list of
+     * boxed numbers.
+     */
+    public class DoubleArraySource : TypedSource {
+        private Bytes? current = null;
+
+        /**
+         * Triggers when the values of this source change
+         */
+        public signal void changed_array(Bytes values, string? flow_id);
+
+        public DoubleArraySource() {
+            base(typeof(Bytes));
+        }
+
+        /**
+         * Packs the given values and sets them to this DoubleArraySource
+         */
+        public void set_doubles(double[] values, string? flow_id = null) {
+            this.set_bytes(pack_doubles(values), flow_id);
+        }
+
+        /**
+         * Sets doubles that have already been packed in native byte order
+         */
+        public void set_bytes(Bytes values, string? flow_id = null) {
+            this.current = values;
+            this.pass_on(flow_id);
+        }
+
+        /**
+         * Returns the last values of this DoubleArraySource without copying them
+         */
+        public Bytes? get_bytes() {
+            return this.current;
+        }
+
+        /**
+         * Returns a copy of the last values of this DoubleArraySource
+         */
+        public double[] get_doubles() {
+            return unpack_doubles(this.current);
+        }
+
+        protected override void emit_typed(string? flow_id) {
+            this.changed_array(this.current, flow_id);
+        }
+
+        protected override bool from_value(GLib.Value v) {
+            if (v.get_boxed() == null) {
+                this.current = null;
+                return false;
+            }
+            this.current = (Bytes) v.get_boxed();
+            return true;
+        }
+
+        protected override GLib.Value to_value() {
+            var v = GLib.Value(typeof(Bytes));
+            v.set_boxed(this.current);
+            return v;
+        }
+    }
+}
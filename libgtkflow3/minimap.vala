@@ -39,6 +39,15 @@ namespace GtkFlow {
         private int rubber_width = 0;
         private int rubber_height = 0;
         private bool move_rubber = false;
+
+        /**
+         * Cached rendering of all node rectangles. It is only redrawn when
+         * the extents, positions or colors of the nodes differ from the ones
+         * recorded in node_layer_key.
+         */
+        private Cairo.Surface? node_layer = null;
+        private int[] node_layer_key = {};
+
         /**
          * The nodeview that this Minimap should depict
          *
@@ -152,19 +161,18 @@ namespace GtkFlow {
                     offset_y = (own_alloc.height - height ) / 2;
                 }
                 this.ratio = (double) nv_alloc.width / width;
-                foreach(Node n in this._nodeview.get_nodes()) {
-                    Gtk.Allocation alloc;
-                    n.get_allocation(out alloc);
-                    cr.save();
-                    if (n.highlight_color != null) {
-                        cr.set_source_rgba(n.highlight_color.red,n.highlight_color.green,n.highlight_color.blue,0.5);
-                    } else {
-                        cr.set_source_rgba(0.4,0.4,0.4,0.5);
-                    }
-                    cr.rectangle(offset_x + alloc.x/ratio, offset_y + alloc.y/ratio, alloc.width/ratio, alloc.height/ratio);
-                    cr.fill();
-                    cr.restore();
+                var key = this.calculate_node_layer_key(own_alloc, nv_alloc);
+                if (this.node_layer == null || !this.node_layer_key_equals(key)) {
+                    this.node_layer = cr.get_target().create_similar(
+                        Cairo.Content.COLOR_ALPHA, own_alloc.width, own_alloc.height
+                    );
+                    this.draw_node_layer(new Cairo.Context(this.node_layer));
+                    this.node_layer_key = key;
                 }
+                cr.save();
+                cr.set_source_surface(this.node_layer, 0, 0);
+                cr.paint();
+                cr.restore();
                 if (this._scrolledwindow != null) {
                     Gtk.Allocation sw_alloc;
                     this._scrolledwindow.get_allocation(out sw_alloc);
@@ -182,6 +190,62 @@ namespace GtkFlow {
             return true;
         }
 
+        /**
+         * Draws the rectangles of all nodes onto the given context
+         */
+        private void draw_node_layer(Cairo.Context cr) {
+            foreach(Node n in this._nodeview.get_nodes()) {
+                Gtk.Allocation alloc;
+                n.get_allocation(out alloc);
+                if (n.highlight_color != null) {
+                    cr.set_source_rgba(n.highlight_color.red,n.highlight_color.green,n.highlight_color.blue,0.5);
+                } else {
+                    cr.set_source_rgba(0.4,0.4,0.4,0.5);
+                }
+                cr.rectangle(offset_x + alloc.x/ratio, offset_y + alloc.y/ratio, alloc.width/ratio, alloc.height/ratio);
+                cr.fill();
+            }
+        }
+
+        /**
+         * Collects everything that the node layer depends on. Comparing
+         * these values is a lot cheaper than filling all node rectangles
+         * on every scroll of the viewport.
+         */
+        private int[] calculate_node_layer_key(Gtk.Allocation own_alloc, Gtk.Allocation nv_alloc) {
+            int[] key = {own_alloc.width, own_alloc.height, nv_alloc.width, nv_alloc.height};
+            foreach(Node n in this._nodeview.get_nodes()) {
+                Gtk.Allocation alloc;
+                n.get_allocation(out alloc);
+                key += alloc.x;
+                key += alloc.y;
+                key += alloc.width;
+                key += alloc.height;
+                if (n.highlight_color != null) {
+                    key += (int)(n.highlight_color.red * 255);
+                    key += (int)(n.highlight_color.green * 255);
+                    key += (int)(n.highlight_color.blue * 255);
+                } else {
+                    key += -1;
+                    key += -1;
+                    key += -1;
+                }
+            }
+            return key;
+        }
+
+        private bool node_layer_key_equals(int[] key) {
+            if (key.length != this.node_layer_key.length) {
+                return false;
+            }
+            for (int i = 0; i < key.length; i++) {
+                if (key[i] != this.node_layer_key[i]) {
+                    return false;
+                }
+            }
+            return true;
+        }
+
         /**
          * Internal method to initialize this NodeView as a {@link Gtk.Widget}
          */
@@ -61,6 +61,26 @@ namespace GtkFlow {
         // The connector that is being used to draw a non-established connection
         private Gtk.Allocation? temp_connector = null;
 
+        // The connectors of all nodes, to draw them and to find the one under the pointer
+        private ConnectorIndex connector_index = new ConnectorIndex();
+        // The sources whose connectors have to be computed again
+        private ConnectorUpdates connector_updates = new ConnectorUpdates();
+        // The allocations of the nodes that their connectors have been computed for
+        private HashTable<Node, Gtk.Allocation?> connector_allocations =
+            new HashTable<Node, Gtk.Allocation?>(direct_hash, direct_equal);
+        // The connector under the pointer
+        private Connector? hovered_connector = null;
+        // The connector that has been clicked last
+        private Connector? selected_connector = null;
+        // How far away from a connector the pointer may be to hit it
+        private const double CONNECTOR_TOLERANCE = 6.0;
+
+        /**
+         * Emitted when a connector has been clicked or
+         * the selection has been cleared by the user
+         */
+        public signal void connector_selected(GFlow.Source? source, GFlow.Sink? sink);
+
         /**
          * Connect to this signal if you wish to set custom colors for the
          * connectors depending on what values they transport. Whenever
@@ -103,6 +123,22 @@ namespace GtkFlow {
          */
         public bool allow_recursion {get; set; default=false;}
 
+        /**
+         * Determines whether nodes glide to the positions that
+         * a {@link Layout} computes instead of jumping there
+         */
+        public bool animate_layout {get; set; default=true;}
+
+        /**
+         * Triggered when a layout has finished or has been cancelled
+         */
+        public signal void layout_finished(bool completed);
+
+        // The layout that is running right now and the nodes it moves
+        private LayoutRun? layout_run = null;
+        private Node[] layout_nodes = {};
+        private uint layout_tick = 0;
+
         /**
          * A string that is displayed at the center of the NodeView
          * When no nodes are displayed. You can use it to e.g display
@@ -130,10 +166,13 @@ namespace GtkFlow {
             });
 
             this.set_size_request(100,100);
+            this.connector_updates.changed.connect(this.queue_draw);
             this.draw.connect((cr)=>{ return this.do_draw(cr); });
             this.motion_notify_event.connect((e)=>{ return this.do_motion_notify_event(e); });
             this.button_press_event.connect((e)=>{ return this.do_button_press_event(e); });
             this.button_release_event.connect((e)=>{ return this.do_button_release_event(e); });
+            this.key_press_event.connect((e)=>{ return this.do_key_press_event(e); });
+            this.can_focus = true;
 
             Gtk.StyleContext sc = this.get_style_context();
             Gdk.RGBA fg = sc.get_color(Gtk.StateFlags.NORMAL);
@@ -146,6 +185,7 @@ namespace GtkFlow {
             if (this.nodes.index(n) == -1) {
                 this.nodes.insert(n,0);
                 n.node_view = this;
+                this.connector_updates.watch(n.gnode);
             }
             this.queue_draw();
             n.set_parent(this);
@@ -154,6 +194,7 @@ namespace GtkFlow {
         private void render_all() {
             foreach (Node n in this.nodes)
                 n.render_all();
+            this.connector_updates.invalidate_all();
             this.queue_draw();
         }
 
@@ -206,6 +247,8 @@ namespace GtkFlow {
                 default:
                     throw new NodeRendererError.NOT_A_NODE_RENDERER("This is not a valid node renderer");
             }
+            // The docks of the new renderer are placed differently
+            this.connector_updates.invalidate_node(gn);
             this.queue_draw();
         }
 
@@ -243,10 +286,83 @@ namespace GtkFlow {
 
         /**
          * Autolayout this graph
+         *
+         * The layout is computed on a worker thread from a copy of the
+         * current positions and sizes of the nodes, so this returns right
+         * away and the nodeview keeps handling input. The nodes move to
+         * the intermediate positions of the layout once per frame.
+         * A layout that is still running is cancelled.
          */
         public void layout(Layout l) {
-            var passnodes = this.nodes.copy();
-            l.arrange(passnodes);
+            this.cancel_layout();
+            var index = new HashTable<GFlow.Node, int>(direct_hash, direct_equal);
+            Node[] nodes = {};
+            double[] x = {}, y = {}, width = {}, height = {};
+            foreach (Node n in this.nodes) {
+                Gtk.Allocation alloc;
+                n.get_allocation(out alloc);
+                index.insert(n.gnode, nodes.length);
+                nodes += n;
+                x += alloc.x;
+                y += alloc.y;
+                width += alloc.width;
+                height += alloc.height;
+            }
+            int[] edges = {};
+            for (int i = 0; i < nodes.length; i++) {
+                foreach (GFlow.Source src in nodes[i].gnode.get_sources()) {
+                    foreach (GFlow.Sink snk in src.sinks) {
+                        if (snk.node != null && index.contains(snk.node)) {
+                            edges += i;
+                            edges += index.get(snk.node);
+                        }
+                    }
+                }
+            }
+            var run = new LayoutRun(l, new LayoutGraph(x, y, width, height, edges));
+            try {
+                run.start();
+            } catch (GLib.Error e) {
+                warning("Could not start the layout: %s", e.message);
+                return;
+            }
+            this.layout_run = run;
+            this.layout_nodes = nodes;
+            this.layout_tick = this.add_tick_callback(this.step_layout);
+        }
+
+        /**
+         * Stops a running layout and leaves the nodes where they are
+         */
+        public void cancel_layout() {
+            if (this.layout_run == null)
+                return;
+            this.layout_run.cancel();
+            this.remove_tick_callback(this.layout_tick);
+            this.finish_layout(false);
+        }
+
+        private bool step_layout(Gtk.Widget w, Gdk.FrameClock clock) {
+            bool running = this.layout_run.step(this.animate_layout);
+            for (int i = 0; i < this.layout_nodes.length; i++) {
+                this.layout_nodes[i].set_position(
+                    (int)Math.round(this.layout_run.shown_x[i]),
+                    (int)Math.round(this.layout_run.shown_y[i])
+                );
+            }
+            this.allocate_minimum();
+            this.queue_draw();
+            if (running)
+                return GLib.Source.CONTINUE;
+            this.finish_layout(true);
+            return GLib.Source.REMOVE;
+        }
+
+        private void finish_layout(bool completed) {
+            this.layout_run = null;
+            this.layout_nodes = {};
+            this.layout_tick = 0;
+            this.layout_finished(completed);
         }
 
         /**
@@ -283,11 +399,15 @@ namespace GtkFlow {
          * Remove a {@link GFlow.Node}  from this NodeView
          */
         public void remove_node(GFlow.Node n) {
+            // The running layout would keep moving the removed node
+            this.cancel_layout();
             n.unlink_all();
             Node gn = this.get_node_from_gflow_node(n);
             gn.forall_internal(true, (c)=>{c.destroy();});
             if (this.nodes.index(gn) != -1) {
                 this.nodes.remove(gn);
+                this.connector_updates.unwatch(n);
+                this.connector_allocations.remove(gn);
                 gn.node_view = null;
                 assert (gn is Gtk.Widget);
                 ((Gtk.Widget)gn).destroy();
@@ -402,6 +522,15 @@ namespace GtkFlow {
                 this.drag_diff_y = (int)this.drag_start_y - alloc.y;
             } else {
                 this.unselect_all();
+                var connector = this.connector_index.pick(e.x, e.y, CONNECTOR_TOLERANCE);
+                if (connector != null) {
+                    this.selected_connector = connector;
+                    this.grab_focus();
+                    this.connector_selected(connector.source, connector.sink);
+                    this.queue_draw();
+                    return true;
+                }
+                this.unselect_connector();
                 this.rubber_alloc = {(int)e.x, (int)e.y, 0, 0};
                 this.rubber_start_x = (int)e.x;
                 this.rubber_start_y = (int)e.y;
@@ -409,6 +538,67 @@ namespace GtkFlow {
             return false;
         }
 
+        private bool do_key_press_event(Gdk.EventKey e) {
+            if (!this.editable || this.selected_connector == null)
+                return false;
+            if (e.keyval == Gdk.Key.Delete || e.keyval == Gdk.Key.BackSpace) {
+                this.remove_selected_connector();
+                return true;
+            }
+            return false;
+        }
+
+        /**
+         * Finds the connector at the given point
+         *
+         * Returns false if there is no connector close enough
+         * to the point.
+         */
+        public bool pick_connector(double x, double y, out GFlow.Source? source, out GFlow.Sink? sink) {
+            var connector = this.connector_index.pick(x, y, CONNECTOR_TOLERANCE);
+            source = connector != null ? connector.source : null;
+            sink = connector != null ? connector.sink : null;
+            return connector != null;
+        }
+
+        /**
+         * Retrieves the connector that the user has selected
+         *
+         * Returns false if no connector is selected.
+         */
+        public bool get_selected_connector(out GFlow.Source? source, out GFlow.Sink? sink) {
+            source = this.selected_connector != null ? this.selected_connector.source : null;
+            sink = this.selected_connector != null ? this.selected_connector.sink : null;
+            return this.selected_connector != null;
+        }
+
+        /**
+         * Clears the selection of connectors
+         */
+        public void unselect_connector() {
+            if (this.selected_connector == null)
+                return;
+            this.selected_connector = null;
+            this.connector_selected(null, null);
+            this.queue_draw();
+        }
+
+        /**
+         * Unlinks the docks of the selected connector
+         */
+        public void remove_selected_connector() {
+            var connector = this.selected_connector;
+            if (connector == null)
+                return;
+            this.unselect_connector();
+            try {
+                connector.source.unlink(connector.sink);
+            } catch (GLib.Error e) {
+                warning("Could not remove the connector: %s", e.message);
+            }
+            this.queue_draw();
+        }
+
         /**
          * Every currently selected node is being unselected
          */
@@ -599,6 +789,15 @@ namespace GtkFlow {
                     this.get_window().set_cursor(null);
             }
 
+            // Highlight the connector under the pointer
+            Connector? hovered = null;
+            if (n == null && this.drag_dock == null && this.rubber_alloc == null)
+                hovered = this.connector_index.pick(e.x, e.y, CONNECTOR_TOLERANCE);
+            if (hovered != this.hovered_connector) {
+                this.hovered_connector = hovered;
+                this.queue_draw();
+            }
+
             // Check if the cursor has been dragged a few pixels (defined by DRAG_THRESHOLD)
             // If yes, actually start dragging
             if ( ( this.drag_node != null || this.drag_dock != null || this.resize_node != null)
@@ -894,6 +1093,122 @@ namespace GtkFlow {
             return alloc;
         }
 
+        /**
+         * Draws the hovered and the selected connector on top of the others
+         */
+        private void draw_connector_highlights(Cairo.Context cr) {
+            // Connectors are replaced whenever their nodes move,
+            // the ones that vanished are forgotten
+            if (this.hovered_connector != null) {
+                this.hovered_connector = this.connector_index.find(
+                    this.hovered_connector.source, this.hovered_connector.sink
+                );
+            }
+            if (this.selected_connector != null) {
+                this.selected_connector = this.connector_index.find(
+                    this.selected_connector.source, this.selected_connector.sink
+                );
+            }
+            cr.save();
+            cr.set_line_width(4.0);
+            if (this.hovered_connector != null && this.hovered_connector != this.selected_connector) {
+                double r=0, g=0, b=0;
+                GLib.Value? v = this.hovered_connector.source.get_last_value();
+                this.hex2col(v != null ? color_calculation(v) : default_connector_color, out r, out g, out b);
+                cr.set_source_rgba(r,g,b,1.0);
+                this.append_connector(cr, this.hovered_connector);
+                cr.stroke();
+            }
+            if (this.selected_connector != null) {
+                cr.set_source_rgba(0.0, 0.4, 1.0, 1.0);
+                this.append_connector(cr, this.selected_connector);
+                cr.stroke();
+            }
+            cr.restore();
+        }
+
+        private void append_connector(Cairo.Context cr, Connector connector) {
+            for (int i = 0; i < connector.segments.length; i += 4) {
+                var p = Connector.get_curve(
+                    connector.segments[i], connector.segments[i+1],
+                    connector.segments[i+2], connector.segments[i+3]
+                );
+                cr.move_to(p[0], p[1]);
+                cr.curve_to(p[2], p[3], p[4], p[5], p[6], p[7]);
+            }
+        }
+
+        /**
+         * Calculates the position of the given dock of the given node
+         */
+        private bool get_dock_position(Node n, GFlow.Dock d, out int x, out int y) {
+            Gtk.Allocation alloc;
+            n.get_allocation(out alloc);
+            return n.node_renderer.get_dock_position(
+                d, n.get_dock_renderers(), (int)n.border_width, alloc, out x, out y, n.title
+            );
+        }
+
+        /**
+         * Computes the connectors of the sources whose nodes moved
+         * or whose links changed since the last frame
+         */
+        private void update_connectors() {
+            // The nodes are drawn in every frame anyway, comparing their
+            // allocations is cheap next to placing their docks
+            foreach (Node n in this.nodes) {
+                Gtk.Allocation alloc;
+                n.get_allocation(out alloc);
+                var old = this.connector_allocations.get(n);
+                if (old == null || old.x != alloc.x || old.y != alloc.y
+                 || old.width != alloc.width || old.height != alloc.height) {
+                    this.connector_allocations.insert(n, alloc);
+                    this.connector_updates.invalidate_node(n.gnode);
+                }
+            }
+            if (!this.connector_updates.is_stale()) {
+                return;
+            }
+            bool all;
+            var stale = this.connector_updates.take_stale(out all);
+            if (all) {
+                this.connector_index.clear();
+            }
+            foreach (GFlow.Source source in stale) {
+                this.update_source_connectors(source);
+            }
+        }
+
+        private void update_source_connectors(GFlow.Source source) {
+            this.connector_index.remove_source(source);
+            if (!source.is_linked() || source.node == null) {
+                return;
+            }
+            Node? n = this.get_node_from_gflow_node(source.node);
+            if (n == null) {
+                return;
+            }
+            int source_pos_x = 0, source_pos_y = 0;
+            if (!this.get_dock_position(n, source, out source_pos_x, out source_pos_y)) {
+                warning("No dock on position. Ommiting connector");
+                return;
+            }
+            foreach(GFlow.Sink sink in source.sinks) {
+                Node? sink_node = sink.node != null ? this.get_node_from_gflow_node(sink.node) : null;
+                if (sink_node == null) {
+                    continue;
+                }
+                int sink_pos_x = 0, sink_pos_y = 0;
+                if (!this.get_dock_position(sink_node, sink, out sink_pos_x, out sink_pos_y)) {
+                    warning("No dock on position. Ommiting connector");
+                    continue;
+                }
+                this.connector_index.add(new Connector(
+                    source, sink, source_pos_x, source_pos_y, sink_pos_x, sink_pos_y
+                ));
+            }
+        }
+
         private bool do_draw(Cairo.Context cr) {
             Gtk.StyleContext sc = this.get_style_context();
             Gtk.Allocation nv_alloc;
@@ -942,63 +1257,27 @@ namespace GtkFlow {
             }
             this.nodes.reverse();
             // Draw connectors
-            foreach (Node n in this.nodes) {
-                foreach(GFlow.Source source in n.gnode.get_sources()) {
-                    Gtk.Allocation alloc;
-                    n.get_allocation(out alloc);
-                    int source_pos_x = 0, source_pos_y = 0;
-                    if (!n.node_renderer.get_dock_position(
-                            source,
-                            n.get_dock_renderers(),
-                            (int)n.border_width,
-                            alloc, out source_pos_x, out source_pos_y,
-                            n.title)) {
-                        warning("No dock on position. Ommiting connector");
-                        continue;
-                    }
-                    Gdk.Point source_pos = {source_pos_x,source_pos_y};
-                    foreach(GFlow.Sink sink in source.sinks) {
-                        // Don't draw the connection to a sink if we are dragging it
-                        if (sink == this.drag_dock && source == sink.sources.last().nth_data(0))
-                            continue;
-                        Node? sink_node = this.get_node_from_gflow_node(sink.node);
-                        sink_node.get_allocation(out alloc);
-                        int sink_pos_x = 0, sink_pos_y = 0;
-                        if (!sink_node.node_renderer.get_dock_position(
-                                sink,
-                                sink_node.get_dock_renderers(),
-                                (int)sink_node.border_width,
-                                alloc, out sink_pos_x, out sink_pos_y,
-                                sink_node.title )) {
-                            warning("No dock on position. Ommiting connector");
-                            continue;
-                        }
-                        Gdk.Point sink_pos = {sink_pos_x,sink_pos_y};
-                        int w = sink_pos.x - source_pos.x;
-                        int h = sink_pos.y - source_pos.y;
-                        cr.save();
-
-                        double r=0, g=0, b=0;
-                        if (source != null && source.get_last_value() != null) {
-                            string hexcol = color_calculation(source.get_last_value());
-                            this.hex2col(hexcol ,out r, out g, out b);
-                            cr.set_source_rgba(r,g,b,1.0);
-                        } else {
-                            this.hex2col(default_connector_color ,out r, out g, out b);
-                        }
-                        cr.set_source_rgba(r,g,b,1.0);
+            this.update_connectors();
+            this.connector_index.foreach_connector((c) => {
+                // Don't draw the connection to a sink if we are dragging it
+                if (c.sink == this.drag_dock && c.source == c.sink.sources.last().nth_data(0))
+                    return;
+                cr.save();
 
-                        cr.move_to(source_pos.x, source_pos.y);
-                        if (w > 0) {
-                            cr.rel_curve_to(w/3,0,2*w/3,h,w,h);
-                        } else {
-                            cr.rel_curve_to(-w/3,0,1.3*w,h,w,h);
-                        }
-                        cr.stroke();
-                        cr.restore();
-                    }
+                double r=0, g=0, b=0;
+                if (c.source.get_last_value() != null) {
+                    string hexcol = color_calculation(c.source.get_last_value());
+                    this.hex2col(hexcol ,out r, out g, out b);
+                } else {
+                    this.hex2col(default_connector_color ,out r, out g, out b);
                 }
-            }
+                cr.set_source_rgba(r,g,b,1.0);
+
+                this.append_connector(cr, c);
+                cr.stroke();
+                cr.restore();
+            });
+            this.draw_connector_highlights(cr);
             // Draw temporary connector if any
             if (this.temp_connector != null) {
                 int w = this.temp_connector.width;
@@ -1053,6 +1332,17 @@ namespace GtkFlow {
             return (uint)int.parse( (col*255.0d).to_string() ).abs();
         }
 
+        /**
+         * {@inheritDoc}
+         */
+        public override void dispose() {
+            this.cancel_layout();
+            this.connector_updates.clear();
+            this.connector_index.clear();
+            this.connector_allocations.remove_all();
+            base.dispose();
+        }
+
         /**
          * Internal method to initialize this NodeView as a {@link Gtk.Widget}
          */
@@ -1070,6 +1360,7 @@ namespace GtkFlow {
                  | Gdk.EventMask.POINTER_MOTION_MASK
                  | Gdk.EventMask.BUTTON_PRESS_MASK
                  | Gdk.EventMask.BUTTON_RELEASE_MASK
+                 | Gdk.EventMask.KEY_PRESS_MASK
                  | Gdk.EventMask.LEAVE_NOTIFY_MASK;
             Gdk.WindowAttributesType mask = Gdk.WindowAttributesType.X
                  | Gdk.WindowAttributesType.X
@@ -43,11 +43,22 @@ namespace GtkFlow {
          * Requires the programmer to pass a {@link GFlow.Dock} to
          * the d-parameter.
          */
+        private ulong[] handlers = {};
+
         public Dock(GFlow.Dock d, Gtk.Align label_alignment=Gtk.Align.FILL) {
-            this.d = d;
-            this.d.unlinked.connect(()=>{this.queue_draw();});
-            this.d.linked.connect(()=>{this.queue_draw();});
+            this.init_widget();
+            this.attach(d);
+        }
 
+        /**
+         * Creates a Dock that does not display anything until
+         * {@link retarget} gives it a {@link GFlow.Dock}
+         */
+        internal Dock.unbound() {
+            this.init_widget();
+        }
+
+        private void init_widget() {
             this.valign = Gtk.Align.CENTER;
             this.halign = Gtk.Align.CENTER;
             this.margin_start = 8;
@@ -58,7 +69,46 @@ namespace GtkFlow {
             this.ctr_click = new Gtk.GestureClick();
             this.add_controller(this.ctr_click);
             this.ctr_click.pressed.connect((n, x, y) => { this.press_button(n,x,y); });
-            this.d.changed.connect(this.cb_changed);
+        }
+
+        private void attach(GFlow.Dock d) {
+            this.d = d;
+            this.handlers += this.d.unlinked.connect(()=>{this.queue_draw();});
+            this.handlers += this.d.linked.connect(()=>{this.queue_draw();});
+            this.handlers += this.d.changed.connect(this.cb_changed);
+            this.handlers += this.d.notify["highlight"].connect(()=>{this.queue_draw();});
+        }
+
+        /**
+         * Lets this widget display another {@link GFlow.Dock}, so rows
+         * of a list can reuse their widgets
+         */
+        internal void retarget(GFlow.Dock d) {
+            if (this.d == d && this.handlers.length > 0) {
+                return;
+            }
+            this.release();
+            this.last_value = null;
+            if (this.shows_mapped_tooltip) {
+                this.tooltip_text = null;
+                this.shows_mapped_tooltip = false;
+            }
+            this.attach(d);
+            this.queue_draw();
+        }
+
+        /**
+         * Disconnects this widget from its {@link GFlow.Dock}, so that
+         * it can be freed while the dock lives on
+         */
+        internal void release() {
+            if (this.d == null) {
+                return;
+            }
+            foreach (ulong handler in this.handlers) {
+                SignalHandler.disconnect(this.d, handler);
+            }
+            this.handlers = {};
         }
 
         private GtkFlow.NodeView? get_nodeview() {
@@ -74,18 +124,33 @@ namespace GtkFlow {
             }
         }
 
+        /**
+         * Whether the tooltip currently describes a {@link GFlow.MappedValue}
+         */
+        private bool shows_mapped_tooltip = false;
+
         private void cb_changed(Value? value = null, string? flow_id = null) {
             var nv = this.get_nodeview();
             if (nv == null) {
                 warning("Could not react to dock change: no nodeview");
                 return;
             }
+            bool mapped = value != null && value.holds(typeof(GFlow.MappedValue)) && value.get_object() != null;
             if (value != null) {
+                // For file backed payloads this only adds a reference
                 this.last_value = GLib.Value(value.type());
                 value.copy(ref this.last_value);
             } else {
                 this.last_value = null;
             }
+            if (mapped) {
+                this.tooltip_text = ((GFlow.MappedValue)value.get_object()).to_string();
+                this.shows_mapped_tooltip = true;
+            } else if (this.shows_mapped_tooltip) {
+                // Only the tooltip that describes the last payload is taken away
+                this.tooltip_text = null;
+                this.shows_mapped_tooltip = false;
+            }
             nv.queue_draw();
             this.queue_draw();
         }
@@ -105,6 +170,9 @@ namespace GtkFlow {
         }
 
         protected override void snapshot (Gtk.Snapshot sn) {
+            if (this.d == null) {
+                return;
+            }
             var nv = this.get_nodeview();
             if (nv == null) {
                 warning("Dock could not snapshot: no nodeview");
@@ -113,8 +181,13 @@ namespace GtkFlow {
             var rect = Graphene.Rect().init(0,0,16, 16);
             var rrect = Gsk.RoundedRect().init_from_rect(rect, 8f);
             Gdk.RGBA color = {0.5f,0.5f,0.5f,1.0f};
-            Gdk.RGBA[] border_color = {color,color,color,color};
             float[] thicc = {1f,1f,1f,1f};
+            if (this.d.highlight) {
+                // A connector that is being dragged can be dropped here
+                color = {0.2f,0.6f,1.0f,1.0f};
+                thicc = {2f,2f,2f,2f};
+            }
+            Gdk.RGBA[] border_color = {color,color,color,color};
             sn.append_border(rrect, thicc, border_color);
             base.snapshot(sn);
             var cr = sn.append_cairo(rect);
@@ -129,9 +202,12 @@ namespace GtkFlow {
                     dot_color = this.resolve_color(this, this.last_value);
                 } else if (this.d is GFlow.Sink && this.d.is_linked()) {
                     var sink = (GFlow.Sink) this.d;
-                    var sourcedock = nv.retrieve_dock(sink.sources.nth_data(0));
+                    var source = sink.sources.nth_data(0);
+                    var sourcedock = nv.retrieve_dock(source);
                     if (sourcedock != null) {
                         dot_color = sourcedock.resolve_color(this, this.last_value);
+                    } else {
+                        dot_color = nv.resolve_dock_color(source);
                     }
                 }
                 thicc = {8f, 8f, 8f, 8f};
@@ -149,12 +225,15 @@ namespace GtkFlow {
         }
 
         private void press_button(int n_clicked, double x, double y) {
+            if (this.d == null) {
+                return;
+            }
             var nv = this.get_nodeview();
             if (nv == null) {
                 warning("Dock could not process button press: no nodeview");
                 return;
             }
-            nv.start_temp_connector(this);
+            nv.start_temp_connector(this.d);
             nv.queue_allocate();
         }
 
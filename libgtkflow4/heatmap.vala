@@ -0,0 +1,237 @@
+/********************************************************************
+# Copyright 2014-2022 Daniel 'grindhold' Brendle
+#
+# This file is part of libgtkflow.
+#
+# libgtkflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+namespace GtkFlow {
+    /**
+     * The measurement that the heatmap overlay of a {@link NodeView} displays
+     */
+    public enum HeatmapMode {
+        /**
+         * The overlay is disabled
+         */
+        NONE,
+        /**
+         * Nodes are tinted by the time spent in their handlers
+         */
+        COMPUTE_TIME,
+        /**
+         * Nodes are tinted by the rate at which their sinks receive values
+         */
+        CHANGED_RATE
+    }
+
+    /**
+     * Exponential moving averages of the values of one node or source
+     */
+    private class HeatmapEntry {
+        public int64 last_total = -1;
+        public double average = 0;
+        /**
+         * The sample in which this entry has last been updated
+         */
+        public uint generation = 0;
+
+        /**
+         * Adds the growth of the given counter since the last sample
+         * to the average and returns the new average
+         */
+        public double update(int64 total, double seconds, double decay) {
+            if (this.last_total >= 0 && seconds > 0) {
+                double rate = (total - this.last_total) / seconds;
+                this.average = decay * this.average + (1 - decay) * rate;
+            }
+            this.last_total = total;
+            return this.average;
+        }
+    }
+
+    /**
+     * Samples the {@link GFlow.Profiler} periodically and turns the
+     * results into node tints and connector widths
+     */
+    private class Heatmap {
+        private const double MAX_WIDTH_FACTOR = 4.0;
+
+        private HashTable<GFlow.Node, HeatmapEntry> nodes
+            = new HashTable<GFlow.Node, HeatmapEntry>(direct_hash, direct_equal);
+        private HashTable<GFlow.Source, HeatmapEntry> sources
+            = new HashTable<GFlow.Source, HeatmapEntry>(direct_hash, direct_equal);
+        /**
+         * The highlight colors that nodes had before the heatmap tinted them
+         */
+        private HashTable<NodeRenderer, Gdk.RGBA?> original_colors
+            = new HashTable<NodeRenderer, Gdk.RGBA?>(direct_hash, direct_equal);
+        /**
+         * The highlight colors that the heatmap has last given to nodes
+         */
+        private HashTable<NodeRenderer, Gdk.RGBA?> applied_colors
+            = new HashTable<NodeRenderer, Gdk.RGBA?>(direct_hash, direct_equal);
+        private double max_throughput = 0;
+        private int64 last_sample = 0;
+        private uint generation = 0;
+
+        public Heatmap() {
+            // Only the counters are needed, which stay bounded by
+            // the size of the graph however long the overlay is on
+            GFlow.Profiler.hold_counters();
+        }
+
+        private HeatmapEntry get_entry<T>(HashTable<T, HeatmapEntry> table, T key) {
+            var entry = table.get(key);
+            if (entry == null) {
+                entry = new HeatmapEntry();
+                table.insert(key, entry);
+            }
+            entry.generation = this.generation;
+            return entry;
+        }
+
+        private static bool same_color(Gdk.RGBA? a, Gdk.RGBA? b) {
+            if (a == null || b == null) {
+                return a == b;
+            }
+            return a.equal(b);
+        }
+
+        /**
+         * Returns true if the given renderer has a highlight color
+         * that the heatmap can tint
+         */
+        private static bool can_tint(NodeRenderer r) {
+            return r is Node || r is LightNode;
+        }
+
+        private static Gdk.RGBA? get_color(NodeRenderer r) {
+            if (r is Node) {
+                return ((Node)r).highlight_color;
+            } else if (r is LightNode) {
+                return ((LightNode)r).highlight_color;
+            }
+            return null;
+        }
+
+        private static void set_color(NodeRenderer r, Gdk.RGBA? color) {
+            if (r is Node) {
+                ((Node)r).highlight_color = color;
+            } else if (r is LightNode) {
+                ((LightNode)r).highlight_color = color;
+            }
+        }
+
+        /**
+         * Updates the averages of all nodes of the given view and tints them
+         */
+        public void sample(NodeView nv, HeatmapMode mode, double decay) {
+            var profiler = GFlow.Profiler.get_default();
+            int64 now = get_monotonic_time();
+            double seconds = this.last_sample > 0 ? (now - this.last_sample) / 1000000.0 : 0;
+            this.last_sample = now;
+            this.generation++;
+
+            double max_value = 0;
+            this.max_throughput = 0;
+            var c = nv.get_first_child();
+            while (c != null) {
+                var gn = ((NodeRenderer)c).n;
+                int64 total = 0;
+                if (mode == HeatmapMode.COMPUTE_TIME) {
+                    var stats = profiler.get_node_stats(gn);
+                    total = stats != null ? stats.self_time : 0;
+                } else {
+                    foreach (GFlow.Sink sink in gn.get_sinks()) {
+                        total += profiler.get_changed_count(sink);
+                    }
+                }
+                max_value = double.max(max_value, get_entry(this.nodes, gn).update(total, seconds, decay));
+                foreach (GFlow.Source src in gn.get_sources()) {
+                    double throughput = get_entry(this.sources, src).update(
+                        profiler.get_changed_count(src), seconds, decay
+                    );
+                    this.max_throughput = double.max(this.max_throughput, throughput);
+                }
+                c = c.get_next_sibling();
+            }
+            // Forget the nodes that have left the view since the last sample
+            this.nodes.foreach_remove((n, entry) => entry.generation != this.generation);
+            this.sources.foreach_remove((src, entry) => entry.generation != this.generation);
+            this.original_colors.foreach_remove((node, color) => node.get_parent() != nv);
+            this.applied_colors.foreach_remove((node, color) => node.get_parent() != nv);
+
+            c = nv.get_first_child();
+            while (c != null) {
+                var node = c as NodeRenderer;
+                if (node != null && can_tint(node)) {
+                    double heat = max_value > 0 ? this.nodes.get(node.n).average / max_value : 0;
+                    this.tint(node, heat);
+                }
+                c = c.get_next_sibling();
+            }
+        }
+
+        private void tint(NodeRenderer node, double heat) {
+            // A color that someone else has set since the last sample
+            // is the one to go back to when the node cools down
+            Gdk.RGBA? current = get_color(node);
+            if (!this.applied_colors.contains(node)
+             || !same_color(current, this.applied_colors.get(node))) {
+                this.original_colors.insert(node, current);
+            }
+            Gdk.RGBA? color;
+            if (heat < 0.01) {
+                color = this.original_colors.get(node);
+            } else {
+                // From a faint yellow for cold nodes to a strong red for the hottest one
+                color = {1.0f, (float)(1.0 - heat), 0.0f, (float)(0.15 + 0.45 * heat)};
+            }
+            set_color(node, color);
+            this.applied_colors.insert(node, color);
+        }
+
+        /**
+         * Returns the factor that the width of the connectors
+         * leaving the given source is scaled with
+         */
+        public double get_width_factor(GFlow.Source src) {
+            var entry = this.sources.get(src);
+            if (entry == null || this.max_throughput <= 0) {
+                return 1.0;
+            }
+            double factor = 1.0 + (MAX_WIDTH_FACTOR - 1.0) * entry.average / this.max_throughput;
+            // Quantize, so connectors of similar throughput can share a stroke
+            return Math.round(factor * 2) / 2;
+        }
+
+        /**
+         * Gives all nodes their original highlight color back,
+         * unless it has been changed since the heatmap set it
+         */
+        public void restore() {
+            this.original_colors.foreach((node, color) => {
+                if (same_color(get_color(node), this.applied_colors.get(node))) {
+                    set_color(node, color);
+                }
+            });
+            this.original_colors.remove_all();
+            this.applied_colors.remove_all();
+            GFlow.Profiler.release_counters();
+        }
+    }
+}
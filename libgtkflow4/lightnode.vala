@@ -0,0 +1,741 @@
+/********************************************************************
+# Copyright 2014-2022 Daniel 'grindhold' Brendle
+#
+# This file is part of libgtkflow.
+#
+# libgtkflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+namespace GtkFlow {
+    /**
+     * A dock drawn by a {@link LightNode} together with its cached label
+     */
+    private class LightDock {
+        public GFlow.Dock d;
+        public Pango.Layout label;
+        public Value? last_value = null;
+        /**
+         * The row of the node that this dock is drawn in
+         */
+        public int row;
+        private unowned LightNode owner;
+        private ulong[] handlers = {};
+
+        public LightDock(LightNode owner, GFlow.Dock d, int row) {
+            this.owner = owner;
+            this.d = d;
+            this.row = row;
+            this.label = owner.create_pango_layout(d.name);
+            this.handlers += d.changed.connect(this.cb_changed);
+            this.handlers += d.linked.connect(this.cb_linked);
+            this.handlers += d.unlinked.connect(this.cb_unlinked);
+            this.handlers += d.notify["name"].connect(this.cb_name);
+            this.handlers += d.notify["highlight"].connect(this.cb_highlight);
+        }
+
+        public void detach() {
+            foreach (ulong handler in this.handlers) {
+                SignalHandler.disconnect(this.d, handler);
+            }
+            this.handlers = {};
+        }
+
+        private void cb_changed(Value? value = null, string? flow_id = null) {
+            if (value != null) {
+                this.last_value = GLib.Value(value.type());
+                value.copy(ref this.last_value);
+            } else {
+                this.last_value = null;
+            }
+            this.owner.queue_draw();
+        }
+
+        private void cb_linked(GFlow.Dock d) {
+            this.owner.queue_draw();
+        }
+
+        private void cb_unlinked(GFlow.Dock d, bool last) {
+            this.owner.queue_draw();
+        }
+
+        private void cb_highlight() {
+            this.owner.queue_draw();
+        }
+
+        private void cb_name() {
+            this.label.set_text(this.d.name ?? "", -1);
+            this.owner.invalidate_rows();
+        }
+    }
+
+    /**
+     * A lightweight node representation
+     *
+     * A {@link NodeRenderer} that does not create any child widgets.
+     * Title, docks and labels are drawn directly in the snapshot from
+     * cached Pango layouts and all hit-testing happens inside this widget.
+     * Use this instead of {@link Node} for graphs with many nodes that
+     * don't need custom widgets in their nodes.
+     */
+    public class LightNode : Gtk.Widget, NodeRenderer {
+        private const double DRAG_THRESHOLD = 5.0;
+        private const int MARGIN_DEFAULT = 10;
+        private const int DOCK_SIZE = 16;
+        private const int DOCK_PADDING_X = 8;
+        private const int DOCK_PADDING_Y = 4;
+        private const int SPACING = 5;
+        private const int RESIZE_AREA = 16;
+
+        private static string CSS = "
+        .gtkflow_lightnode {
+            background: rgba(0.6, 0.6, 0.6, 0.2);
+            border-radius: 5px;
+            border: 1px solid rgba(128, 128, 128, 0.8);
+            box-shadow: 2px 2px 3px 3px rgba(153, 153, 153, 0.5);
+        }
+
+        .gtkflow_lightnode_marked {
+            background: rgba(0, 51, 128, 0.8);
+            border-radius: 5px;
+            border: 1px solid rgba(0, 51, 128, 0.8);
+            box-shadow: 2px 2px 3px 3px rgba(0, 51, 153, 0.5);
+        }
+        ";
+
+        private static Gtk.CssProvider? css = null;
+        private static List<unowned Gdk.Display> css_displays;
+
+        /**
+         * Installs the shared provider once for every display instead
+         * of once for every node
+         */
+        private static void init(Gdk.Display display) {
+            if (LightNode.css == null) {
+                LightNode.css = new Gtk.CssProvider();
+                LightNode.css.load_from_data(LightNode.CSS.data);
+            }
+            if (LightNode.css_displays.find(display) != null) {
+                return;
+            }
+            Gtk.StyleContext.add_provider_for_display(
+                display, LightNode.css, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
+            );
+            LightNode.css_displays.prepend(display);
+        }
+
+        construct {
+            set_css_name("gtkflow_node");
+
+            this.notify["marked"].connect(this.marked_changed);
+            this.notify["highlight-color"].connect(this.highlight_color_changed);
+        }
+
+        public GFlow.Node n {get; protected set;}
+
+        /**
+         * {@inheritDoc}
+         */
+        public bool marked {get; internal set;}
+
+        /**
+         * A color that the node is tinted with, e.g. to point
+         * out nodes in the {@link Minimap}
+         */
+        public Gdk.RGBA? highlight_color {get; set; default=null;}
+
+        /**
+         * {@inheritDoc}
+         */
+        public double click_offset_x {get; protected set; default=0;}
+        /**
+         * {@inheritDoc}
+         */
+        public double click_offset_y {get; protected set; default=0;}
+        /**
+         * {@inheritDoc}
+         */
+        public double resize_start_width {get; protected set; default=0;}
+        /**
+         * {@inheritDoc}
+         */
+        public double resize_start_height {get; protected set; default=0;}
+
+        public signal void position_changed(int old_x, int old_y, int new_x, int new_y);
+        public signal void size_changed(int old_width, int old_height, int new_width, int new_height);
+
+        /**
+         * Request for the color of the connections that leave a dock
+         *
+         * Counterpart of {@link Dock.resolve_color} for docks that are
+         * drawn by this node. Use {@link GLib.Signal.connect_after} to
+         * let your application decide what color to use.
+         */
+        public signal Gdk.RGBA resolve_color(GFlow.Dock d, Value? v) {
+            return {0.0f,0.0f,0.0f,1.0f};
+        }
+
+        private int margin = 0;
+        private Pango.Layout title_layout;
+        private Pango.Layout delete_layout;
+        private GenericArray<LightDock> sinks = new GenericArray<LightDock>();
+        private GenericArray<LightDock> sources = new GenericArray<LightDock>();
+        /**
+         * The docks of this node by the {@link GFlow.Dock} they draw
+         */
+        private HashTable<GFlow.Dock, LightDock> dock_map
+            = new HashTable<GFlow.Dock, LightDock>(direct_hash, direct_equal);
+        /**
+         * The height of the title and of the dock rows or -1 if they
+         * have to be measured again
+         */
+        private int cached_title_height = -1;
+        private int cached_row_height = -1;
+
+        private Gtk.GestureDrag drag_gesture;
+        private double drag_start_x;
+        private double drag_start_y;
+        private bool drag_active;
+        private bool allow_drag;
+        private bool delete_pressed;
+
+        private int previous_x;
+        private int previous_y;
+        private int previous_width;
+        private int previous_height;
+
+        /**
+         * Instantiate a new lightweight node
+         *
+         * You are required to pass a {@link GFlow.Node} to this constructor.
+         */
+        public LightNode(GFlow.Node n) {
+            this.with_margin(n, MARGIN_DEFAULT);
+        }
+
+        public LightNode.with_margin(GFlow.Node n, int margin) {
+            this.n = n;
+            this.margin = margin;
+            this.add_css_class("gtkflow_lightnode");
+
+            this.title_layout = this.create_pango_layout(null);
+            this.update_title();
+            this.delete_layout = this.create_pango_layout("×");
+
+            foreach (GFlow.Sink s in n.get_sinks()) {
+                this.sink_added(s);
+            }
+            foreach (GFlow.Source s in n.get_sources()) {
+                this.source_added(s);
+            }
+            this.n.sink_added.connect(this.sink_added);
+            this.n.sink_removed.connect(this.sink_removed);
+            this.n.source_added.connect(this.source_added);
+            this.n.source_removed.connect(this.source_removed);
+            this.n.notify["name"].connect(this.update_title);
+
+            this.drag_gesture = new Gtk.GestureDrag();
+            this.add_controller(this.drag_gesture);
+            this.drag_gesture.drag_begin.connect(this.on_drag_begin);
+            this.drag_gesture.drag_update.connect(this.on_drag_update);
+            this.drag_gesture.drag_end.connect(this.on_drag_end);
+
+            var motion_controller = new Gtk.EventControllerMotion();
+            motion_controller.motion.connect(this.hover_over);
+            this.add_controller(motion_controller);
+        }
+
+        protected override void realize() {
+            LightNode.init(this.get_display());
+            base.realize();
+        }
+
+        protected override void dispose() {
+            this.n.sink_added.disconnect(this.sink_added);
+            this.n.sink_removed.disconnect(this.sink_removed);
+            this.n.source_added.disconnect(this.source_added);
+            this.n.source_removed.disconnect(this.source_removed);
+            this.n.notify["name"].disconnect(this.update_title);
+            foreach (LightDock ld in this.sinks) {
+                ld.detach();
+            }
+            foreach (LightDock ld in this.sources) {
+                ld.detach();
+            }
+            this.sinks = new GenericArray<LightDock>();
+            this.sources = new GenericArray<LightDock>();
+            this.dock_map.remove_all();
+            base.dispose();
+        }
+
+        private void update_title() {
+            this.title_layout.set_markup("<b>%s</b>".printf(Markup.escape_text(this.n.name ?? "")), -1);
+            this.invalidate_rows();
+        }
+
+        /**
+         * Measures the title and the dock rows again the next time
+         * they are needed, e.g. after a label has changed
+         */
+        internal void invalidate_rows() {
+            this.cached_title_height = -1;
+            this.cached_row_height = -1;
+            this.queue_resize();
+        }
+
+        private void add_dock(GenericArray<LightDock> docks, GFlow.Dock d) {
+            var ld = new LightDock(this, d, (int)docks.length);
+            docks.add(ld);
+            this.dock_map.insert(d, ld);
+            this.invalidate_rows();
+        }
+
+        private void sink_added(GFlow.Sink s) {
+            this.add_dock(this.sinks, s);
+        }
+
+        private void source_added(GFlow.Source s) {
+            this.add_dock(this.sources, s);
+        }
+
+        private void sink_removed(GFlow.Sink s) {
+            this.remove_dock(this.sinks, s);
+        }
+
+        private void source_removed(GFlow.Source s) {
+            this.remove_dock(this.sources, s);
+        }
+
+        private void remove_dock(GenericArray<LightDock> docks, GFlow.Dock d) {
+            var ld = this.dock_map.get(d);
+            if (ld == null) {
+                return;
+            }
+            ld.detach();
+            this.dock_map.remove(d);
+            docks.remove_index(ld.row);
+            // The docks below move up by one row
+            for (uint i = ld.row; i < docks.length; i++) {
+                docks[i].row = (int)i;
+            }
+            this.invalidate_rows();
+        }
+
+        /**
+         * Always null, as this renderer has no {@link Dock} widgets
+         */
+        public Dock? retrieve_dock(GFlow.Dock d) {
+            return null;
+        }
+
+        /**
+         * {@inheritDoc}
+         */
+        public int get_margin() {
+            return this.margin;
+        }
+
+        public void remove() {
+            var nv = this.get_parent() as NodeView;
+            nv.remove(this);
+        }
+
+        /**
+         * {@inheritDoc}
+         */
+        public new void set_parent(Gtk.Widget w) {
+            if (!(w is NodeView)) {
+                warning("Trying to add a GtkFlow.LightNode to something that is not a GtkFlow.NodeView!");
+                return;
+            }
+            base.set_parent(w);
+        }
+
+        /**
+         * Programmatically set a node's position
+         */
+        public void set_position(int x, int y) {
+            var nodeview = this.get_parent() as NodeView;
+            if (nodeview == null) {
+                warning("Node is not a child of a NodeView");
+                return;
+            }
+            var layout_child = nodeview.layout_manager.get_layout_child(this) as NodeViewLayoutChild;
+            layout_child.x = x;
+            layout_child.y = y;
+        }
+
+        public void get_position(out int x, out int y) {
+            var nodeview = this.get_parent() as NodeView;
+            if (nodeview == null) {
+                x = 0;
+                y = 0;
+                warning("Node is not a child of a NodeView");
+                return;
+            }
+            var layout_child = nodeview.layout_manager.get_layout_child(this) as NodeViewLayoutChild;
+            x = layout_child.x;
+            y = layout_child.y;
+        }
+
+        private int title_height() {
+            if (this.cached_title_height < 0) {
+                int w, h;
+                this.title_layout.get_pixel_size(out w, out h);
+                this.cached_title_height = h;
+            }
+            return this.cached_title_height;
+        }
+
+        private int row_height() {
+            if (this.cached_row_height >= 0) {
+                return this.cached_row_height;
+            }
+            int height = DOCK_SIZE + 2 * DOCK_PADDING_Y;
+            int w, h;
+            foreach (LightDock ld in this.sinks) {
+                ld.label.get_pixel_size(out w, out h);
+                height = int.max(height, h);
+            }
+            foreach (LightDock ld in this.sources) {
+                ld.label.get_pixel_size(out w, out h);
+                height = int.max(height, h);
+            }
+            this.cached_row_height = height;
+            return height;
+        }
+
+        private int n_rows() {
+            return (int)uint.max(this.sinks.length, this.sources.length);
+        }
+
+        private int row_y(int row) {
+            return this.margin + this.title_height() + SPACING + row * (this.row_height() + SPACING);
+        }
+
+        /**
+         * Returns the rectangle that the circle of the given dock is drawn in
+         */
+        private bool dock_rect(GFlow.Dock d, out Graphene.Rect rect) {
+            rect = Graphene.Rect().init(0, 0, DOCK_SIZE, DOCK_SIZE);
+            var ld = this.dock_map.get(d);
+            if (ld == null) {
+                return false;
+            }
+            float y = this.row_y(ld.row) + (this.row_height() - DOCK_SIZE) / 2;
+            float x = this.margin + DOCK_PADDING_X;
+            if (d is GFlow.Source) {
+                x = this.get_width() - this.margin - DOCK_PADDING_X - DOCK_SIZE;
+            }
+            rect = Graphene.Rect().init(x, y, DOCK_SIZE, DOCK_SIZE);
+            return true;
+        }
+
+        private Gdk.Rectangle delete_area() {
+            int w, h;
+            this.delete_layout.get_pixel_size(out w, out h);
+            return {this.get_width() - this.margin - w, this.margin, w, h};
+        }
+
+        private Gdk.Rectangle resize_area() {
+            return {
+                this.get_width() - RESIZE_AREA,
+                this.get_height() - RESIZE_AREA,
+                RESIZE_AREA,
+                RESIZE_AREA
+            };
+        }
+
+        protected override Gtk.SizeRequestMode get_request_mode() {
+            return Gtk.SizeRequestMode.CONSTANT_SIZE;
+        }
+
+        protected override void measure(Gtk.Orientation o, int for_size, out int min, out int pref, out int min_base, out int pref_base) {
+            int w, h;
+            if (o == Gtk.Orientation.HORIZONTAL) {
+                this.title_layout.get_pixel_size(out w, out h);
+                int dw, dh;
+                this.delete_layout.get_pixel_size(out dw, out dh);
+                int width = w + SPACING + dw;
+                int dock_width = DOCK_SIZE + 2 * DOCK_PADDING_X;
+                for (int i = 0; i < this.n_rows(); i++) {
+                    int row_width = 0;
+                    if (i < this.sinks.length) {
+                        this.sinks[i].label.get_pixel_size(out w, out h);
+                        row_width += dock_width + w;
+                    }
+                    if (i < this.sources.length) {
+                        this.sources[i].label.get_pixel_size(out w, out h);
+                        row_width += dock_width + w;
+                    }
+                    width = int.max(width, row_width + SPACING);
+                }
+                min = pref = width + 2 * this.margin;
+            } else {
+                min = pref = this.row_y(this.n_rows()) - SPACING + this.margin;
+            }
+            min_base = -1;
+            pref_base = -1;
+        }
+
+        protected override void snapshot(Gtk.Snapshot sn) {
+            int width = this.get_width();
+            if (this.highlight_color != null) {
+                sn.append_color(
+                    this.highlight_color,
+                    Graphene.Rect().init(0, 0, width, this.get_height())
+                );
+            }
+            var fg = this.get_style_context().get_color();
+
+            this.draw_layout(sn, this.title_layout, this.margin, this.margin, fg);
+            var delete_area = this.delete_area();
+            this.draw_layout(sn, this.delete_layout, delete_area.x, delete_area.y, fg);
+
+            int row_height = this.row_height();
+            int w, h;
+            for (int i = 0; i < this.sinks.length; i++) {
+                var ld = this.sinks[i];
+                this.draw_dock(sn, ld);
+                ld.label.get_pixel_size(out w, out h);
+                this.draw_layout(
+                    sn, ld.label,
+                    this.margin + DOCK_SIZE + 2 * DOCK_PADDING_X,
+                    this.row_y(i) + (row_height - h) / 2, fg
+                );
+            }
+            for (int i = 0; i < this.sources.length; i++) {
+                var ld = this.sources[i];
+                this.draw_dock(sn, ld);
+                ld.label.get_pixel_size(out w, out h);
+                this.draw_layout(
+                    sn, ld.label,
+                    width - this.margin - DOCK_SIZE - 2 * DOCK_PADDING_X - w,
+                    this.row_y(i) + (row_height - h) / 2, fg
+                );
+            }
+        }
+
+        private void draw_layout(Gtk.Snapshot sn, Pango.Layout layout, int x, int y, Gdk.RGBA color) {
+            sn.save();
+            sn.translate(Graphene.Point().init(x, y));
+            sn.append_layout(layout, color);
+            sn.restore();
+        }
+
+        private void draw_dock(Gtk.Snapshot sn, LightDock ld) {
+            Graphene.Rect rect;
+            if (!this.dock_rect(ld.d, out rect)) {
+                return;
+            }
+            var rrect = Gsk.RoundedRect().init_from_rect(rect, DOCK_SIZE / 2);
+            Gdk.RGBA color = {0.5f,0.5f,0.5f,1.0f};
+            float[] thicc = {1f,1f,1f,1f};
+            if (ld.d.highlight) {
+                color = {0.2f,0.6f,1.0f,1.0f};
+                thicc = {2f,2f,2f,2f};
+            }
+            Gdk.RGBA[] border_color = {color,color,color,color};
+            sn.append_border(rrect, thicc, border_color);
+            if (!ld.d.is_linked()) {
+                return;
+            }
+            Gdk.RGBA dot_color = {0.0f,0.0f,0.0f,1.0f};
+            if (ld.d is GFlow.Source) {
+                dot_color = this.resolve_color(ld.d, ld.last_value);
+            } else {
+                var nv = this.get_parent() as NodeView;
+                if (nv != null) {
+                    dot_color = nv.resolve_dock_color(((GFlow.Sink)ld.d).sources.nth_data(0));
+                }
+            }
+            var dot = Graphene.Rect().init(rect.origin.x + 4, rect.origin.y + 4, 8, 8);
+            sn.push_rounded_clip(Gsk.RoundedRect().init_from_rect(dot, 4));
+            sn.append_color(dot_color, dot);
+            sn.pop();
+        }
+
+        /**
+         * {@inheritDoc}
+         */
+        public bool get_dock_anchor(GFlow.Dock d, out double x, out double y) {
+            Graphene.Rect rect;
+            if (!this.dock_rect(d, out rect)) {
+                x = 0;
+                y = 0;
+                return false;
+            }
+            x = rect.origin.x + DOCK_SIZE / 2;
+            y = rect.origin.y + DOCK_SIZE / 2;
+            return true;
+        }
+
+        /**
+         * {@inheritDoc}
+         */
+        public Gdk.RGBA resolve_dock_color(GFlow.Dock d) {
+            var ld = this.dock_map.get(d);
+            if (ld == null) {
+                return {0.0f,0.0f,0.0f,1.0f};
+            }
+            return this.resolve_color(ld.d, ld.last_value);
+        }
+
+        /**
+         * {@inheritDoc}
+         */
+        public GFlow.Dock? pick_dock(double x, double y) {
+            foreach (LightDock ld in this.sinks) {
+                if (this.dock_hit(ld.d, x, y)) {
+                    return ld.d;
+                }
+            }
+            foreach (LightDock ld in this.sources) {
+                if (this.dock_hit(ld.d, x, y)) {
+                    return ld.d;
+                }
+            }
+            return null;
+        }
+
+        private bool dock_hit(GFlow.Dock d, double x, double y) {
+            Graphene.Rect rect;
+            if (!this.dock_rect(d, out rect)) {
+                return false;
+            }
+            // Accept clicks slightly off the circle, like the margins of a Dock widget
+            return x >= rect.origin.x - DOCK_PADDING_Y && x <= rect.origin.x + DOCK_SIZE + DOCK_PADDING_Y
+                && y >= rect.origin.y - DOCK_PADDING_Y && y <= rect.origin.y + DOCK_SIZE + DOCK_PADDING_Y;
+        }
+
+        private void marked_changed() {
+            if (this.marked) {
+                this.add_css_class("gtkflow_lightnode_marked");
+            } else {
+                this.remove_css_class("gtkflow_lightnode_marked");
+            }
+        }
+
+        private void highlight_color_changed() {
+            this.queue_draw();
+            var nv = this.get_parent() as NodeView;
+            if (nv != null) {
+                nv.draw_minimap();
+            }
+        }
+
+        private void hover_over(double x, double y) {
+            if (!this.n.resizable || this.drag_active) {
+                return;
+            }
+            if (this.resize_area().contains_point((int)x, (int)y)) {
+                this.set_cursor_from_name("nwse-resize");
+            } else {
+                this.set_cursor_from_name("default");
+            }
+        }
+
+        private void on_drag_begin(double start_x, double start_y) {
+            this.allow_drag = false;
+            this.drag_active = false;
+            this.delete_pressed = false;
+            this.drag_start_x = start_x;
+            this.drag_start_y = start_y;
+
+            var node_view = this.get_parent() as NodeView;
+            if (node_view == null) return;
+
+            var d = this.pick_dock(start_x, start_y);
+            if (d != null) {
+                // The nodeview finishes the connector when the button is released
+                node_view.start_temp_connector(d);
+                node_view.queue_allocate();
+                return;
+            }
+            if (this.delete_area().contains_point((int)start_x, (int)start_y)) {
+                this.delete_pressed = true;
+                return;
+            }
+
+            this.allow_drag = true;
+
+            node_view.bring_node_to_front(this);
+
+            var layout_child = node_view.layout_manager.get_layout_child(this) as NodeViewLayoutChild;
+            this.previous_x = layout_child.x;
+            this.previous_y = layout_child.y;
+            this.previous_width = this.get_width();
+            this.previous_height = this.get_height();
+        }
+
+        private void on_drag_update(double offset_x, double offset_y) {
+            var node_view = this.get_parent() as NodeView;
+            if (node_view == null || !this.allow_drag || this.drag_active) {
+                return;
+            }
+
+            bool in_resize_zone = this.n.resizable
+                && this.resize_area().contains_point((int)this.drag_start_x, (int)this.drag_start_y);
+            if (!in_resize_zone
+             && Math.fabs(offset_x) < DRAG_THRESHOLD && Math.fabs(offset_y) < DRAG_THRESHOLD) {
+                return;
+            }
+
+            this.drag_active = true;
+            this.click_offset_x = this.drag_start_x;
+            this.click_offset_y = this.drag_start_y;
+            if (in_resize_zone) {
+                node_view.resize_node = this;
+                this.resize_start_width = this.get_width();
+                this.resize_start_height = this.get_height();
+            } else {
+                node_view.move_node = this;
+                this.set_cursor_from_name("move");
+            }
+        }
+
+        private void on_drag_end(double offset_x, double offset_y) {
+            this.set_cursor_from_name("default");
+
+            if (this.delete_pressed) {
+                this.delete_pressed = false;
+                if (this.delete_area().contains_point(
+                        (int)(this.drag_start_x + offset_x), (int)(this.drag_start_y + offset_y))) {
+                    this.remove();
+                }
+                return;
+            }
+            if (!this.allow_drag) return;
+
+            var node_view = this.get_parent() as NodeView;
+            if (node_view == null) return;
+
+            node_view.move_node = null;
+            node_view.resize_node = null;
+            this.drag_active = false;
+
+            node_view.queue_resize();
+            node_view.queue_allocate();
+
+            var layout_child = node_view.layout_manager.get_layout_child(this) as NodeViewLayoutChild;
+            if (this.previous_x != layout_child.x || this.previous_y != layout_child.y) {
+                this.position_changed(this.previous_x, this.previous_y, layout_child.x, layout_child.y);
+            }
+            if (this.previous_width != this.get_width() || this.previous_height != this.get_height()) {
+                this.size_changed(this.previous_width, this.previous_height, this.get_width(), this.get_height());
+            }
+        }
+    }
+}
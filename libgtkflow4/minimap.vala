@@ -39,6 +39,16 @@ namespace GtkFlow {
         private int rubber_width = 0;
         private int rubber_height = 0;
         private bool move_rubber = false;
+
+        /**
+         * Cached rendering of all node rectangles. Scrolling the viewport
+         * only has to draw the viewport rectangle on top of it.
+         */
+        private Gsk.RenderNode? node_layer = null;
+        private int node_layer_width = -1;
+        private int node_layer_height = -1;
+        private int node_layer_nv_width = -1;
+        private int node_layer_nv_height = -1;
         
         /**
          * The nodeview that this Minimap should depict
@@ -77,12 +87,10 @@ namespace GtkFlow {
                         warning("MiniMap: could not find parent ScrolledWindow for NodeView!");
                     }
             
-                    this.draw_signal = this._nodeview.draw_minimap.connect(() => {
-                        this.queue_draw();
-                    });
+                    this.draw_signal = this._nodeview.draw_minimap.connect(this.invalidate_node_layer);
                 }
             
-                this.queue_draw();
+                this.invalidate_node_layer();
             }
         }
         
@@ -100,6 +108,11 @@ namespace GtkFlow {
             return null;
         }
 
+        private void invalidate_node_layer() {
+            this.node_layer = null;
+            this.queue_draw();
+        }
+
         private Gtk.EventControllerMotion ctr_motion;
         private Gtk.GestureClick ctr_click;
 
@@ -167,25 +180,19 @@ namespace GtkFlow {
                     offset_y = (own_alloc.height - height ) / 2;
                 }
                 this.ratio = (double) nv_alloc.width / width;
-                var child = this.nodeview.get_first_child();
-                while (child != null) {
-                    var n = (Node)child;
-                    Gtk.Allocation alloc;
-                    n.get_allocation(out alloc);
-                    Gdk.RGBA color;
-                    if (n.highlight_color != null) {
-                        color = n.highlight_color;
-                    } else {
-                        color = {0.4f,0.4f,0.4f,0.5f};
-                    }
-                    rect = Graphene.Rect().init(
-                        (int)(offset_x + alloc.x/ratio),
-                        (int)(offset_y + alloc.y/ratio),
-                        (int)(alloc.width/ratio),
-                        (int)(alloc.height/ratio)
-                    );
-                    sn.append_color(color, rect);
-                    child = child.get_next_sibling();
+                if (this.node_layer == null
+                 || this.node_layer_width != own_alloc.width
+                 || this.node_layer_height != own_alloc.height
+                 || this.node_layer_nv_width != nv_alloc.width
+                 || this.node_layer_nv_height != nv_alloc.height) {
+                    this.node_layer = this.build_node_layer();
+                    this.node_layer_width = own_alloc.width;
+                    this.node_layer_height = own_alloc.height;
+                    this.node_layer_nv_width = nv_alloc.width;
+                    this.node_layer_nv_height = nv_alloc.height;
+                }
+                if (this.node_layer != null) {
+                    sn.append_node(this.node_layer);
                 }
                 if (this._scrolledwindow != null) {
                     Gtk.Allocation sw_alloc;
@@ -202,5 +209,48 @@ namespace GtkFlow {
                 }
             }
         }
+
+        /**
+         * Renders the rectangles of all nodes into a reusable render node
+         */
+        private Gsk.RenderNode? build_node_layer() {
+            var sn = new Gtk.Snapshot();
+            var child = this._nodeview.get_first_child();
+            while (child != null) {
+                Graphene.Rect alloc;
+                if (!child.compute_bounds(this._nodeview, out alloc)) {
+                    child = child.get_next_sibling();
+                    continue;
+                }
+                Gdk.RGBA color = {0.4f,0.4f,0.4f,0.5f};
+                if (child is Node && ((Node)child).highlight_color != null) {
+                    color = ((Node)child).highlight_color;
+                } else if (child is LightNode && ((LightNode)child).highlight_color != null) {
+                    color = ((LightNode)child).highlight_color;
+                }
+                this.append_node_rect(sn, color, alloc.get_x(), alloc.get_y(), alloc.get_width(), alloc.get_height());
+                child = child.get_next_sibling();
+            }
+            // Nodes of the model that have no widget are drawn from their items
+            this._nodeview.foreach_unrealized_item((item) => {
+                double x, y;
+                this._nodeview.canvas_to_widget(item.x, item.y, out x, out y);
+                this.append_node_rect(
+                    sn, {0.4f,0.4f,0.4f,0.5f}, x, y,
+                    item.width * this._nodeview.zoom, item.height * this._nodeview.zoom
+                );
+            });
+            return sn.to_node();
+        }
+
+        private void append_node_rect(Gtk.Snapshot sn, Gdk.RGBA color, double x, double y, double width, double height) {
+            var rect = Graphene.Rect().init(
+                (int)(offset_x + x/ratio),
+                (int)(offset_y + y/ratio),
+                (int)(width/ratio),
+                (int)(height/ratio)
+            );
+            sn.append_color(color, rect);
+        }
     }
 }
@@ -80,9 +80,74 @@ namespace GtkFlow {
          * had been started
          */
         public abstract double resize_start_height {get; protected set; default=0;}
+
+        /**
+         * Calculates the point in this renderer's coordinates at which
+         * connectors attach to the given dock
+         *
+         * The default implementation uses the {@link Dock} widget returned
+         * by {@link retrieve_dock}. Renderers that draw their docks
+         * themselves have to override this.
+         */
+        public virtual bool get_dock_anchor(GFlow.Dock d, out double x, out double y) {
+            x = 0;
+            y = 0;
+            var dock = this.retrieve_dock(d);
+            if (dock == null) {
+                return false;
+            }
+            Graphene.Point center = {8f, 8f};
+            Graphene.Point p;
+            if (!dock.compute_point(this, center, out p)) {
+                return false;
+            }
+            x = p.x;
+            y = p.y;
+            return true;
+        }
+
+        /**
+         * Returns the color of the connectors that leave the given dock
+         */
+        public virtual Gdk.RGBA resolve_dock_color(GFlow.Dock d) {
+            var dock = this.retrieve_dock(d);
+            if (dock == null) {
+                return {0.0f,0.0f,0.0f,1.0f};
+            }
+            return dock.resolve_color(dock, dock.last_value);
+        }
+
+        /**
+         * Returns the dock at the given point in this renderer's
+         * coordinates or null if there is none
+         */
+        public virtual GFlow.Dock? pick_dock(double x, double y) {
+            var w = this.pick(x, y, Gtk.PickFlags.DEFAULT);
+            if (w is Dock) {
+                return ((Dock)w).d;
+            }
+            return null;
+        }
     }
 
 
+    /**
+     * A row of the dock list of a {@link Node}
+     *
+     * The widgets are created once and retargeted whenever the row is
+     * bound to another {@link GFlow.Dock}.
+     */
+    private class DockRow : Gtk.Box {
+        public Dock dock;
+        public Gtk.Widget? label = null;
+
+        public DockRow() {
+            Object(orientation: Gtk.Orientation.HORIZONTAL, spacing: 5);
+            this.dock = new Dock.unbound();
+            this.append(this.dock);
+        }
+    }
+
     public class NodeDockLabelWidgetFactory : Object {
 
         public GFlow.Node node {
@@ -100,6 +165,21 @@ namespace GtkFlow {
             label.hexpand = true;
             return label;
         }
+
+        /**
+         * Lets a label that {@link create_dock_label} has created describe
+         * another dock. Returns false if the label can't be reused, in
+         * which case a new one is created.
+         *
+         * Override this together with {@link create_dock_label}.
+         */
+        public virtual bool update_dock_label(Gtk.Widget label, GFlow.Dock dock) {
+            if (!(label is Gtk.Label)) {
+                return false;
+            }
+            ((Gtk.Label)label).label = dock.name;
+            return true;
+        }
     }
 
     /**
@@ -141,6 +221,7 @@ namespace GtkFlow {
             set_css_name("gtkflow_node");
 
             this.notify["marked"].connect(this.marked_changed);
+            this.notify["highlight-color"].connect(this.highlight_color_changed);
         }
 
         private const int MARGIN_DEFAULT = 10;
@@ -166,6 +247,10 @@ namespace GtkFlow {
          */
         public bool marked {get; internal set;}
 
+        /**
+         * A color that the node is tinted with, e.g. to point
+         * out nodes in the {@link Minimap}
+         */
         public Gdk.RGBA? highlight_color {get; set; default=null;}
 
         /**
@@ -191,6 +276,31 @@ namespace GtkFlow {
         private int n_docks = 0;
         private int margin = 0;
 
+        /**
+         * The height up to which the dock list grows before it scrolls
+         */
+        private const int DOCK_LIST_MAX_HEIGHT = 400;
+
+        /**
+         * The amount of docks above which the docks of this node are
+         * moved into a scrollable list
+         *
+         * Widgets in that list are only created for the docks that are
+         * scrolled into view. Connectors of docks that are scrolled out
+         * of view attach to the upper or lower edge of the list.
+         */
+        public uint dock_list_threshold {get; set; default=64;}
+
+        private Gtk.ScrolledWindow? dock_scroll = null;
+        private GLib.ListStore? dock_store = null;
+        /**
+         * The positions of the docks in {@link dock_store}
+         */
+        private HashTable<GFlow.Dock, uint> dock_positions =
+            new HashTable<GFlow.Dock, uint>(direct_hash, direct_equal);
+        private HashTable<GFlow.Dock, Dock> bound_docks =
+            new HashTable<GFlow.Dock, Dock>(direct_hash, direct_equal);
+
         ~Node() {
             this.pads_grid.unparent();
             this.node_box.unparent();
@@ -249,6 +359,7 @@ namespace GtkFlow {
             this.node_box.margin_end = this.margin;
 
             create_pads_grid();
+            this.notify["dock-list-threshold"].connect(this.update_dock_list);
             create_drag_drop_controller();
             create_motion_controller();
             create_event_override_controller();
@@ -292,11 +403,15 @@ namespace GtkFlow {
 
             node_box.append(this.pads_grid);
 
-            foreach (GFlow.Source s in n.get_sources()) {
-                this.source_added(s);
-            }
-            foreach (GFlow.Sink s in n.get_sinks()) {
-                this.sink_added(s);
+            // Large nodes start out with a dock list right away
+            this.update_dock_list();
+            if (this.dock_store == null) {
+                foreach (GFlow.Source s in n.get_sources()) {
+                    this.source_added(s);
+                }
+                foreach (GFlow.Sink s in n.get_sinks()) {
+                    this.sink_added(s);
+                }
             }
 
             this.n.source_added.connect(this.source_added);
@@ -313,6 +428,9 @@ namespace GtkFlow {
          * with any of the Dock-Widgets in this node.
          */
         public Dock? retrieve_dock (GFlow.Dock d) {
+            if (this.dock_store != null) {
+                return this.bound_docks.get(d);
+            }
             var c = this.pads_grid.get_first_child();
             while (c != null) {
                 if (!(c is Dock)) {
@@ -366,19 +484,197 @@ namespace GtkFlow {
             base.dispose();
         }
 
+        protected override void snapshot(Gtk.Snapshot sn) {
+            // The tint goes between the CSS background and the children
+            if (this.highlight_color != null) {
+                sn.append_color(
+                    this.highlight_color,
+                    Graphene.Rect().init(0, 0, this.get_width(), this.get_height())
+                );
+            }
+            base.snapshot(sn);
+        }
+
         /**
          * {@inheritDoc}
          */
+        public bool get_dock_anchor(GFlow.Dock d, out double x, out double y) {
+            x = 0;
+            y = 0;
+            if (this.dock_store != null) {
+                return this.get_list_dock_anchor(d, out x, out y);
+            }
+            var dock = this.retrieve_dock(d);
+            if (dock == null) {
+                return false;
+            }
+            Graphene.Point center = {8f, 8f};
+            Graphene.Point p;
+            if (!dock.compute_point(this, center, out p)) {
+                return false;
+            }
+            x = p.x;
+            y = p.y;
+            return true;
+        }
+
+        /**
+         * Calculates the anchor of a dock in the dock list. Docks that
+         * have no widget or are scrolled out of view are placed on the
+         * upper or lower edge of the list.
+         */
+        private bool get_list_dock_anchor(GFlow.Dock d, out double x, out double y) {
+            x = 0;
+            y = 0;
+            Graphene.Rect area;
+            if (!this.dock_positions.contains(d)
+             || !this.dock_scroll.compute_bounds(this, out area)) {
+                return false;
+            }
+            uint position = this.dock_positions.get(d);
+            var adjustment = this.dock_scroll.vadjustment;
+            double row_y;
+            var dock = this.bound_docks.get(d);
+            Graphene.Point center = {8f, 8f};
+            Graphene.Point p;
+            if (dock != null && dock.compute_point(this, center, out p)) {
+                x = p.x;
+                row_y = p.y - area.origin.y;
+            } else {
+                double row_height = adjustment.upper / uint.max(1, this.dock_store.get_n_items());
+                row_y = (position + 0.5) * row_height - adjustment.value;
+                // Docks are centered in the 8px margins of their cell
+                x = d is GFlow.Sink ? area.origin.x + 16 : area.origin.x + area.size.width - 16;
+            }
+            y = area.origin.y + row_y.clamp(0, area.size.height);
+            return true;
+        }
+
+        /**
+         * Moves all docks into a scrollable list once their amount
+         * exceeds {@link dock_list_threshold}
+         */
+        private void update_dock_list() {
+            if (this.dock_store != null
+             || this.n.get_sources().length() + this.n.get_sinks().length() <= this.dock_list_threshold) {
+                return;
+            }
+            // Docks start in the third row of the grid, below the title
+            for (int i = 0; i < this.n_docks; i++) {
+                var c = this.pads_grid.get_child_at(0, 2);
+                if (c == null) c = this.pads_grid.get_child_at(2, 2);
+                if (c is Dock) {
+                    ((Dock)c).release();
+                }
+                this.pads_grid.remove_row(2);
+            }
+            this.n_docks = 0;
+
+            this.dock_store = new GLib.ListStore(typeof(GFlow.Dock));
+            foreach (GFlow.Source s in this.n.get_sources()) {
+                this.append_to_dock_list(s);
+            }
+            foreach (GFlow.Sink s in this.n.get_sinks()) {
+                this.append_to_dock_list(s);
+            }
+
+            var factory = new Gtk.SignalListItemFactory();
+            factory.setup.connect((obj) => {
+                var list_item = (Gtk.ListItem)obj;
+                list_item.activatable = false;
+                list_item.selectable = false;
+                list_item.child = new DockRow();
+            });
+            factory.bind.connect((obj) => {
+                var list_item = (Gtk.ListItem)obj;
+                this.bind_dock_row((GFlow.Dock)list_item.item, (DockRow)list_item.child);
+            });
+            factory.unbind.connect((obj) => {
+                var list_item = (Gtk.ListItem)obj;
+                this.unbind_dock_row((GFlow.Dock)list_item.item, (DockRow)list_item.child);
+            });
+
+            var list = new Gtk.ListView(new Gtk.NoSelection(this.dock_store), factory);
+            this.dock_scroll = new Gtk.ScrolledWindow();
+            this.dock_scroll.hscrollbar_policy = Gtk.PolicyType.NEVER;
+            this.dock_scroll.propagate_natural_height = true;
+            this.dock_scroll.max_content_height = DOCK_LIST_MAX_HEIGHT;
+            this.dock_scroll.vexpand = true;
+            this.dock_scroll.child = list;
+            // Connectors follow the docks while the list is scrolled
+            this.dock_scroll.vadjustment.value_changed.connect(() => {
+                var nv = this.get_parent() as NodeView;
+                if (nv != null) {
+                    nv.invalidate_connectors(this.n);
+                }
+            });
+            this.node_box.insert_child_after(this.dock_scroll, this.pads_grid);
+        }
+
+        private void bind_dock_row(GFlow.Dock d, DockRow row) {
+            row.dock.retarget(d);
+            if (row.label == null || !this.dock_label_factory.update_dock_label(row.label, d)) {
+                if (row.label != null) {
+                    row.remove(row.label);
+                }
+                row.label = this.dock_label_factory.create_dock_label(d);
+                row.append(row.label);
+            }
+            // Sinks have their dock on the left, sources on the right
+            if (d is GFlow.Sink) {
+                row.label.halign = Gtk.Align.START;
+                row.reorder_child_after(row.dock, null);
+            } else {
+                row.label.halign = Gtk.Align.END;
+                row.reorder_child_after(row.dock, row.label);
+            }
+            this.bound_docks.insert(d, row.dock);
+        }
+
+        private void unbind_dock_row(GFlow.Dock d, DockRow row) {
+            row.dock.release();
+            if (this.bound_docks.get(d) == row.dock) {
+                this.bound_docks.remove(d);
+            }
+        }
+
+        private void append_to_dock_list(GFlow.Dock d) {
+            this.dock_positions.insert(d, this.dock_store.get_n_items());
+            this.dock_store.append(d);
+        }
+
+        private void remove_from_dock_list(GFlow.Dock d) {
+            if (!this.dock_positions.contains(d)) {
+                return;
+            }
+            uint position = this.dock_positions.get(d);
+            this.dock_positions.remove(d);
+            this.dock_store.remove(position);
+            // The docks behind the removed one move up by one row
+            for (uint i = position; i < this.dock_store.get_n_items(); i++) {
+                this.dock_positions.insert((GFlow.Dock)this.dock_store.get_item(i), i);
+            }
+        }
+
         private void sink_added(GFlow.Sink s) {
+            if (this.dock_store != null) {
+                this.append_to_dock_list(s);
+                return;
+            }
             var dock = new Dock(s);
             var dock_label = dock_label_factory.create_dock_label(dock.d);
             dock_label.halign = Gtk.Align.START;
             
             this.pads_grid.attach(dock, 0, 1 + ++n_docks, 1, 1);
             this.pads_grid.attach(dock_label, 1, 1 + n_docks, 1, 1);
+            this.update_dock_list();
         }
 
         private void sink_removed(GFlow.Sink s) {
+            if (this.dock_store != null) {
+                this.remove_from_dock_list(s);
+                return;
+            }
             var dock_widget = retrieve_dock(s);
 
             int column = -1;
@@ -392,15 +688,24 @@ namespace GtkFlow {
         }
 
         private void source_added(GFlow.Source s) {
+            if (this.dock_store != null) {
+                this.append_to_dock_list(s);
+                return;
+            }
             var dock = new Dock(s);
             var dock_label = dock_label_factory.create_dock_label(dock.d);
             dock_label.halign = Gtk.Align.END;
             
             this.pads_grid.attach(dock, 2, 1 + ++n_docks, 1, 1);
             this.pads_grid.attach(dock_label, 1, 1 + n_docks, 1, 1);
+            this.update_dock_list();
         }
 
         private void source_removed(GFlow.Source s) {
+            if (this.dock_store != null) {
+                this.remove_from_dock_list(s);
+                return;
+            }
             var dock_widget = retrieve_dock(s);
 
             int column = -1;
@@ -486,6 +791,14 @@ namespace GtkFlow {
             }
         }
 
+        private void highlight_color_changed() {
+            this.queue_draw();
+            var nv = this.get_parent() as NodeView;
+            if (nv != null) {
+                nv.draw_minimap();
+            }
+        }
+
         private Gdk.Rectangle resize_area() {
             return {
                 this.get_width() - 16, 
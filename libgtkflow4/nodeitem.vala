@@ -0,0 +1,65 @@
+/********************************************************************
+# Copyright 2014-2022 Daniel 'grindhold' Brendle
+#
+# This file is part of libgtkflow.
+#
+# libgtkflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+namespace GtkFlow {
+    /**
+     * Creates the widget that displays a node of a {@link NodeView} model
+     */
+    public delegate NodeRenderer NodeRendererFactory(GFlow.Node n);
+
+    /**
+     * An item of the {@link GLib.ListModel} that a {@link NodeView} displays
+     *
+     * Holds a {@link GFlow.Node} and its position in canvas coordinates.
+     * The size is used for nodes that have no widget at the moment and
+     * is updated whenever a widget for the node has been laid out.
+     */
+    public class NodeItem : Object {
+        /**
+         * The node that this item describes
+         */
+        public GFlow.Node node {get; construct;}
+
+        /**
+         * Horizontal position of the node in canvas coordinates
+         */
+        public int x {get; set; default=0;}
+
+        /**
+         * Vertical position of the node in canvas coordinates
+         */
+        public int y {get; set; default=0;}
+
+        /**
+         * The last known width of the node
+         */
+        public int width {get; set; default=150;}
+
+        /**
+         * The last known height of the node
+         */
+        public int height {get; set; default=80;}
+
+        public NodeItem(GFlow.Node node, int x = 0, int y = 0) {
+            Object(node: node, x: x, y: y);
+        }
+    }
+}
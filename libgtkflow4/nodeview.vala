@@ -58,6 +58,7 @@ namespace GtkFlow {
         }
 
         protected override  void measure(Gtk.Widget w, Gtk.Orientation o, int for_size, out int min, out int pref, out int min_base, out int pref_base) {
+            var nv = (NodeView)w;
             int lower_bound = 0;
             int upper_bound = 0;
             var c = w.get_first_child();
@@ -82,13 +83,41 @@ namespace GtkFlow {
 
                 c = c.get_next_sibling();
             }
-            min = upper_bound - lower_bound;
-            pref = upper_bound - lower_bound;
+            // The items of the model are covered by their cached bounds
+            int min_x, min_y, max_x, max_y;
+            if (nv.get_item_bounds(out min_x, out min_y, out max_x, out max_y)) {
+                switch (o) {
+                    case Gtk.Orientation.HORIZONTAL:
+                        lower_bound = int.min(min_x, lower_bound);
+                        upper_bound = int.max(max_x, upper_bound);
+                        break;
+                    case Gtk.Orientation.VERTICAL:
+                        lower_bound = int.min(min_y, lower_bound);
+                        upper_bound = int.max(max_y, upper_bound);
+                        break;
+                }
+            }
+            // Node positions are canvas coordinates, the size we request
+            // has to be expressed in the zoomed and panned widget space
+            double pan = o == Gtk.Orientation.HORIZONTAL ? nv.pan_x : nv.pan_y;
+            int extent = (int)Math.ceil((upper_bound - lower_bound) * nv.zoom + double.max(pan, 0));
+            min = extent;
+            pref = extent;
             min_base = -1;
             pref_base = -1;
         }
 
+        /**
+         * The amount of nodes that were present during the last allocation
+         */
+        private int n_allocated = 0;
+
         protected override void allocate(Gtk.Widget w, int height, int width, int baseline) {
+            int64 profile_start = GFlow.Profiler.begin_span();
+            var nv = (NodeView)w;
+            nv.place_pending_nodes();
+            bool nodes_changed = false;
+            int n_children = 0;
             var c = w.get_first_child();
             while (c != null) {
                 int cwidth, cheight, _;
@@ -96,9 +125,40 @@ namespace GtkFlow {
                 c.measure(Gtk.Orientation.VERTICAL, -1, out cheight, out _, out _, out _);
                 var lc = (NodeViewLayoutChild)this.get_layout_child(c);
                 c.queue_allocate();
-                c.allocate_size({lc.x,lc.y, cwidth, cheight}, -1);
+                // The view transform is handed to GTK as part of the child's
+                // allocation so that rendering, picking and the coordinates
+                // of events inside the nodes are all mapped through it.
+                Graphene.Point origin = {
+                    (float)(nv.pan_x + lc.x * nv.zoom),
+                    (float)(nv.pan_y + lc.y * nv.zoom)
+                };
+                var transform = new Gsk.Transform().translate(origin);
+                transform = transform.scale((float)nv.zoom, (float)nv.zoom);
+                c.allocate(cwidth, cheight, -1, transform);
+                nodes_changed |= lc.update_bounds(
+                    (int)origin.x, (int)origin.y,
+                    (int)(cwidth * nv.zoom), (int)(cheight * nv.zoom)
+                );
+                // Connectors are kept in canvas coordinates, so they only
+                // follow the nodes that actually moved or changed size
+                if (lc.update_canvas_bounds(lc.x, lc.y, cwidth, cheight)) {
+                    nv.invalidate_connectors(((NodeRenderer)c).n);
+                }
+                if (lc.item != null) {
+                    nv.sync_item(lc.item, lc.x, lc.y, cwidth, cheight);
+                }
+                nv.index_node(((NodeRenderer)c).n, lc.x, lc.y, cwidth, cheight);
+                n_children++;
                 c = c.get_next_sibling();
             }
+            // Only tell the minimap to rebuild its node layer if a node
+            // actually moved, changed size or has been added or removed
+            if (nodes_changed || n_children != this.n_allocated) {
+                this.n_allocated = n_children;
+                nv.draw_minimap();
+            }
+            nv.check_visible_area();
+            GFlow.Profiler.end_span("gtkflow", "NodeView.allocate", profile_start);
         }
         public override Gtk.LayoutChild create_layout_child (Gtk.Widget widget, Gtk.Widget for_child)  {
             return new NodeViewLayoutChild(for_child, this);
@@ -109,9 +169,347 @@ namespace GtkFlow {
         public int x = 0;
         public int y = 0;
 
+        /**
+         * The model item that the child has been created for, if any
+         */
+        public NodeItem? item = null;
+
+        /**
+         * The bounds of the child in nodeview coordinates at the time
+         * of its last allocation
+         */
+        private Gdk.Rectangle bounds = {0, 0, -1, -1};
+        /**
+         * The bounds of the child in canvas coordinates at the time
+         * of its last allocation
+         */
+        private Gdk.Rectangle canvas_bounds = {0, 0, -1, -1};
+
         public NodeViewLayoutChild(Gtk.Widget w, Gtk.LayoutManager lm) {
             Object(child_widget: w, layout_manager: lm);
         }
+
+        /**
+         * Stores the given bounds and returns true if they differ
+         * from the previously stored ones
+         */
+        public bool update_bounds(int x, int y, int width, int height) {
+            if (this.bounds.x == x && this.bounds.y == y
+             && this.bounds.width == width && this.bounds.height == height) {
+                return false;
+            }
+            this.bounds = {x, y, width, height};
+            return true;
+        }
+
+        /**
+         * Stores the given canvas bounds and returns true if they
+         * differ from the previously stored ones
+         */
+        public bool update_canvas_bounds(int x, int y, int width, int height) {
+            Gdk.Rectangle rect = {x, y, width, height};
+            if (this.canvas_bounds.equal(rect)) {
+                return false;
+            }
+            this.canvas_bounds = rect;
+            return true;
+        }
+    }
+
+    /**
+     * The docks of the nodes in a {@link NodeView}, indexed
+     * by their direction and value type
+     *
+     * Only the dock classes of libgflow are known to compare types by
+     * {@link GFlow.Dock.value_type}. Docks of any other class may
+     * override {@link GFlow.Dock.has_same_type}, so they are kept in a
+     * separate list per direction that is always checked.
+     */
+    private class DockIndex {
+        private HashTable<string, GenericArray<GFlow.Dock>> docks =
+            new HashTable<string, GenericArray<GFlow.Dock>>(str_hash, str_equal);
+        private GenericArray<GFlow.Dock> custom_sinks = new GenericArray<GFlow.Dock>();
+        private GenericArray<GFlow.Dock> custom_sources = new GenericArray<GFlow.Dock>();
+        private HashTable<GFlow.Node, GFlow.Node> nodes =
+            new HashTable<GFlow.Node, GFlow.Node>(direct_hash, direct_equal);
+
+        private static string get_key(bool sink, Type value_type) {
+            return "%s:%s".printf(sink ? "sink" : "source", value_type.name());
+        }
+
+        private static bool compares_value_type(GFlow.Dock d) {
+            Type t = d.get_type();
+            return t == typeof(GFlow.SimpleSink) || t == typeof(GFlow.SimpleSource)
+                || t == typeof(GFlow.DoubleSink) || t == typeof(GFlow.DoubleSource)
+                || t == typeof(GFlow.Int64Sink) || t == typeof(GFlow.Int64Source)
+                || t == typeof(GFlow.BooleanSink) || t == typeof(GFlow.BooleanSource)
+                || t == typeof(GFlow.DoubleArraySink) || t == typeof(GFlow.DoubleArraySource);
+        }
+
+        private unowned GenericArray<GFlow.Dock> get_custom(bool sink) {
+            return sink ? this.custom_sinks : this.custom_sources;
+        }
+
+        public void add_node(GFlow.Node n) {
+            if (this.nodes.contains(n)) {
+                return;
+            }
+            this.nodes.insert(n, n);
+            foreach (GFlow.Source s in n.get_sources()) {
+                this.add_dock(s);
+            }
+            foreach (GFlow.Sink s in n.get_sinks()) {
+                this.add_dock(s);
+            }
+            n.source_added.connect(this.source_added);
+            n.sink_added.connect(this.sink_added);
+            n.source_removed.connect(this.source_removed);
+            n.sink_removed.connect(this.sink_removed);
+        }
+
+        /**
+         * Stops watching all nodes
+         */
+        public void clear() {
+            foreach (GFlow.Node n in this.nodes.get_values()) {
+                this.remove_node(n);
+            }
+        }
+
+        private void source_added(GFlow.Source s) {
+            this.add_dock(s);
+        }
+
+        private void sink_added(GFlow.Sink s) {
+            this.add_dock(s);
+        }
+
+        private void source_removed(GFlow.Source s) {
+            this.remove_dock(s);
+        }
+
+        private void sink_removed(GFlow.Sink s) {
+            this.remove_dock(s);
+        }
+
+        public void remove_node(GFlow.Node n) {
+            if (!this.nodes.contains(n)) {
+                return;
+            }
+            this.nodes.remove(n);
+            SignalHandler.disconnect_matched(n, SignalMatchType.DATA, 0, 0, null, null, this);
+            foreach (GFlow.Source s in n.get_sources()) {
+                this.remove_dock(s);
+            }
+            foreach (GFlow.Sink s in n.get_sinks()) {
+                this.remove_dock(s);
+            }
+        }
+
+        private void add_dock(GFlow.Dock d) {
+            if (!compares_value_type(d)) {
+                this.get_custom(d is GFlow.Sink).add(d);
+                return;
+            }
+            string key = get_key(d is GFlow.Sink, d.value_type);
+            var list = this.docks.get(key);
+            if (list == null) {
+                list = new GenericArray<GFlow.Dock>();
+                this.docks.insert(key, list);
+            }
+            list.add(d);
+        }
+
+        private void remove_dock(GFlow.Dock d) {
+            if (!compares_value_type(d)) {
+                this.get_custom(d is GFlow.Sink).remove_fast(d);
+                return;
+            }
+            var list = this.docks.get(get_key(d is GFlow.Sink, d.value_type));
+            if (list != null) {
+                list.remove_fast(d);
+            }
+        }
+
+        /**
+         * Returns the docks of the given direction and value type
+         */
+        public unowned GenericArray<GFlow.Dock>? lookup(bool sink, Type value_type) {
+            return this.docks.get(get_key(sink, value_type));
+        }
+
+        /**
+         * Returns the docks of the given direction whose class may
+         * decide on its own which types it accepts
+         */
+        public unowned GenericArray<GFlow.Dock> lookup_custom(bool sink) {
+            return this.get_custom(sink);
+        }
+    }
+
+    /**
+     * The bounds of the nodes in a {@link NodeView} in canvas
+     * coordinates, bucketed into a grid of cells
+     *
+     * Finding the nodes in an area only has to look at the cells that
+     * the area covers, no matter how many nodes there are.
+     */
+    private class NodeGrid {
+        private const int CELL_SIZE = 256;
+
+        private HashTable<int64?, GenericArray<GFlow.Node>> cells =
+            new HashTable<int64?, GenericArray<GFlow.Node>>(int64_hash, int64_equal);
+        private HashTable<GFlow.Node, Gdk.Rectangle?> bounds =
+            new HashTable<GFlow.Node, Gdk.Rectangle?>(direct_hash, direct_equal);
+
+        /**
+         * Packs the coordinates of a cell into a single key,
+         * so looking up a cell does not allocate
+         */
+        private static int64 get_key(int cx, int cy) {
+            return ((int64)cx << 32) | (uint32)cy;
+        }
+
+        private static int to_cell(int coordinate) {
+            return (int)Math.floor((double)coordinate / CELL_SIZE);
+        }
+
+        /**
+         * Stores the bounds of the given node. Does nothing
+         * if they haven't changed since the last call.
+         */
+        public void update(GFlow.Node n, int x, int y, int width, int height) {
+            Gdk.Rectangle rect = {x, y, width, height};
+            var old = this.bounds.get(n);
+            if (old != null && old.equal(rect)) {
+                return;
+            }
+            this.remove(n);
+            this.bounds.insert(n, rect);
+            for (int cx = to_cell(x); cx <= to_cell(x + width); cx++) {
+                for (int cy = to_cell(y); cy <= to_cell(y + height); cy++) {
+                    int64 key = get_key(cx, cy);
+                    var cell = this.cells.get(key);
+                    if (cell == null) {
+                        cell = new GenericArray<GFlow.Node>();
+                        this.cells.insert(key, cell);
+                    }
+                    cell.add(n);
+                }
+            }
+        }
+
+        public void remove(GFlow.Node n) {
+            var old = this.bounds.get(n);
+            if (old == null) {
+                return;
+            }
+            this.bounds.remove(n);
+            for (int cx = to_cell(old.x); cx <= to_cell(old.x + old.width); cx++) {
+                for (int cy = to_cell(old.y); cy <= to_cell(old.y + old.height); cy++) {
+                    int64 key = get_key(cx, cy);
+                    var cell = this.cells.get(key);
+                    if (cell == null) {
+                        continue;
+                    }
+                    cell.remove_fast(n);
+                    if (cell.length == 0) {
+                        this.cells.remove(key);
+                    }
+                }
+            }
+        }
+
+        public void clear() {
+            this.cells.remove_all();
+            this.bounds.remove_all();
+        }
+
+        /**
+         * Returns the last stored bounds of the given node
+         */
+        public bool get_bounds(GFlow.Node n, out Gdk.Rectangle rect) {
+            var stored = this.bounds.get(n);
+            if (stored == null) {
+                rect = {0, 0, 0, 0};
+                return false;
+            }
+            rect = stored;
+            return true;
+        }
+
+        /**
+         * Returns the nodes whose bounds intersect the given area
+         */
+        public GenericArray<GFlow.Node> query(int x, int y, int width, int height) {
+            var result = new GenericArray<GFlow.Node>();
+            var seen = new HashTable<GFlow.Node, GFlow.Node>(direct_hash, direct_equal);
+            Gdk.Rectangle area = {x, y, width, height};
+            Gdk.Rectangle overlap;
+            for (int cx = to_cell(x); cx <= to_cell(x + width); cx++) {
+                for (int cy = to_cell(y); cy <= to_cell(y + height); cy++) {
+                    var cell = this.cells.get(get_key(cx, cy));
+                    if (cell == null) {
+                        continue;
+                    }
+                    foreach (GFlow.Node n in cell) {
+                        if (seen.contains(n)) {
+                            continue;
+                        }
+                        seen.insert(n, n);
+                        if (this.bounds.get(n).intersect(area, out overlap)) {
+                            result.add(n);
+                        }
+                    }
+                }
+            }
+            return result;
+        }
+    }
+
+    /**
+     * Collects the connectors of one color and width so they can be stroked at once
+     */
+    private class ConnectorBatch {
+        public Gdk.RGBA color;
+        public double width;
+        /**
+         * Start and end points of all curves in the order x0, y0, x1, y1
+         */
+        private double[] curves = {};
+
+        public ConnectorBatch(Gdk.RGBA color, double width) {
+            this.color = color;
+            this.width = width;
+        }
+
+        /**
+         * Adds the curves of the given connector. The trunk of a bundled
+         * connector is shared with the other connectors of its source,
+         * so it is only added if with_trunk is set.
+         */
+        public void add_connector(Connector c, bool with_trunk) {
+            int start = c.is_bundled && !with_trunk ? 4 : 0;
+            for (int i = start; i < c.segments.length; i++) {
+                this.curves += c.segments[i];
+            }
+        }
+
+        /**
+         * Appends all curves of this batch to the current path of the given context
+         */
+        public void append_to(Cairo.Context cr) {
+            for (int i = 0; i < this.curves.length; i += 4) {
+                double w = this.curves[i+2] - this.curves[i];
+                double h = this.curves[i+3] - this.curves[i+1];
+                cr.move_to(this.curves[i], this.curves[i+1]);
+                if (w > 0) {
+                    cr.rel_curve_to(w/3,0,2*w/3,h,w,h);
+                } else {
+                    cr.rel_curve_to(-w/3,0,1.3*w,h,w,h);
+                }
+            }
+        }
     }
 
     /**
@@ -134,14 +532,232 @@ namespace GtkFlow {
          */
         public bool allow_recursion {get; set; default=false;}
 
+        private const double MIN_ZOOM = 0.1;
+        private const double MAX_ZOOM = 4.0;
+        private const double ZOOM_STEP = 1.1;
+
+        private double _zoom = 1.0;
+        /**
+         * The scale factor that the graph is rendered with
+         *
+         * Node positions are kept in unscaled canvas coordinates, so changing
+         * the zoom never requires the nodes to be laid out again.
+         * The value is clamped to a range of 0.1 to 4.0
+         */
+        public double zoom {
+            get { return this._zoom; }
+            set {
+                this._zoom = value.clamp(MIN_ZOOM, MAX_ZOOM);
+                this.queue_resize();
+            }
+        }
+
+        /**
+         * Horizontal translation of the canvas in widget coordinates
+         */
+        public double pan_x {get; set; default=0.0;}
+
+        /**
+         * Vertical translation of the canvas in widget coordinates
+         */
+        public double pan_y {get; set; default=0.0;}
+
+        /**
+         * The minimum amount of connectors that have to leave a single
+         * source before they are bundled
+         */
+        private const int BUNDLE_THRESHOLD = 3;
+
+        /**
+         * If this property is set to true, connectors that fan out from
+         * the same source are drawn as one shared trunk that branches
+         * off towards the sinks close to them
+         */
+        public bool bundle_connectors {get; set; default=false;}
+
+        /**
+         * Tints the nodes by the selected measurement and scales the width
+         * of the connectors by the amount of values that pass them.
+         *
+         * While it is active, the overlay makes the {@link GFlow.Profiler}
+         * count changed emissions and handler times, but not record traces,
+         * so it may stay on for as long as the view lives.
+         */
+        public HeatmapMode heatmap_mode {get; set; default=HeatmapMode.NONE;}
+
+        /**
+         * The interval in milliseconds at which the heatmap is updated
+         */
+        public uint heatmap_interval {get; set; default=500;}
+
+        /**
+         * The weight of the previous average when the heatmap is updated.
+         * Higher values make the overlay react slower to changes.
+         */
+        public double heatmap_decay {get; set; default=0.7;}
+
+        private Heatmap? heatmap = null;
+        private uint heatmap_source = 0;
+
+        /**
+         * The amount of widgets of nodes that left the visible area
+         * which are kept around to be reused when they come back
+         */
+        private const uint MAX_SPARE_NODES = 32;
+
+        private GLib.ListModel? _model = null;
+        /**
+         * The nodes that this nodeview displays in addition to the
+         * ones added with {@link add}
+         *
+         * Widgets are only created for the items that intersect the
+         * visible area of the nodeview. See {@link set_model}.
+         */
+        public GLib.ListModel? model {
+            get { return this._model; }
+        }
+
+        /**
+         * The distance in canvas coordinates around the visible area in
+         * which widgets for the nodes of the {@link model} are created
+         * ahead of time. Widgets are released when they are more than
+         * twice this distance away from the visible area.
+         */
+        public int virtualization_margin {get; set; default=256;}
+
+        private NodeRendererFactory? renderer_factory = null;
+        /**
+         * The items of the model in model order, so changes of the
+         * model can be applied without looking at the other items
+         */
+        private GenericArray<NodeItem?> item_list = new GenericArray<NodeItem?>();
+        private HashTable<GFlow.Node, NodeItem> items =
+            new HashTable<GFlow.Node, NodeItem>(direct_hash, direct_equal);
+        private HashTable<NodeItem, NodeRenderer> realized =
+            new HashTable<NodeItem, NodeRenderer>(direct_hash, direct_equal);
+        private HashTable<NodeItem, NodeRenderer> spare =
+            new HashTable<NodeItem, NodeRenderer>(direct_hash, direct_equal);
+        private Queue<NodeItem> spare_order = new Queue<NodeItem>();
+        /**
+         * The visible area in canvas coordinates at the time that the
+         * widgets of the model have last been updated
+         */
+        private Graphene.Rect realized_area = Graphene.Rect().init(0, 0, 0, 0);
+        private bool realized_area_valid = false;
+        private bool realize_queued = false;
+        private bool syncing_item = false;
+
+        /**
+         * The bounds of all items of the model in canvas coordinates,
+         * updated whenever an item is added, moved or removed. They are
+         * only computed again from all items once an item that lay on
+         * one of their edges moved inwards or has been removed.
+         */
+        private int item_min_x = int.MAX;
+        private int item_min_y = int.MAX;
+        private int item_max_x = int.MIN;
+        private int item_max_y = int.MIN;
+        private bool item_bounds_valid = true;
+
+        /**
+         * The connectors whose bounds are larger than the
+         * {@link virtualization_margin}, by their source
+         *
+         * Such a connector may cross the visible area while both of its
+         * nodes are too far away from it to be found in the node grid.
+         */
+        private HashTable<GFlow.Source, GenericArray<GFlow.Sink>> long_edges =
+            new HashTable<GFlow.Source, GenericArray<GFlow.Sink>>(direct_hash, direct_equal);
+
+        /**
+         * The offset between the members of an expanded group
+         * that have no stored position
+         */
+        private const int GROUP_CASCADE = 40;
+
+        /**
+         * If this property is set to true, all docks that the dragged
+         * connector could be dropped on are highlighted during the drag
+         */
+        public bool highlight_targets {get; set; default=true;}
+
+        /**
+         * Determines whether nodes glide to the positions that
+         * a {@link Layout} computes instead of jumping there
+         */
+        public bool animate_layout {get; set; default=true;}
+
+        /**
+         * Triggered when a layout has finished or has been cancelled
+         */
+        public signal void layout_finished(bool completed);
+
+        /**
+         * The layout that is running right now and the
+         * {@link NodeRenderer}s or {@link NodeItem}s it moves
+         */
+        private LayoutRun? layout_run = null;
+        private Object[] layout_targets = {};
+        private uint layout_tick = 0;
+
+        /**
+         * If this property is set to true, nodes that are added without
+         * a position are placed next to the nodes they are linked to
+         *
+         * New nodes are placed when the nodeview is laid out next, so
+         * links that are made right after adding a node are taken into
+         * account. Nodes that have been given a position other than (0,0)
+         * by then keep it, and no other node is moved.
+         */
+        public bool incremental_placement {get; set; default=false;}
+
+        /**
+         * The space that placed nodes keep to their neighbours
+         */
+        private const int PLACEMENT_GAP = 40;
+        /**
+         * How many spots above and below the preferred one are
+         * tried before a node is placed on top of others
+         */
+        private const int MAX_PLACEMENT_TRIES = 64;
+
+        private NodeGrid node_grid = new NodeGrid();
+        private GenericArray<NodeRenderer> pending_placement = new GenericArray<NodeRenderer>();
+
+        private DockIndex dock_index = new DockIndex();
+        /**
+         * The docks that the current temporary connector can be
+         * dropped on, computed once when the drag starts
+         */
+        private GenericArray<GFlow.Dock>? drag_targets = null;
+
+        /**
+         * The collapsed group that currently stands for each hidden node
+         */
+        private HashTable<GFlow.Node, GFlow.GroupNode> hidden_in =
+            new HashTable<GFlow.Node, GFlow.GroupNode>(direct_hash, direct_equal);
+        /**
+         * The positions of nodes that are hidden in a collapsed group
+         */
+        private HashTable<GFlow.Node, NodeItem> hidden_positions =
+            new HashTable<GFlow.Node, NodeItem>(direct_hash, direct_equal);
+
         /**
          * The eventcontrollers to receive events
          */
         private Gtk.EventControllerMotion ctr_motion;
         private Gtk.GestureClick ctr_click;
+        private Gtk.EventControllerScroll ctr_scroll;
+        private Gtk.EventControllerKey ctr_key;
+
+        /**
+         * The last known pointer position in widget coordinates
+         */
+        private double pointer_x = 0;
+        private double pointer_y = 0;
 
         /**
-         * The current extents of the temporary connector
+         * The current extents of the temporary connector in widget coordinates
          * if null, there is no temporary connector drawn at the moment
          */
         private Gdk.Rectangle? temp_connector = null;
@@ -149,11 +765,11 @@ namespace GtkFlow {
         /**
          * The dock that the temporary connector will be attched to
          */
-        private Dock? temp_connected_dock = null;
+        private GFlow.Dock? temp_connected_dock = null;
         /**
          * The dock that was clicked to invoke the temporary connector
          */
-        private Dock? clicked_dock = null;
+        private GFlow.Dock? clicked_dock = null;
         /**
          * The node that is being moved right now via mouse drag.
          * The node that receives the button press event registers
@@ -164,30 +780,912 @@ namespace GtkFlow {
 
         /**
          * A rectangle detailing the extents of a rubber marking
+         * in widget coordinates
          */
         private Gdk.Rectangle? mark_rubberband = null;
 
         /**
-         * Instantiate a new NodeView
+         * The connectors of all nodes in canvas coordinates, to draw
+         * them and to find the one under the pointer
          */
-        public NodeView (){
-            this.set_layout_manager(new NodeViewLayoutManager());
-            this.set_size_request(100,100);
+        private ConnectorIndex connector_index = new ConnectorIndex();
+        /**
+         * Collects the sources whose connectors have to be computed
+         * again because their nodes moved or their links changed
+         */
+        private ConnectorUpdates connector_updates = new ConnectorUpdates();
+        /**
+         * The connector under the pointer
+         */
+        private Connector? hovered_connector = null;
+        /**
+         * The connector that has been clicked last
+         */
+        private Connector? selected_connector = null;
+
+        /**
+         * Emitted when a connector has been clicked or
+         * the selection has been cleared by the user
+         */
+        public signal void connector_selected(GFlow.Source? source, GFlow.Sink? sink);
+
+        /**
+         * Instantiate a new NodeView
+         */
+        public NodeView (){
+            this.set_layout_manager(new NodeViewLayoutManager());
+            this.set_size_request(100,100);
 
             this.ctr_motion = new Gtk.EventControllerMotion();
             this.add_controller(this.ctr_motion);
             this.ctr_motion.motion.connect(this.process_motion);
 
-            this.ctr_click = new Gtk.GestureClick();
-            this.add_controller(this.ctr_click);
-            this.ctr_click.pressed.connect(this.start_marking);
-            this.ctr_click.released.connect(this.end_temp_connector);
+            this.ctr_click = new Gtk.GestureClick();
+            this.add_controller(this.ctr_click);
+            this.ctr_click.pressed.connect(this.start_marking);
+            this.ctr_click.released.connect(this.end_temp_connector);
+
+            this.ctr_scroll = new Gtk.EventControllerScroll(Gtk.EventControllerScrollFlags.VERTICAL);
+            this.add_controller(this.ctr_scroll);
+            this.ctr_scroll.scroll.connect(this.process_scroll);
+
+            this.ctr_key = new Gtk.EventControllerKey();
+            this.add_controller(this.ctr_key);
+            this.ctr_key.key_pressed.connect(this.process_key);
+            this.focusable = true;
+
+            this.notify["pan-x"].connect(this.queue_resize);
+            this.notify["pan-y"].connect(this.queue_resize);
+            this.notify["bundle-connectors"].connect(() => {
+                this.connector_updates.invalidate_all();
+            });
+            this.connector_updates.changed.connect(this.queue_draw);
+            this.notify["heatmap-mode"].connect(this.update_heatmap);
+            this.notify["heatmap-interval"].connect(this.update_heatmap);
+            this.notify["incremental-placement"].connect(this.rebuild_node_grid);
+            this.notify["virtualization-margin"].connect(() => {
+                this.connector_updates.invalidate_all();
+            });
+        }
+
+        private void stop_heatmap() {
+            if (this.heatmap_source != 0) {
+                GLib.Source.remove(this.heatmap_source);
+                this.heatmap_source = 0;
+            }
+            if (this.heatmap != null) {
+                this.heatmap.restore();
+                this.heatmap = null;
+            }
+        }
+
+        private void update_heatmap() {
+            this.stop_heatmap();
+            if (this.heatmap_mode != HeatmapMode.NONE) {
+                this.heatmap = new Heatmap();
+                this.heatmap.sample(this, this.heatmap_mode, this.heatmap_decay);
+                this.heatmap_source = GLib.Timeout.add(this.heatmap_interval, () => {
+                    this.heatmap.sample(this, this.heatmap_mode, this.heatmap_decay);
+                    this.queue_draw();
+                    return GLib.Source.CONTINUE;
+                });
+            }
+            this.queue_draw();
+        }
+
+        /**
+         * Changes the zoom while keeping the canvas point that is
+         * displayed at the given widget coordinates in place
+         */
+        public void zoom_at(double factor, double x, double y) {
+            double cx, cy;
+            this.widget_to_canvas(x, y, out cx, out cy);
+            this.zoom = factor;
+            this.pan_x = x - cx * this.zoom;
+            this.pan_y = y - cy * this.zoom;
+        }
+
+        /**
+         * Converts a point in widget coordinates into the coordinate
+         * system that the nodes are positioned in
+         */
+        public void widget_to_canvas(double x, double y, out double cx, out double cy) {
+            cx = (x - this.pan_x) / this.zoom;
+            cy = (y - this.pan_y) / this.zoom;
+        }
+
+        /**
+         * Converts a point in node coordinates into widget coordinates
+         */
+        public void canvas_to_widget(double cx, double cy, out double x, out double y) {
+            x = cx * this.zoom + this.pan_x;
+            y = cy * this.zoom + this.pan_y;
+        }
+
+        /**
+         * Displays the nodes of the given model
+         *
+         * The model has to contain {@link NodeItem}s. Widgets are only
+         * created for the nodes that are close to the visible area and
+         * are released once the nodes are scrolled out of view, so the
+         * cost of the nodeview depends on the amount of visible nodes
+         * rather than on the size of the graph. Connectors and the
+         * {@link Minimap} use the position and size stored in the items
+         * for nodes that have no widget.
+         *
+         * The widgets are created by the given factory, or are
+         * {@link Node}s if no factory is given. Nodes that have been
+         * added with {@link add} are not affected by the model.
+         */
+        public void set_model(GLib.ListModel? model, owned NodeRendererFactory? factory = null) {
+            if (this._model != null) {
+                this._model.items_changed.disconnect(this.model_items_changed);
+                this.model_items_changed(0, this.item_list.length, 0);
+            }
+            this.realized_area_valid = false;
+
+            this._model = model;
+            this.renderer_factory = (owned) factory;
+            if (this._model != null) {
+                this._model.items_changed.connect(this.model_items_changed);
+                this.model_items_changed(0, 0, this._model.get_n_items());
+            }
+            this.notify_property("model");
+        }
+
+        private NodeRenderer create_renderer(GFlow.Node n) {
+            if (this.renderer_factory != null) {
+                return this.renderer_factory(n);
+            }
+            return new Node(n);
+        }
+
+        /**
+         * Adds a group that is displayed as a single node
+         *
+         * No widgets are created for the nodes in the group until it
+         * is expanded with {@link expand_group}. Links between grouped
+         * nodes are not drawn and links that leave the group attach to
+         * the proxy docks of the group. Widgets for groups and their
+         * members are created by the factory given to {@link set_model},
+         * or are {@link Node}s.
+         */
+        public void add_group(GFlow.GroupNode group, int x, int y) {
+            var nr = this.create_renderer(group);
+            this.add(nr);
+            var lc = (NodeViewLayoutChild)this.layout_manager.get_layout_child(nr);
+            lc.x = x;
+            lc.y = y;
+            this.hide_members(group);
+            this.queue_allocate();
+        }
+
+        private void hide_members(GFlow.GroupNode group) {
+            foreach (GFlow.Node leaf in group.get_leaf_nodes()) {
+                this.hidden_in.insert(leaf, group);
+                // The connectors that leave the group start at its members
+                this.connector_updates.watch(leaf);
+            }
+            this.connector_updates.invalidate_all();
+        }
+
+        /**
+         * Replaces the widgets of the members of the given group with a
+         * single widget for the group. Members that are expanded groups
+         * themselves are collapsed as well.
+         */
+        public void collapse_group(GFlow.GroupNode group) {
+            if (this.retrieve_node(group) != null) {
+                return;
+            }
+            int min_x = int.MAX, min_y = int.MAX;
+            foreach (GFlow.Node m in group.get_members()) {
+                if (m is GFlow.GroupNode) {
+                    this.collapse_group((GFlow.GroupNode)m);
+                }
+                var nr = this.retrieve_node(m);
+                if (nr == null) {
+                    continue;
+                }
+                var lc = (NodeViewLayoutChild)this.layout_manager.get_layout_child(nr);
+                var position = new NodeItem(m, lc.x, lc.y);
+                position.width = nr.get_width();
+                position.height = nr.get_height();
+                this.hidden_positions.insert(m, position);
+                min_x = int.min(min_x, lc.x);
+                min_y = int.min(min_y, lc.y);
+                // The links stay, only the widget goes
+                nr.unparent();
+            }
+            var stored = this.hidden_positions.get(group);
+            if (stored != null) {
+                min_x = stored.x;
+                min_y = stored.y;
+                this.hidden_positions.remove(group);
+            } else if (min_x == int.MAX) {
+                min_x = 0;
+                min_y = 0;
+            }
+            this.add_group(group, min_x, min_y);
+        }
+
+        /**
+         * Replaces the widget of the given collapsed group with widgets
+         * for its members. Members that are groups stay collapsed.
+         */
+        public void expand_group(GFlow.GroupNode group) {
+            var group_renderer = this.retrieve_node(group);
+            if (group_renderer == null) {
+                return;
+            }
+            var glc = (NodeViewLayoutChild)this.layout_manager.get_layout_child(group_renderer);
+            this.hidden_positions.insert(group, new NodeItem(group, glc.x, glc.y));
+            int x = glc.x, y = glc.y;
+            group_renderer.unparent();
+
+            int cascade = 0;
+            foreach (GFlow.Node m in group.get_members()) {
+                var position = this.hidden_positions.get(m);
+                var nr = this.create_renderer(m);
+                this.add(nr);
+                var lc = (NodeViewLayoutChild)this.layout_manager.get_layout_child(nr);
+                if (position != null) {
+                    lc.x = position.x;
+                    lc.y = position.y;
+                    this.hidden_positions.remove(m);
+                } else {
+                    lc.x = x + cascade;
+                    lc.y = y + cascade;
+                    cascade += GROUP_CASCADE;
+                }
+                if (m is GFlow.GroupNode) {
+                    this.hide_members((GFlow.GroupNode)m);
+                } else {
+                    this.hidden_in.remove(m);
+                }
+            }
+            this.connector_updates.invalidate_all();
+            this.queue_resize();
+        }
+
+        /**
+         * Returns the proxy that stands for the given dock if its
+         * node is hidden in a collapsed group
+         */
+        private GFlow.Dock? get_visible_proxy(GFlow.Dock d) {
+            if (d.node == null) {
+                return null;
+            }
+            var group = this.hidden_in.get(d.node);
+            if (group == null) {
+                return null;
+            }
+            return group.get_proxy(d);
+        }
+
+        private static bool is_proxy(GFlow.Dock d) {
+            return d.node is GFlow.GroupNode && ((GFlow.GroupNode)d.node).get_inner(d) != null;
+        }
+
+        /**
+         * Returns the model item that holds the given node or null
+         * if the node is not part of the {@link model}
+         */
+        public NodeItem? retrieve_item(GFlow.Node n) {
+            return this.items.get(n);
+        }
+
+        /**
+         * Indexes the bounds of all nodes
+         *
+         * The items of the model are always indexed, so the ones close
+         * to the visible area can be found quickly. Nodes that have been
+         * added with {@link add} are only indexed for
+         * {@link incremental_placement}.
+         */
+        private void rebuild_node_grid() {
+            this.node_grid.clear();
+            this.items.foreach((node, item) => {
+                this.node_grid.update(node, item.x, item.y, item.width, item.height);
+            });
+            if (!this.incremental_placement) {
+                this.pending_placement = new GenericArray<NodeRenderer>();
+                return;
+            }
+            for (var c = this.get_first_child(); c != null; c = c.get_next_sibling()) {
+                var lc = (NodeViewLayoutChild)this.layout_manager.get_layout_child(c);
+                if (lc.item == null) {
+                    this.node_grid.update(((NodeRenderer)c).n, lc.x, lc.y, c.get_width(), c.get_height());
+                }
+            }
+        }
+
+        /**
+         * Stores the bounds of a node after it has been laid out
+         */
+        internal void index_node(GFlow.Node n, int x, int y, int width, int height) {
+            if (this.incremental_placement) {
+                this.node_grid.update(n, x, y, width, height);
+            }
+        }
+
+        /**
+         * Places the nodes that have been added since the last layout
+         */
+        internal void place_pending_nodes() {
+            if (this.pending_placement.length == 0) {
+                return;
+            }
+            var pending = this.pending_placement;
+            this.pending_placement = new GenericArray<NodeRenderer>();
+            foreach (NodeRenderer nr in pending) {
+                if (nr.get_parent() != this) {
+                    continue;
+                }
+                var lc = (NodeViewLayoutChild)this.layout_manager.get_layout_child(nr);
+                if (lc.item != null || lc.x != 0 || lc.y != 0) {
+                    continue;
+                }
+                this.place_node(nr, lc);
+            }
+        }
+
+        /**
+         * Puts the given node to the right of the nodes that feed it or
+         * to the left of the nodes it feeds, on the closest free spot
+         */
+        private void place_node(NodeRenderer nr, NodeViewLayoutChild lc) {
+            int width, height, _;
+            nr.measure(Gtk.Orientation.HORIZONTAL, -1, out width, out _, out _, out _);
+            nr.measure(Gtk.Orientation.VERTICAL, -1, out height, out _, out _, out _);
+
+            Gdk.Rectangle rect;
+            int n_upstream = 0, upstream_right = int.MIN, upstream_y = 0;
+            foreach (GFlow.Sink snk in nr.n.get_sinks()) {
+                foreach (GFlow.Source src in snk.sources) {
+                    if (src.node != null && this.node_grid.get_bounds(src.node, out rect)) {
+                        upstream_right = int.max(upstream_right, rect.x + rect.width);
+                        upstream_y += rect.y;
+                        n_upstream++;
+                    }
+                }
+            }
+            int n_downstream = 0, downstream_left = int.MAX, downstream_y = 0;
+            foreach (GFlow.Source src in nr.n.get_sources()) {
+                foreach (GFlow.Sink snk in src.sinks) {
+                    if (snk.node != null && this.node_grid.get_bounds(snk.node, out rect)) {
+                        downstream_left = int.min(downstream_left, rect.x);
+                        downstream_y += rect.y;
+                        n_downstream++;
+                    }
+                }
+            }
+
+            int x, y;
+            if (n_upstream > 0) {
+                x = upstream_right + PLACEMENT_GAP;
+                y = upstream_y / n_upstream;
+            } else if (n_downstream > 0) {
+                x = downstream_left - PLACEMENT_GAP - width;
+                y = downstream_y / n_downstream;
+            } else {
+                // Unlinked nodes appear where the user is looking
+                var visible = this.get_visible_canvas_area();
+                x = (int)visible.origin.x + PLACEMENT_GAP;
+                y = (int)visible.origin.y + PLACEMENT_GAP;
+            }
+            // Negative positions would shift the whole graph
+            x = int.max(x, 0);
+            y = int.max(y, 0);
+
+            // Try the spots above and below the preferred one in turn
+            for (int i = 0; i < MAX_PLACEMENT_TRIES; i++) {
+                int offset = ((i + 1) / 2) * (height + PLACEMENT_GAP);
+                int candidate = i % 2 == 1 ? y + offset : y - offset;
+                if (candidate < 0) {
+                    continue;
+                }
+                if (this.is_free(nr.n, x, candidate, width, height)) {
+                    y = candidate;
+                    break;
+                }
+            }
+            lc.x = x;
+            lc.y = y;
+            this.node_grid.update(nr.n, x, y, width, height);
+        }
+
+        /**
+         * Returns true if no node other than the one being placed is closer
+         * to the given area than half the {@link PLACEMENT_GAP}
+         */
+        private bool is_free(GFlow.Node placed, int x, int y, int width, int height) {
+            int margin = PLACEMENT_GAP / 2;
+            Gdk.Rectangle area = {x - margin, y - margin, width + 2 * margin, height + 2 * margin};
+            foreach (GFlow.Node n in this.node_grid.query(area.x, area.y, area.width, area.height)) {
+                if (n == placed) {
+                    continue;
+                }
+                if (this.hidden_in.contains(n)) {
+                    this.node_grid.remove(n);
+                    continue;
+                }
+                return false;
+            }
+            return true;
+        }
+
+        /**
+         * Autolayout this graph
+         *
+         * The layout is computed on a worker thread from a copy of the
+         * current positions and sizes of the nodes, including the nodes
+         * of the {@link model} that have no widget, so this returns right
+         * away and the nodeview keeps handling input. The nodes move to
+         * the intermediate positions of the layout once per frame.
+         * A layout that is still running is cancelled.
+         */
+        public void layout(Layout l) {
+            this.cancel_layout();
+            var index = new HashTable<GFlow.Node, int>(direct_hash, direct_equal);
+            GFlow.Node[] nodes = {};
+            Object[] targets = {};
+            double[] x = {}, y = {}, width = {}, height = {};
+            for (var c = this.get_first_child(); c != null; c = c.get_next_sibling()) {
+                var lc = (NodeViewLayoutChild)this.layout_manager.get_layout_child(c);
+                if (lc.item != null) {
+                    // Moved through their item below
+                    continue;
+                }
+                index.insert(((NodeRenderer)c).n, nodes.length);
+                nodes += ((NodeRenderer)c).n;
+                targets += c;
+                x += lc.x;
+                y += lc.y;
+                width += c.get_width();
+                height += c.get_height();
+            }
+            foreach (NodeItem item in this.items.get_values()) {
+                if (this.hidden_in.contains(item.node)) {
+                    continue;
+                }
+                index.insert(item.node, nodes.length);
+                nodes += item.node;
+                targets += item;
+                x += item.x;
+                y += item.y;
+                width += item.width;
+                height += item.height;
+            }
+            int[] edges = {};
+            for (int i = 0; i < nodes.length; i++) {
+                foreach (GFlow.Source src in nodes[i].get_sources()) {
+                    foreach (GFlow.Sink snk in src.sinks) {
+                        if (snk.node != null && index.contains(snk.node)) {
+                            edges += i;
+                            edges += index.get(snk.node);
+                        }
+                    }
+                }
+            }
+            var run = new LayoutRun(l, new LayoutGraph(x, y, width, height, edges));
+            try {
+                run.start();
+            } catch (GLib.Error e) {
+                warning("Could not start the layout: %s", e.message);
+                return;
+            }
+            this.layout_run = run;
+            this.layout_targets = targets;
+            this.layout_tick = this.add_tick_callback(this.step_layout);
+        }
+
+        /**
+         * Stops a running layout and leaves the nodes where they are
+         */
+        public void cancel_layout() {
+            if (this.layout_run == null) {
+                return;
+            }
+            this.layout_run.cancel();
+            this.remove_tick_callback(this.layout_tick);
+            this.finish_layout(false);
+        }
+
+        private bool step_layout(Gtk.Widget w, Gdk.FrameClock clock) {
+            bool running = this.layout_run.step(this.animate_layout);
+            for (int i = 0; i < this.layout_targets.length; i++) {
+                int x = (int)Math.round(this.layout_run.shown_x[i]);
+                int y = (int)Math.round(this.layout_run.shown_y[i]);
+                var item = this.layout_targets[i] as NodeItem;
+                if (item != null) {
+                    // Moves the widget of the item as well, if it has one
+                    item.x = x;
+                    item.y = y;
+                    continue;
+                }
+                var c = (Gtk.Widget)this.layout_targets[i];
+                // Nodes that have been removed in the meantime
+                if (c.get_parent() != this) {
+                    continue;
+                }
+                var lc = (NodeViewLayoutChild)this.layout_manager.get_layout_child(c);
+                lc.x = x;
+                lc.y = y;
+            }
+            this.queue_allocate();
+            if (running) {
+                return GLib.Source.CONTINUE;
+            }
+            this.finish_layout(true);
+            this.update_extents();
+            return GLib.Source.REMOVE;
+        }
+
+        private void finish_layout(bool completed) {
+            this.layout_run = null;
+            this.layout_targets = {};
+            this.layout_tick = 0;
+            this.layout_finished(completed);
+        }
+
+        private void model_items_changed(uint position, uint removed, uint added) {
+            for (uint i = position; i < position + removed; i++) {
+                this.drop_item(this.item_list[i]);
+            }
+            this.item_list.remove_range(position, removed);
+            for (uint i = position; i < position + added; i++) {
+                var item = this._model.get_item(i) as NodeItem;
+                if (item == null) {
+                    warning("NodeView models may only contain GtkFlow.NodeItems");
+                } else {
+                    this.items.insert(item.node, item);
+                    item.notify.connect(this.item_changed);
+                    this.node_grid.update(item.node, item.x, item.y, item.width, item.height);
+                    Gdk.Rectangle rect = {item.x, item.y, item.width, item.height};
+                    this.update_item_bounds(null, rect);
+                    this.connector_updates.watch(item.node);
+                }
+                // Keeps the positions in line with the model
+                this.item_list.insert((int)i, item);
+            }
+            this.realized_area_valid = false;
+            this.queue_resize();
+        }
+
+        /**
+         * Forgets an item that has been removed from the model
+         * and drops its widget
+         */
+        private void drop_item(NodeItem? item) {
+            if (item == null) {
+                return;
+            }
+            item.notify.disconnect(this.item_changed);
+            if (this.items.get(item.node) == item) {
+                this.items.remove(item.node);
+                Gdk.Rectangle old;
+                if (this.node_grid.get_bounds(item.node, out old)) {
+                    this.update_item_bounds(old, null);
+                }
+                this.node_grid.remove(item.node);
+                this.connector_updates.unwatch(item.node);
+            }
+            var nr = this.realized.get(item);
+            if (nr != null) {
+                this.realized.remove(item);
+                this.dock_index.remove_node(item.node);
+                nr.unparent();
+            }
+            if (this.spare.remove(item)) {
+                this.spare_order.remove(item);
+            }
+        }
+
+        /**
+         * Calls the given function for every item of the model
+         * that has no widget at the moment
+         */
+        internal void foreach_unrealized_item(GLib.Func<NodeItem> func) {
+            if (this._model == null) {
+                return;
+            }
+            this.items.foreach((node, item) => {
+                if (!this.realized.contains(item)) {
+                    func(item);
+                }
+            });
+        }
+
+        /**
+         * Applies the move of an item from the old to the new bounds to
+         * the cached bounds of all items. Either may be null for items
+         * that have been added or removed.
+         */
+        private void update_item_bounds(Gdk.Rectangle? old, Gdk.Rectangle? rect) {
+            if (!this.item_bounds_valid) {
+                return;
+            }
+            // An item that lay on an edge and no longer reaches it
+            // leaves the edge to an unknown other item
+            if (old != null
+             && ((old.x <= this.item_min_x && (rect == null || rect.x > this.item_min_x))
+              || (old.y <= this.item_min_y && (rect == null || rect.y > this.item_min_y))
+              || (old.x + old.width >= this.item_max_x && (rect == null || rect.x + rect.width < this.item_max_x))
+              || (old.y + old.height >= this.item_max_y && (rect == null || rect.y + rect.height < this.item_max_y)))) {
+                this.item_bounds_valid = false;
+                return;
+            }
+            if (rect != null) {
+                this.item_min_x = int.min(this.item_min_x, rect.x);
+                this.item_min_y = int.min(this.item_min_y, rect.y);
+                this.item_max_x = int.max(this.item_max_x, rect.x + rect.width);
+                this.item_max_y = int.max(this.item_max_y, rect.y + rect.height);
+            }
+        }
+
+        /**
+         * Retrieves the bounds of all items of the model in canvas
+         * coordinates. Returns false if the model has no items.
+         */
+        internal bool get_item_bounds(out int min_x, out int min_y, out int max_x, out int max_y) {
+            if (!this.item_bounds_valid) {
+                this.item_min_x = int.MAX;
+                this.item_min_y = int.MAX;
+                this.item_max_x = int.MIN;
+                this.item_max_y = int.MIN;
+                this.item_bounds_valid = true;
+                this.items.foreach((node, item) => {
+                    Gdk.Rectangle rect = {item.x, item.y, item.width, item.height};
+                    this.update_item_bounds(null, rect);
+                });
+            }
+            min_x = this.item_min_x;
+            min_y = this.item_min_y;
+            max_x = this.item_max_x;
+            max_y = this.item_max_y;
+            return this.item_min_x <= this.item_max_x;
+        }
+
+        /**
+         * Stores the layout of a widget of the model in its item
+         */
+        internal void sync_item(NodeItem item, int x, int y, int width, int height) {
+            this.syncing_item = true;
+            if (item.x != x) item.x = x;
+            if (item.y != y) item.y = y;
+            if (item.width != width) item.width = width;
+            if (item.height != height) item.height = height;
+            this.syncing_item = false;
+        }
+
+        private void item_changed(Object o, ParamSpec p) {
+            var item = (NodeItem)o;
+            Gdk.Rectangle old;
+            Gdk.Rectangle? old_bounds = null;
+            if (this.node_grid.get_bounds(item.node, out old)) {
+                old_bounds = old;
+            }
+            Gdk.Rectangle rect = {item.x, item.y, item.width, item.height};
+            this.update_item_bounds(old_bounds, rect);
+            this.node_grid.update(item.node, item.x, item.y, item.width, item.height);
+            if (!this.syncing_item && !this.realized.contains(item)) {
+                // Widgets report their own moves when they are allocated
+                this.invalidate_connectors(item.node);
+            }
+            if (this.syncing_item || (p.name != "x" && p.name != "y")) {
+                return;
+            }
+            var nr = this.realized.get(item);
+            if (nr == null) {
+                // An item that has been moved close to the visible area needs a widget
+                if (this.realized_area_valid) {
+                    var bounds = Graphene.Rect().init(item.x, item.y, item.width, item.height);
+                    if (rects_overlap(bounds, grow_rect(this.realized_area, this.virtualization_margin))) {
+                        this.realized_area_valid = false;
+                        this.queue_allocate();
+                    }
+                }
+                return;
+            }
+            var lc = (NodeViewLayoutChild)this.layout_manager.get_layout_child(nr);
+            lc.x = item.x;
+            lc.y = item.y;
+            this.queue_allocate();
+        }
+
+        /**
+         * Returns the part of this widget that is visible, taking
+         * scrolling in a {@link Gtk.Viewport} into account
+         */
+        private Graphene.Rect get_visible_area() {
+            var parent = this.get_parent();
+            if (parent is Gtk.Viewport) {
+                var vp = (Gtk.Viewport)parent;
+                return Graphene.Rect().init(
+                    (float)vp.hadjustment.value, (float)vp.vadjustment.value,
+                    (float)vp.hadjustment.page_size, (float)vp.vadjustment.page_size
+                );
+            }
+            return Graphene.Rect().init(0, 0, this.get_width(), this.get_height());
+        }
+
+        private Graphene.Rect get_visible_canvas_area() {
+            var visible = this.get_visible_area();
+            double x0, y0, x1, y1;
+            this.widget_to_canvas(visible.origin.x, visible.origin.y, out x0, out y0);
+            this.widget_to_canvas(
+                visible.origin.x + visible.size.width,
+                visible.origin.y + visible.size.height,
+                out x1, out y1
+            );
+            return Graphene.Rect().init((float)x0, (float)y0, (float)(x1 - x0), (float)(y1 - y0));
+        }
+
+        private static Graphene.Rect grow_rect(Graphene.Rect r, float d) {
+            return Graphene.Rect().init(r.origin.x - d, r.origin.y - d, r.size.width + 2 * d, r.size.height + 2 * d);
+        }
+
+        private static bool rects_overlap(Graphene.Rect a, Graphene.Rect b) {
+            return a.origin.x <= b.origin.x + b.size.width && b.origin.x <= a.origin.x + a.size.width
+                && a.origin.y <= b.origin.y + b.size.height && b.origin.y <= a.origin.y + a.size.height;
+        }
+
+        /**
+         * Schedules an update of the widgets of the model if the visible
+         * area moved further than the virtualization margin since the last
+         * update. Widgets can't be added during an allocation, so the
+         * update happens before the next frame is laid out.
+         */
+        internal void check_visible_area() {
+            if (this._model == null || this.realize_queued) {
+                return;
+            }
+            var visible = this.get_visible_canvas_area();
+            if (this.realized_area_valid
+             && grow_rect(this.realized_area, this.virtualization_margin).contains_rect(visible)) {
+                return;
+            }
+            this.realize_queued = true;
+            this.add_tick_callback(() => {
+                this.update_realized_items();
+                return GLib.Source.REMOVE;
+            });
+        }
+
+        private void update_realized_items() {
+            this.realize_queued = false;
+            if (this._model == null) {
+                return;
+            }
+            var visible = this.get_visible_canvas_area();
+            if (visible.size.width <= 0 || visible.size.height <= 0) {
+                return;
+            }
+            var wanted = grow_rect(visible, this.virtualization_margin);
+            var keep = grow_rect(visible, 2 * this.virtualization_margin);
+            // Only the widgets and the items close to the visible area are
+            // looked at, so this does not depend on the size of the model
+            var far = new GenericArray<NodeItem>();
+            this.realized.foreach((item, nr) => {
+                var bounds = Graphene.Rect().init(item.x, item.y, item.width, item.height);
+                if (!rects_overlap(bounds, keep) && !this.is_busy(nr)) {
+                    far.add(item);
+                }
+            });
+            foreach (NodeItem item in far) {
+                this.unrealize_item(item);
+            }
+            var nearby = this.node_grid.query(
+                (int)Math.floor(wanted.origin.x), (int)Math.floor(wanted.origin.y),
+                (int)Math.ceil(wanted.size.width), (int)Math.ceil(wanted.size.height)
+            );
+            foreach (GFlow.Node n in nearby) {
+                var item = this.items.get(n);
+                if (item != null && !this.realized.contains(item)) {
+                    this.realize_item(item);
+                }
+            }
+            this.realized_area = visible;
+            this.realized_area_valid = true;
+        }
+
+        /**
+         * Whether the given node takes part in an ongoing interaction
+         * and has to keep its widget
+         */
+        private bool is_busy(NodeRenderer nr) {
+            return nr == this.move_node || nr == this.resize_node || nr.marked
+                || (this.clicked_dock != null && this.clicked_dock.node == nr.n)
+                || (this.temp_connected_dock != null && this.temp_connected_dock.node == nr.n);
+        }
+
+        private void realize_item(NodeItem item) {
+            NodeRenderer? nr = this.spare.get(item);
+            if (nr != null) {
+                this.spare.remove(item);
+                this.spare_order.remove(item);
+            } else {
+                nr = this.create_renderer(item.node);
+            }
+            this.realized.insert(item, nr);
+            this.add(nr);
+            var lc = (NodeViewLayoutChild)this.layout_manager.get_layout_child(nr);
+            lc.x = item.x;
+            lc.y = item.y;
+            lc.item = item;
+        }
+
+        private void unrealize_item(NodeItem item) {
+            NodeRenderer nr = this.realized.get(item);
+            this.realized.remove(item);
+            nr.unparent();
+            // The connectors go back to the anchors estimated from the item
+            this.invalidate_connectors(item.node);
+            this.spare.insert(item, nr);
+            this.spare_order.push_tail(item);
+            while (this.spare_order.length > MAX_SPARE_NODES) {
+                this.spare.remove(this.spare_order.pop_head());
+            }
+        }
+
+        /**
+         * Estimates the anchor of a dock of a node without a widget in
+         * canvas coordinates from the position and size stored in its
+         * model item
+         */
+        private bool get_item_dock_anchor(GFlow.Dock d, out double x, out double y) {
+            x = 0;
+            y = 0;
+            if (d.node == null) {
+                return false;
+            }
+            var item = this.items.get(d.node);
+            if (item == null) {
+                return false;
+            }
+            int index = 0;
+            uint n_docks = 0;
+            x = item.x;
+            if (d is GFlow.Source) {
+                index = d.node.get_sources().index((GFlow.Source)d);
+                n_docks = d.node.get_sources().length();
+                x += item.width;
+            } else {
+                index = d.node.get_sinks().index((GFlow.Sink)d);
+                n_docks = d.node.get_sinks().length();
+            }
+            y = item.y + item.height * (index + 1.0) / (n_docks + 1.0);
+            return true;
+        }
+
+        private bool process_scroll(double dx, double dy) {
+            var state = this.ctr_scroll.get_current_event_state();
+            if ((state & Gdk.ModifierType.CONTROL_MASK) == 0) {
+                return false;
+            }
+            this.zoom_at(
+                dy < 0 ? this.zoom * ZOOM_STEP : this.zoom / ZOOM_STEP,
+                this.pointer_x, this.pointer_y
+            );
+            return true;
         }
 
         /**
          * {@inheritDoc}
          */
         public override void dispose() {
+            this.stop_heatmap();
+            this.cancel_layout();
+            this.set_model(null);
+            this.clear_drag_targets();
+            this.dock_index.clear();
+            this.node_grid.clear();
+            this.connector_updates.clear();
+            this.connector_index.clear();
+            this.long_edges.remove_all();
+            this.hovered_connector = null;
+            this.selected_connector = null;
             var nodewidget = this.get_first_child();
             while (nodewidget != null) {
                 var delnode = nodewidget;
@@ -211,12 +1709,17 @@ namespace GtkFlow {
         }
 
         private void process_motion(double x, double y) {
+            this.pointer_x = x;
+            this.pointer_y = y;
+            double cx, cy;
+            this.widget_to_canvas(x, y, out cx, out cy);
+
             if (this.move_node != null && this.layout_manager != null) {
                 var lc = (NodeViewLayoutChild) this.layout_manager.get_layout_child(this.move_node);
                 int old_x = lc.x;
                 int old_y = lc.y;
-                lc.x = (int)(x-this.move_node.click_offset_x);
-                lc.y = (int)(y-this.move_node.click_offset_y);
+                lc.x = (int)(cx-this.move_node.click_offset_x);
+                lc.y = (int)(cy-this.move_node.click_offset_y);
                 if (this.move_node.marked) {
                     foreach (NodeRenderer n in this.get_marked_nodes()) {
                         if (n == this.move_node) continue;
@@ -229,26 +1732,23 @@ namespace GtkFlow {
 
             if (this.resize_node != null) {
                 int d_x, d_y;
-                Gtk.Allocation node_alloc;
-                this.resize_node.get_allocation(out node_alloc);
-                d_x = (int)(x-this.resize_node.click_offset_x-node_alloc.x);
-                d_y = (int)(y-this.resize_node.click_offset_y-node_alloc.y);
+                var lc = (NodeViewLayoutChild) this.layout_manager.get_layout_child(this.resize_node);
+                d_x = (int)(cx-this.resize_node.click_offset_x-lc.x);
+                d_y = (int)(cy-this.resize_node.click_offset_y-lc.y);
                 int new_width = (int)this.resize_node.resize_start_width+d_x;
                 int new_height = (int)this.resize_node.resize_start_height+d_y;
                 this.resize_node.set_size_request(new_width, new_height);
             }
 
             if (this.temp_connector != null) {
-                var n = (NodeRenderer)this.retrieve_node(this.temp_connected_dock.d.node);
-                this.temp_connector.width = (int)(x - this.temp_connector.x-n.get_margin());
-                this.temp_connector.height = (int)(y - this.temp_connector.y-n.get_margin());
+                this.temp_connector.width = (int)(x - this.temp_connector.x);
+                this.temp_connector.height = (int)(y - this.temp_connector.y);
             }
 
             if (this.mark_rubberband != null) {
                 this.mark_rubberband.width = (int)(x - this.mark_rubberband.x);
                 this.mark_rubberband.height = (int)(y - this.mark_rubberband.y);
                 var nodewidget = this.get_first_child();
-                Gtk.Allocation node_alloc;
                 Gdk.Rectangle absolute_marked = this.mark_rubberband;
                 if (absolute_marked.width < 0) {
                     absolute_marked.width *= -1;
@@ -258,78 +1758,366 @@ namespace GtkFlow {
                     absolute_marked.height *= -1;
                     absolute_marked.y -= absolute_marked.height;
                 }
-                Gdk.Rectangle result;
+                var marked_rect = Graphene.Rect().init(
+                    absolute_marked.x, absolute_marked.y,
+                    absolute_marked.width, absolute_marked.height
+                );
+                Graphene.Rect node_bounds;
                 while (nodewidget != null) {
                     var node = (NodeRenderer)nodewidget;
-                    node.get_allocation(out node_alloc);
-                    node_alloc.intersect(absolute_marked, out result);
-                    node.marked = result == node_alloc;
+                    node.marked = node.compute_bounds(this, out node_bounds)
+                                  && marked_rect.contains_rect(node_bounds);
                     nodewidget = node.get_next_sibling();
                 }
             }
+
+            Connector? hovered = null;
+            if (this.move_node == null && this.resize_node == null
+             && this.temp_connector == null && this.mark_rubberband == null
+             && this.pick(x, y, Gtk.PickFlags.DEFAULT) == this) {
+                hovered = this.connector_at(x, y);
+            }
+            if (hovered != this.hovered_connector) {
+                this.hovered_connector = hovered;
+                this.queue_draw();
+            }
             this.queue_allocate();
         }
 
         private void start_marking(int n_clicks, double x, double y) {
-            if (this.pick(x,y, Gtk.PickFlags.DEFAULT) == this)
-                this.mark_rubberband = {(int)x,(int)y,0,0};
+            if (this.pick(x,y, Gtk.PickFlags.DEFAULT) != this)
+                return;
+            var connector = this.connector_at(x, y);
+            if (connector != null) {
+                this.selected_connector = connector;
+                this.grab_focus();
+                this.connector_selected(connector.source, connector.sink);
+                this.queue_draw();
+                return;
+            }
+            this.unselect_connector();
+            this.mark_rubberband = {(int)x,(int)y,0,0};
+        }
+
+        /**
+         * Returns the connector at the given point in widget coordinates
+         *
+         * The pointer may be 4 pixels plus the width of the connector
+         * away from it.
+         */
+        private Connector? connector_at(double x, double y) {
+            double cx, cy;
+            this.widget_to_canvas(x, y, out cx, out cy);
+            return this.connector_index.pick(cx, cy, 4.0 / this.zoom + 2.0);
+        }
+
+        private bool process_key(uint keyval, uint keycode, Gdk.ModifierType state) {
+            if (this.selected_connector != null
+             && (keyval == Gdk.Key.Delete || keyval == Gdk.Key.BackSpace)) {
+                this.remove_selected_connector();
+                return true;
+            }
+            return false;
+        }
+
+        /**
+         * Finds the connector at the given point in widget coordinates
+         *
+         * Returns false if there is no connector close enough
+         * to the point.
+         */
+        public bool pick_connector(double x, double y, out GFlow.Source? source, out GFlow.Sink? sink) {
+            var connector = this.connector_at(x, y);
+            source = connector != null ? connector.source : null;
+            sink = connector != null ? connector.sink : null;
+            return connector != null;
+        }
+
+        /**
+         * Retrieves the connector that the user has selected
+         *
+         * Returns false if no connector is selected.
+         */
+        public bool get_selected_connector(out GFlow.Source? source, out GFlow.Sink? sink) {
+            source = this.selected_connector != null ? this.selected_connector.source : null;
+            sink = this.selected_connector != null ? this.selected_connector.sink : null;
+            return this.selected_connector != null;
+        }
+
+        /**
+         * Clears the selection of connectors
+         */
+        public void unselect_connector() {
+            if (this.selected_connector == null) {
+                return;
+            }
+            this.selected_connector = null;
+            this.connector_selected(null, null);
+            this.queue_draw();
+        }
+
+        /**
+         * Unlinks the docks of the selected connector
+         */
+        public void remove_selected_connector() {
+            var connector = this.selected_connector;
+            if (connector == null) {
+                return;
+            }
+            this.unselect_connector();
+            try {
+                connector.source.unlink(connector.sink);
+            } catch (GLib.Error e) {
+                warning("Could not remove the connector: %s", e.message);
+            }
+            this.queue_allocate();
+        }
+
+        /**
+         * Calculates the point in widget coordinates at which connectors
+         * attach to the given dock
+         */
+        private bool get_dock_anchor(GFlow.Dock d, out double x, out double y) {
+            double cx, cy;
+            bool found = this.get_canvas_dock_anchor(d, out cx, out cy);
+            this.canvas_to_widget(cx, cy, out x, out y);
+            return found;
+        }
+
+        /**
+         * Calculates the point in canvas coordinates at which connectors
+         * attach to the given dock
+         *
+         * The anchors of docks of widgets are taken from their allocation,
+         * so this may only be called while the nodes are laid out.
+         */
+        private bool get_canvas_dock_anchor(GFlow.Dock d, out double x, out double y) {
+            x = 0;
+            y = 0;
+            var nr = this.get_renderer(d);
+            if (nr == null) {
+                var proxy = this.get_visible_proxy(d);
+                if (proxy != null) {
+                    return this.get_canvas_dock_anchor(proxy, out x, out y);
+                }
+                return this.get_item_dock_anchor(d, out x, out y);
+            }
+            double rx, ry;
+            if (!nr.get_dock_anchor(d, out rx, out ry)) {
+                return false;
+            }
+            Graphene.Point anchor = {(float)rx, (float)ry};
+            Graphene.Point p;
+            if (!nr.compute_point(this, anchor, out p)) {
+                return false;
+            }
+            this.widget_to_canvas(p.x, p.y, out x, out y);
+            return true;
+        }
+
+        /**
+         * Returns the renderer that displays the node of the given dock
+         */
+        private NodeRenderer? get_renderer(GFlow.Dock d) {
+            if (d.node == null) {
+                return null;
+            }
+            var item = this.items.get(d.node);
+            if (item != null) {
+                return this.realized.get(item);
+            }
+            return this.retrieve_node(d.node);
+        }
+
+        /**
+         * Returns the color of the connectors that leave the given dock
+         */
+        internal Gdk.RGBA resolve_dock_color(GFlow.Dock d) {
+            var nr = this.get_renderer(d);
+            if (nr == null) {
+                var proxy = this.get_visible_proxy(d);
+                if (proxy != null) {
+                    return this.resolve_dock_color(proxy);
+                }
+                return {0.0f,0.0f,0.0f,1.0f};
+            }
+            return nr.resolve_dock_color(d);
+        }
+
+        /**
+         * Returns the dock at the given point in widget coordinates
+         */
+        private GFlow.Dock? pick_dock(double x, double y) {
+            var w = this.pick(x, y, Gtk.PickFlags.DEFAULT);
+            while (w != null && w != this && !(w is NodeRenderer)) {
+                w = w.get_parent();
+            }
+            if (!(w is NodeRenderer)) {
+                return null;
+            }
+            Graphene.Point point = {(float)x, (float)y};
+            Graphene.Point p;
+            if (!this.compute_point(w, point, out p)) {
+                return null;
+            }
+            return ((NodeRenderer)w).pick_dock(p.x, p.y);
+        }
+
+        private void queue_draw_dock(GFlow.Dock d) {
+            Gtk.Widget? w = this.retrieve_dock(d);
+            if (w == null) {
+                w = this.get_renderer(d);
+            }
+            if (w != null) {
+                w.queue_draw();
+            }
         }
 
-        internal void start_temp_connector(Dock d) {
+        internal void start_temp_connector(GFlow.Dock d) {
             this.clicked_dock = d;
-            if (d.d is GFlow.Sink && d.d.is_linked()) {
-                var sink = (GFlow.Sink)d.d;
-                this.temp_connected_dock = this.retrieve_dock(sink.sources.last().nth_data(0));
+            if (d is GFlow.Sink && d.is_linked()) {
+                var sink = (GFlow.Sink)d;
+                this.temp_connected_dock = sink.sources.last().nth_data(0);
             } else {
                 this.temp_connected_dock = d;
             }
-            var node = this.retrieve_node(this.temp_connected_dock.d.node);
 
-            Gtk.Allocation node_alloc, dock_alloc;
-            node.get_allocation(out node_alloc);
-            this.temp_connected_dock.get_allocation(out dock_alloc);
-            var x = node_alloc.x + dock_alloc.x + 8;
-            var y = node_alloc.y + dock_alloc.y + 8;
-            this.temp_connector = {x, y, 0, 0};
+            double x, y;
+            this.get_dock_anchor(this.temp_connected_dock, out x, out y);
+            this.temp_connector = {(int)x, (int)y, 0, 0};
+
+            if (this.highlight_targets) {
+                this.drag_targets = this.find_drag_targets(this.temp_connected_dock);
+                foreach (GFlow.Dock target in this.drag_targets) {
+                    target.highlight = true;
+                }
+            }
+        }
+
+        private void clear_drag_targets() {
+            if (this.drag_targets == null) {
+                return;
+            }
+            foreach (GFlow.Dock target in this.drag_targets) {
+                target.highlight = false;
+            }
+            this.drag_targets = null;
+        }
+
+        /**
+         * Collects the nodes that can be reached from the given node by
+         * following links downstream or, if upstream is set, upstream
+         */
+        private static HashTable<GFlow.Node, GFlow.Node> reachable_nodes(GFlow.Node start, bool upstream) {
+            var reached = new HashTable<GFlow.Node, GFlow.Node>(direct_hash, direct_equal);
+            var queue = new Queue<GFlow.Node>();
+            queue.push_tail(start);
+            while (!queue.is_empty()) {
+                var n = queue.pop_head();
+                var next = new List<GFlow.Node>();
+                if (upstream) {
+                    foreach (GFlow.Sink snk in n.get_sinks()) {
+                        foreach (GFlow.Source src in snk.sources) {
+                            if (src.node != null) next.append(src.node);
+                        }
+                    }
+                } else {
+                    foreach (GFlow.Source src in n.get_sources()) {
+                        foreach (GFlow.Sink snk in src.sinks) {
+                            if (snk.node != null) next.append(snk.node);
+                        }
+                    }
+                }
+                foreach (GFlow.Node m in next) {
+                    if (!reached.contains(m)) {
+                        reached.insert(m, m);
+                        queue.push_tail(m);
+                    }
+                }
+            }
+            return reached;
+        }
+
+        /**
+         * Returns the docks that a connector from the given dock could be
+         * dropped on. Candidates come from the dock index, so only docks
+         * of a matching type and docks that may override
+         * {@link GFlow.Dock.has_same_type} are checked. Cycles are ruled out with a
+         * single traversal of the graph instead of one per candidate.
+         */
+        private GenericArray<GFlow.Dock> find_drag_targets(GFlow.Dock from) {
+            var targets = new GenericArray<GFlow.Dock>();
+            if (from.node == null || is_proxy(from)) {
+                return targets;
+            }
+            bool sink = from is GFlow.Source;
+            unowned GenericArray<GFlow.Dock>? matching = this.dock_index.lookup(sink, from.value_type);
+            unowned GenericArray<GFlow.Dock> custom = this.dock_index.lookup_custom(sink);
+            if (matching == null && custom.length == 0) {
+                return targets;
+            }
+            // Linking a source to a sink closes a cycle if the sink's node
+            // already feeds the source's node, and vice versa
+            HashTable<GFlow.Node, GFlow.Node>? forbidden = null;
+            if (!this.allow_recursion) {
+                forbidden = reachable_nodes(from.node, from is GFlow.Source);
+            }
+            if (matching != null) {
+                this.add_drag_targets(targets, matching, from, forbidden);
+            }
+            this.add_drag_targets(targets, custom, from, forbidden);
+            return targets;
+        }
+
+        private void add_drag_targets(GenericArray<GFlow.Dock> targets, GenericArray<GFlow.Dock> candidates,
+                                      GFlow.Dock from, HashTable<GFlow.Node, GFlow.Node>? forbidden) {
+            foreach (GFlow.Dock d in candidates) {
+                if (d.node == null || is_proxy(d) || !d.has_same_type(from)) {
+                    continue;
+                }
+                if (!this.allow_recursion && (d.node == from.node || forbidden.contains(d.node))) {
+                    continue;
+                }
+                targets.add(d);
+            }
         }
 
         internal void end_temp_connector(int n_clicks, double x, double y) {
             if (this.temp_connector != null) {
-                var w = this.pick(x,y,Gtk.PickFlags.DEFAULT);
-                if (w is Dock) {
-                    var pd = (Dock)w;
-                    if (pd.d is GFlow.Source && this.temp_connected_dock.d is GFlow.Sink
-                     || pd.d is GFlow.Sink && this.temp_connected_dock.d is GFlow.Source) {
+                var pd = this.pick_dock(x, y);
+                if (pd != null) {
+                    if (pd is GFlow.Source && this.temp_connected_dock is GFlow.Sink
+                     || pd is GFlow.Sink && this.temp_connected_dock is GFlow.Source) {
                         try {
-                            if (!this.is_suitable_target(pd.d, this.temp_connected_dock.d)) {
+                            if (!this.is_suitable_target(pd, this.temp_connected_dock)) {
                                 throw new InternalError.DOCKS_NOT_SUITABLE("Can't link because is no good");
                             }
-                            pd.d.link(this.temp_connected_dock.d);
+                            pd.link(this.temp_connected_dock);
                         } catch (Error e) {
                             warning("Could not link: "+e.message);
                         }
                     }
-                    else if (pd.d is GFlow.Sink && this.clicked_dock != null
-                      && this.clicked_dock.d is GFlow.Sink
+                    else if (pd is GFlow.Sink && this.clicked_dock != null
+                      && this.clicked_dock is GFlow.Sink
                       && this.temp_connected_dock is GFlow.Source) {
                         try {
-                            if (!this.is_suitable_target(pd.d, this.temp_connected_dock.d)) {
+                            if (!this.is_suitable_target(pd, this.temp_connected_dock)) {
                                 throw new InternalError.DOCKS_NOT_SUITABLE("Can't link because is no good");
                             }
-                            this.clicked_dock.d.unlink(this.temp_connected_dock.d);
-                            pd.d.link(this.temp_connected_dock.d);
+                            this.clicked_dock.unlink(this.temp_connected_dock);
+                            pd.link(this.temp_connected_dock);
                         } catch (Error e) {
                             warning("Could not edit links: "+e.message);
                         }
 
                     }
-                    pd.queue_draw();
+                    this.queue_draw_dock(pd);
                 } else {
-                    if (this.temp_connected_dock.d is GFlow.Source
+                    if (this.temp_connected_dock is GFlow.Source
                      && this.clicked_dock != null
-                     && this.clicked_dock.d is GFlow.Sink) {
+                     && this.clicked_dock is GFlow.Sink) {
                         try {
-                            this.clicked_dock.d.unlink(this.temp_connected_dock.d);
+                            this.clicked_dock.unlink(this.temp_connected_dock);
                         } catch (Error e) {
                             warning("Could not unlink: "+e.message);
                         }
@@ -337,13 +2125,14 @@ namespace GtkFlow {
                 }
 
                 this.queue_draw();
-                this.temp_connected_dock.queue_draw();
+                this.queue_draw_dock(this.temp_connected_dock);
                 if (this.clicked_dock != null) {
-                    this.clicked_dock.queue_draw();
+                    this.queue_draw_dock(this.clicked_dock);
                 }
                 this.clicked_dock = null;
                 this.temp_connected_dock = null;
                 this.temp_connector = null;
+                this.clear_drag_targets();
 
             }
 
@@ -363,9 +2152,21 @@ namespace GtkFlow {
                 min_y = int.min(min_y, lc.y);
                 child = child.get_next_sibling();
             }
+            int item_min_x, item_min_y, item_max_x, item_max_y;
+            if (this.get_item_bounds(out item_min_x, out item_min_y, out item_max_x, out item_max_y)) {
+                min_x = int.min(min_x, item_min_x);
+                min_y = int.min(min_y, item_min_y);
+            }
             if (min_x >= 0 && min_y >= 0) {
                 return;
             }
+            // Only shifting the whole graph has to touch every item
+            this.foreach_unrealized_item((item) => {
+                if (min_x < 0)
+                item.x += -min_x;
+                if (min_y < 0)
+                item.y += -min_y;
+            });
             child = this.get_first_child();
             while (child != null) {
                 lc = (NodeViewLayoutChild)this.layout_manager.get_layout_child(child);
@@ -380,8 +2181,8 @@ namespace GtkFlow {
                 var scrollwidget = parent.get_parent();
                 if (parent != null && parent is Gtk.ScrolledWindow) {
                     var sw = (Gtk.ScrolledWindow)scrollwidget;
-                    sw.hadjustment.value += (double)(-min_x);
-                    sw.vadjustment.value += (double)(-min_y);
+                    sw.hadjustment.value += (double)(-min_x) * this.zoom;
+                    sw.vadjustment.value += (double)(-min_y) * this.zoom;
                 }
             }
         }
@@ -397,14 +2198,37 @@ namespace GtkFlow {
          * Add a node to this nodeview
          */
         public void add(NodeRenderer n) {
+            this.dock_index.add_node(n.n);
+            this.connector_updates.watch(n.n);
             n.set_parent (this);
+            if (this.incremental_placement) {
+                this.pending_placement.add(n);
+            }
         }
 
         /**
          * Remove a node from this nodeview
+         *
+         * Nodes of the {@link model} are removed from the model, which
+         * is only possible if it is a {@link GLib.ListStore}.
          */
         public void remove(NodeRenderer n) {
+            var item = this.items.get(n.n);
+            if (item != null) {
+                var store = this._model as GLib.ListStore;
+                uint position;
+                if (store == null || !store.find(item, out position)) {
+                    warning("Can't remove a node from a model that is not a GLib.ListStore");
+                    return;
+                }
+                n.n.unlink_all();
+                store.remove(position);
+                return;
+            }
             n.n.unlink_all();
+            this.dock_index.remove_node(n.n);
+            this.node_grid.remove(n.n);
+            this.connector_updates.unwatch(n.n);
             var child = get_first_child ();
             while (child != null) {
                 if (child == n) {
@@ -459,6 +2283,9 @@ namespace GtkFlow {
          * Determines wheter one dock can be dropped on another
          */
         private bool is_suitable_target (GFlow.Dock from, GFlow.Dock to) {
+            // Proxies only stand for the docks of grouped nodes
+            if (is_proxy(from) || is_proxy(to))
+                return false;
             // Check whether the docks have the same type
             if (!from.has_same_type(to))
                 return false;
@@ -508,71 +2335,341 @@ namespace GtkFlow {
             return false;
         }
 
+        /**
+         * Emitted whenever the nodes that a {@link Minimap} depicts
+         * changed their position, size, or highlight color or when nodes
+         * have been added or removed
+         */
         internal signal void draw_minimap();
 
+        /**
+         * Marks the connectors of the given node to be computed again
+         * before the next frame. The connectors of a collapsed group
+         * leave from the docks of its members.
+         */
+        internal void invalidate_connectors(GFlow.Node n) {
+            if (n is GFlow.GroupNode) {
+                foreach (GFlow.Dock d in ((GFlow.GroupNode)n).get_boundary_docks()) {
+                    if (d is GFlow.Source) {
+                        this.connector_updates.invalidate_source((GFlow.Source)d);
+                    } else if (d.node != null) {
+                        this.connector_updates.invalidate_node(d.node);
+                    }
+                }
+            }
+            this.connector_updates.invalidate_node(n);
+        }
+
+        /**
+         * Computes the connectors of the sources whose nodes moved or
+         * whose links changed since the last frame
+         *
+         * The connectors are kept in canvas coordinates, so panning and
+         * zooming never requires them to be computed again.
+         */
+        private void update_connectors() {
+            if (!this.connector_updates.is_stale()) {
+                return;
+            }
+            bool all;
+            var stale = this.connector_updates.take_stale(out all);
+            if (all) {
+                this.connector_index.clear();
+                this.long_edges.remove_all();
+            }
+            foreach (GFlow.Source src in stale) {
+                this.update_source_connectors(src);
+            }
+        }
+
+        private void update_source_connectors(GFlow.Source src) {
+            this.connector_index.remove_source(src);
+            this.long_edges.remove(src);
+            double src_x = 0, src_y = 0, tgt_x = 0, tgt_y = 0;
+            if (!src.is_linked() || !this.get_canvas_dock_anchor(src, out src_x, out src_y)) {
+                return;
+            }
+            // Links inside of a collapsed group are not drawn
+            GFlow.GroupNode? group = src.node != null ? this.hidden_in.get(src.node) : null;
+            double[] targets = {};
+            GFlow.Sink[] target_sinks = {};
+            double mid_y = 0, min_x = double.MAX;
+            foreach (GFlow.Sink snk in src.sinks) {
+                if (group != null && snk.node != null && this.hidden_in.get(snk.node) == group) {
+                    continue;
+                }
+                if (!this.get_canvas_dock_anchor(snk, out tgt_x, out tgt_y)) {
+                    continue;
+                }
+                targets += tgt_x;
+                targets += tgt_y;
+                target_sinks += snk;
+                mid_y += tgt_y;
+                min_x = double.min(min_x, tgt_x);
+            }
+            // Bundling connectors that run backwards would only produce
+            // a tangle, so these are drawn one by one
+            if (this.bundle_connectors && target_sinks.length >= BUNDLE_THRESHOLD && min_x > src_x) {
+                mid_y /= target_sinks.length;
+                double branch_x = src_x + (min_x - src_x) * 2 / 3;
+                for (int i = 0; i < target_sinks.length; i++) {
+                    this.index_connector(new Connector.bundled(
+                        src, target_sinks[i], src_x, src_y, branch_x, mid_y, targets[2*i], targets[2*i+1]
+                    ));
+                }
+                return;
+            }
+            for (int i = 0; i < target_sinks.length; i++) {
+                this.index_connector(
+                    new Connector(src, target_sinks[i], src_x, src_y, targets[2*i], targets[2*i+1])
+                );
+            }
+        }
+
+        /**
+         * Stores the given connector and remembers it as a long edge
+         * if it is larger than the {@link virtualization_margin}
+         */
+        private void index_connector(Connector c) {
+            this.connector_index.add(c);
+            double min_x, min_y, max_x, max_y;
+            c.get_bounds(out min_x, out min_y, out max_x, out max_y);
+            if (max_x - min_x <= this.virtualization_margin && max_y - min_y <= this.virtualization_margin) {
+                return;
+            }
+            var sinks = this.long_edges.get(c.source);
+            if (sinks == null) {
+                sinks = new GenericArray<GFlow.Sink>();
+                this.long_edges.insert(c.source, sinks);
+            }
+            sinks.add(c.sink);
+        }
+
+        /**
+         * Adds the connectors that leave the given node to the batch of their color
+         */
+        private void collect_connectors(GenericArray<ConnectorBatch> batches, GFlow.Node n, double line_width,
+                                        bool cull, Graphene.Rect visible) {
+            if (n is GFlow.GroupNode) {
+                // The proxies of a collapsed group aren't linked, its
+                // connectors leave from the grouped nodes
+                var group = (GFlow.GroupNode)n;
+                var sources = new List<GFlow.Source>();
+                foreach (GFlow.Dock d in group.get_boundary_docks()) {
+                    if (d is GFlow.Source) {
+                        sources.append((GFlow.Source)d);
+                    }
+                }
+                this.collect_source_connectors(batches, sources, line_width, cull, visible);
+            } else {
+                this.collect_source_connectors(batches, n.get_sources(), line_width, cull, visible);
+            }
+        }
+
+        private void collect_source_connectors(GenericArray<ConnectorBatch> batches, List<GFlow.Source> sources,
+                                               double line_width, bool cull, Graphene.Rect visible) {
+            foreach (GFlow.Source src in sources) {
+                ConnectorBatch? batch = null;
+                bool with_trunk = true;
+                this.connector_index.foreach_source_connector(src, (c) => {
+                    if (this.is_dragged(c) || (cull && !crosses(c, visible))) {
+                        return;
+                    }
+                    if (batch == null) {
+                        batch = this.get_batch(batches, src, line_width);
+                    }
+                    batch.add_connector(c, with_trunk);
+                    with_trunk = false;
+                });
+            }
+        }
+
+        /**
+         * Adds the long edges of the sources of nodes that are too far away
+         * from the visible area to be found in the node grid, if they
+         * cross it. Sources of the given nodes have been collected already.
+         */
+        private void collect_long_edges(GenericArray<ConnectorBatch> batches, HashTable<GFlow.Node, GFlow.Node> collected,
+                                        double line_width, Graphene.Rect visible) {
+            this.long_edges.foreach((src, sinks) => {
+                if (src.node == null) {
+                    return;
+                }
+                // The connectors of grouped nodes leave from their group
+                GFlow.Node shown = src.node;
+                var group = this.hidden_in.get(src.node);
+                if (group != null) {
+                    shown = group;
+                }
+                if (collected.contains(shown)) {
+                    return;
+                }
+                ConnectorBatch? batch = null;
+                bool with_trunk = true;
+                foreach (GFlow.Sink snk in sinks) {
+                    var c = this.connector_index.find(src, snk);
+                    if (c == null || this.is_dragged(c) || !crosses(c, visible)) {
+                        continue;
+                    }
+                    if (batch == null) {
+                        batch = this.get_batch(batches, src, line_width);
+                    }
+                    batch.add_connector(c, with_trunk);
+                    with_trunk = false;
+                }
+            });
+        }
+
+        /**
+         * Whether the given connector is the one that is
+         * being dragged away from its sink right now
+         */
+        private bool is_dragged(Connector c) {
+            return this.temp_connected_dock != null && c.source == this.temp_connected_dock
+                && this.clicked_dock != null && c.sink == this.clicked_dock;
+        }
+
+        /**
+         * Returns the batch for the color and width of
+         * the connectors that leave the given source
+         */
+        private ConnectorBatch get_batch(GenericArray<ConnectorBatch> batches, GFlow.Source src, double line_width) {
+            var color = this.resolve_dock_color(src);
+            double width = line_width;
+            if (this.heatmap != null) {
+                width *= this.heatmap.get_width_factor(src);
+            }
+            foreach (ConnectorBatch b in batches) {
+                if (b.color.equal(color) && b.width == width) {
+                    return b;
+                }
+            }
+            var batch = new ConnectorBatch(color, width);
+            batches.add(batch);
+            return batch;
+        }
+
+        /**
+         * Returns false if the given connector can't cross the given area
+         */
+        private static bool crosses(Connector c, Graphene.Rect area) {
+            double min_x, min_y, max_x, max_y;
+            c.get_bounds(out min_x, out min_y, out max_x, out max_y);
+            return max_x >= area.origin.x && min_x <= area.origin.x + area.size.width
+                && max_y >= area.origin.y && min_y <= area.origin.y + area.size.height;
+        }
+
+        /**
+         * Draws the hovered and the selected connector on top of the others
+         *
+         * The connectors are looked up again, as they are replaced whenever
+         * their nodes move. Connectors that vanished are forgotten.
+         */
+        private void draw_connector_highlights(Cairo.Context cr, double line_width) {
+            if (this.hovered_connector != null) {
+                this.hovered_connector = this.connector_index.find(
+                    this.hovered_connector.source, this.hovered_connector.sink
+                );
+            }
+            Connector? selected = null;
+            if (this.selected_connector != null) {
+                selected = this.connector_index.find(
+                    this.selected_connector.source, this.selected_connector.sink
+                );
+                if (selected != null) {
+                    this.selected_connector = selected;
+                } else if (!this.selected_connector.source.is_linked_to(this.selected_connector.sink)) {
+                    // The docks have been unlinked elsewhere
+                    this.selected_connector = null;
+                }
+            }
+            cr.save();
+            cr.set_line_width(line_width * 2);
+            if (this.hovered_connector != null && this.hovered_connector != selected) {
+                var color = this.resolve_dock_color(this.hovered_connector.source);
+                cr.set_source_rgba(color.red, color.green, color.blue, color.alpha);
+                this.append_connector(cr, this.hovered_connector);
+                cr.stroke();
+            }
+            if (selected != null) {
+                cr.set_source_rgba(0.0, 0.4, 1.0, 1.0);
+                this.append_connector(cr, selected);
+                cr.stroke();
+            }
+            cr.restore();
+        }
+
+        private void append_connector(Cairo.Context cr, Connector connector) {
+            for (int i = 0; i < connector.segments.length; i += 4) {
+                var p = Connector.get_curve(
+                    connector.segments[i], connector.segments[i+1],
+                    connector.segments[i+2], connector.segments[i+3]
+                );
+                cr.move_to(p[0], p[1]);
+                cr.curve_to(p[2], p[3], p[4], p[5], p[6], p[7]);
+            }
+        }
+
         protected override void snapshot (Gtk.Snapshot sn) {
+            int64 profile_start = GFlow.Profiler.begin_span();
             base.snapshot(sn);
+            this.update_connectors();
             var rect = Graphene.Rect().init(0,0,(float)this.get_width(), (float)this.get_height());
             var cr = sn.append_cairo(rect);
 
             Gdk.RGBA color = {0.0f,0.0f,0.0f,1.0f};
 
+            // Connectors are kept in canvas coordinates, so they are drawn
+            // through the view transform and their thickness follows the zoom
+            cr.save();
+            cr.translate(this.pan_x, this.pan_y);
+            cr.scale(this.zoom, this.zoom);
+            double line_width = 2.0;
+
+            // Connectors are collected per color first, so every color
+            // costs a single stroke regardless of the amount of connectors
+            var batches = new GenericArray<ConnectorBatch>();
+            var visible = this.get_visible_canvas_area();
+            var collected = new HashTable<GFlow.Node, GFlow.Node>(direct_hash, direct_equal);
             var c = this.get_first_child();
             while (c != null) {
-                var nr = (NodeRenderer)c;
-                int tgt_x, tgt_y, src_x, src_y, w, h;
-                foreach (GFlow.Sink snk in nr.n.get_sinks()) {
-                    var target_dock = this.retrieve_dock(snk);
-                    Gtk.Allocation tgt_alloc, tgt_node_alloc;
-                    target_dock.get_allocation(out tgt_alloc);
-                    nr.get_allocation(out tgt_node_alloc);
-                    foreach (GFlow.Source src in snk.sources) {
-                        if (this.temp_connected_dock != null && src == this.temp_connected_dock.d
-                         && this.clicked_dock != null && snk == this.clicked_dock.d) {
-                            continue;
-                        }
-
-                        var source_dock = this.retrieve_dock(src);
-                        var source_node = this.retrieve_node(src.node);
-                        Gtk.Allocation src_dock_alloc, src_node_alloc;
-                        source_dock.get_allocation(out src_dock_alloc);
-                        source_node.get_allocation(out src_node_alloc);
-                        src_x = src_dock_alloc.x+src_node_alloc.x+source_node.get_margin() + 8;
-                        src_y = src_dock_alloc.y+src_node_alloc.y+source_node.get_margin() + 8;
-                        
-                        tgt_x = tgt_alloc.x+tgt_node_alloc.x+nr.get_margin() + 8;
-                        tgt_y = tgt_alloc.y+tgt_node_alloc.y+nr.get_margin() + 8;
-                        w = tgt_x - src_x;
-                        h = tgt_y - src_y;
-
-                        var sourcedock = this.retrieve_dock(src);
-                        if (sourcedock != null) {
-                            color = sourcedock.resolve_color(sourcedock, sourcedock.last_value);
-                        }
-
-                        cr.save();
-                        cr.set_source_rgba(color.red, color.green, color.blue, color.alpha);
-                        cr.move_to(src_x, src_y);
-                        if (w > 0) {
-                            cr.rel_curve_to(w/3,0,2*w/3,h,w,h);
-                        } else {
-                            cr.rel_curve_to(-w/3,0,1.3*w,h,w,h);
-                        }
-                        cr.stroke();
-                        cr.restore();
-                    }
-                }
+                var n = ((NodeRenderer)c).n;
+                collected.insert(n, n);
+                this.collect_connectors(batches, n, line_width, false, visible);
                 c = c.get_next_sibling();
             }
-            this.draw_minimap();
+            // Nodes without a widget close to the visible part of the canvas
+            // only contribute the connectors that may cross it. They are
+            // found through the node grid, so the size of the model doesn't
+            // matter.
+            var nearby = grow_rect(visible, this.virtualization_margin);
+            var unrealized = this.node_grid.query(
+                (int)Math.floor(nearby.origin.x), (int)Math.floor(nearby.origin.y),
+                (int)Math.ceil(nearby.size.width), (int)Math.ceil(nearby.size.height)
+            );
+            foreach (GFlow.Node n in unrealized) {
+                var item = this.items.get(n);
+                if (item == null || this.realized.contains(item) || this.hidden_in.contains(n)) {
+                    continue;
+                }
+                collected.insert(n, n);
+                this.collect_connectors(batches, n, line_width, true, visible);
+            }
+            this.collect_long_edges(batches, collected, line_width, visible);
+            foreach (ConnectorBatch batch in batches) {
+                cr.set_line_width(batch.width);
+                cr.set_source_rgba(batch.color.red, batch.color.green, batch.color.blue, batch.color.alpha);
+                batch.append_to(cr);
+                cr.stroke();
+            }
+            this.draw_connector_highlights(cr, line_width);
+            cr.restore();
+            cr.set_line_width(line_width * this.zoom);
             if (this.temp_connector != null) {
-                color = this.temp_connected_dock.resolve_color(
-                    this.temp_connected_dock, this.temp_connected_dock.last_value
-                );
-                var nr = this.retrieve_node(this.temp_connected_dock.d.node);
+                color = this.resolve_dock_color(this.temp_connected_dock);
                 cr.save();
                 cr.set_source_rgba(color.red, color.green, color.blue, color.alpha);
-                cr.move_to(this.temp_connector.x+nr.get_margin(), this.temp_connector.y+nr.get_margin());
+                cr.move_to(this.temp_connector.x, this.temp_connector.y);
                 cr.rel_curve_to(
                     this.temp_connector.width/3,
                     0,
@@ -595,6 +2692,7 @@ namespace GtkFlow {
                 cr.set_source_rgba(0.0, 0.2, 1.0, 1.0);
                 cr.stroke();
             }
+            GFlow.Profiler.end_span("gtkflow", "NodeView.snapshot", profile_start);
         }
     }
 }
@@ -19,13 +19,125 @@ public class GFlowTest.AggregatorTest {
                     assert(list.length == 3);
                     return true;
                 });
+                assert(aggregator.find_aggregation_pipeline(new_flow_id) == null);
+            });
+        Test.add_func("/gflow/aggregator/values-array",
+            () => {
+                var values = new ValuesArray();
+                values.insert(2, "value3");
+                values.insert(0, "value1");
+                assert(values.length == 3);
+                assert(values.n_filled == 2);
+                assert(!values.is_complete(3));
+                assert(values.get_value(1) == null);
+
+                values.insert(1, "value2");
+                values.insert(1, "value2");
+                assert(values.n_filled == 3);
+                assert(values.is_complete(3));
+
+                var view = values.view();
+                assert(view.length == 3);
+                assert((string)view[0] == "value1");
+                assert((string)view[1] == "value2");
+                assert((string)view[2] == "value3");
+
+                values.insert(9, "value10");
+                assert(values.length == 10);
+                assert(values.is_complete(3));
+                assert(!values.is_complete(10));
+                // Unset slots are left out of the copy
+                var copy = values.to_array();
+                assert(copy.length == 4);
+                assert((string)copy[3] == "value10");
+            });
+        Test.add_func("/gflow/aggregator/max-pipelines",
+            () => {
+                var aggregator = Aggregator.get_instance();
+                uint n_evicted = 0;
+                aggregator.set_eviction_func((pipeline) => { n_evicted++; });
+                aggregator.max_pipelines = 16;
+
+                for (int i = 0; i < 1000; i++) {
+                    aggregator.new_aggregation_pipeline("max-pipelines-%d".printf(i));
+                }
+                assert(aggregator.get_n_pipelines() <= 16);
+                assert(n_evicted > 0);
+                assert(aggregator.find_aggregation_pipeline("max-pipelines-999") != null);
+
+                // The oldest pipeline goes first, no matter which shard it is in
+                aggregator.max_pipelines = 1;
+                aggregator.new_aggregation_pipeline("max-pipelines-last");
+                assert(aggregator.get_n_pipelines() == 1);
+                assert(aggregator.find_aggregation_pipeline("max-pipelines-999") == null);
+                assert(aggregator.find_aggregation_pipeline("max-pipelines-last") != null);
+
+                aggregator.max_pipelines = 0;
+                aggregator.set_eviction_func(null);
+            });
+        Test.add_func("/gflow/aggregator/replace",
+            () => {
+                var aggregator = Aggregator.get_instance();
+                GLib.GenericArray<AggregationPipeline> evicted = new GLib.GenericArray<AggregationPipeline>();
+                aggregator.set_eviction_func((pipeline) => { evicted.add(pipeline); });
+                var evicted_before = aggregator.get_n_evicted();
+
+                var first = aggregator.new_aggregation_pipeline("replace");
+                var second = aggregator.new_aggregation_pipeline("replace");
+                assert(evicted.length == 1);
+                assert(evicted[0] == first);
+                assert(aggregator.get_n_evicted() - evicted_before == 1);
+                assert(aggregator.find_aggregation_pipeline("replace") == second);
+
+                aggregator.set_eviction_func(null);
+            });
+        Test.add_func("/gflow/aggregator/ttl",
+            () => {
+                var aggregator = Aggregator.get_instance();
+                GLib.GenericArray<string> evicted = new GLib.GenericArray<string>();
+                aggregator.set_eviction_func((pipeline) => { evicted.add(pipeline.id); });
+                aggregator.ttl = 1000;
+
+                aggregator.new_aggregation_pipeline("ttl");
+                Thread.usleep(5000);
+                assert(aggregator.find_aggregation_pipeline("ttl") == null);
+                assert(evicted.length == 1);
+                assert(evicted[0] == "ttl");
+
+                aggregator.ttl = 0;
+                aggregator.set_eviction_func(null);
+            });
+        Test.add_func("/gflow/aggregator/threads",
+            () => {
+                var aggregator = Aggregator.get_instance();
+                var committed_before = aggregator.get_n_committed();
+                Thread<bool>[] threads = {};
+                for (int t = 0; t < 4; t++) {
+                    int thread_id = t;
+                    threads += new Thread<bool>("aggregator-%d".printf(t), () => {
+                        for (int i = 0; i < 250; i++) {
+                            var id = "threads-%d-%d".printf(thread_id, i);
+                            var pipeline = aggregator.new_aggregation_pipeline(id);
+                            pipeline.set_array_attribute_at_index("test", "value1", 0);
+                            pipeline.set_array_attribute_at_index("test", "value2", 1);
+                            pipeline.set_array_attribute_at_index("test", "value3", 2);
+                            aggregator.find_aggregation_pipeline(id).commit(new TestPredicate(), p => true);
+                        }
+                        return true;
+                    });
+                }
+                foreach (var thread in threads) {
+                    assert(thread.join());
+                }
+                assert(aggregator.get_n_committed() - committed_before == 1000);
             });
     }
 
     public class TestPredicate : AggregationPredicate, Object {
 
         public bool should_commit (GFlow.AggregationPipeline aggregation_pipeline) {
-            return aggregation_pipeline.get_array_attribute("test").length == 3;
+            var values = aggregation_pipeline.get_values_array("test");
+            return values != null && values.is_complete(3);
         }
     }
 }
@@ -0,0 +1,69 @@
+using GFlow;
+
+public class GFlowTest.BatchTest {
+    public static void add_tests() {
+        Test.add_func("/gflow/batch/add-docks",
+            () => {
+                var n = new SimpleNode();
+                int n_added = 0;
+                n.sink_added.connect(() => { n_added++; });
+                var result = n.add_sinks({"a", "b", "c"}, {typeof(double), typeof(string), GLib.Type.INVALID});
+                assert(result.n_items == 3);
+                assert(result.n_failed == 1);
+                assert(!result.is_ok());
+                assert(result.get_error(0) == null);
+                assert(result.get_error(2) != null);
+                assert(result.get_failed().length == 1 && result.get_failed()[0] == 2);
+                assert(result.get_dock(0) is DoubleSink);
+                assert(result.get_dock(1).value_type == typeof(string));
+                assert(result.get_dock(2) == null);
+                assert(n.get_sinks().length() == 2);
+                assert(n.get_dock("b") == result.get_dock(1));
+                assert(result.get_dock(1).node == n);
+                assert(n_added == 2);
+
+                // Missing types are reported per item
+                result = n.add_sources({"x", "y"}, {typeof(int64)});
+                assert(result.n_failed == 1);
+                assert(result.get_dock(0) is Int64Source);
+                assert(n.get_sources().length() == 1);
+            }
+        );
+        Test.add_func("/gflow/batch/link",
+            () => {
+                var a = new SimpleNode();
+                var b = new SimpleNode();
+                var sources = a.add_sources({"x", "y", "z"}, {typeof(double), typeof(double), typeof(int)});
+                var sinks = b.add_sinks({"x", "y", "z"}, {typeof(double), typeof(double), typeof(double)});
+                Source[] srcs = {};
+                Sink[] snks = {};
+                for (uint i = 0; i < 3; i++) {
+                    srcs += (Source) sources.get_dock(i);
+                    snks += (Sink) sinks.get_dock(i);
+                }
+                var result = Batch.link(srcs, snks);
+                // int can't be linked to double
+                assert(result.n_failed == 1);
+                assert(result.get_error(2) != null);
+                assert(srcs[0].is_linked_to(snks[0]));
+                assert(srcs[1].is_linked_to(snks[1]));
+
+                result = Batch.set_doubles({(SimpleSource) srcs[0], (SimpleSource) srcs[1]}, {1.0, 2.0, 3.0});
+                assert(result.n_failed == 1);
+                assert(((DoubleSink) snks[0]).get_double() == 1.0);
+                assert(((DoubleSink) snks[1]).get_double() == 2.0);
+
+                var packer = new DoubleArraySource();
+                packer.set_doubles({5.0, 6.0});
+                var bytes = packer.get_bytes();
+                result = Batch.set_doubles_from_bytes({(SimpleSource) srcs[0], (SimpleSource) srcs[1]}, bytes);
+                assert(result.is_ok());
+                assert(((DoubleSink) snks[1]).get_double() == 6.0);
+
+                result = Batch.unlink(srcs, snks);
+                assert(result.is_ok());
+                assert(!srcs[0].is_linked());
+            }
+        );
+    }
+}
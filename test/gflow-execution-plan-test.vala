@@ -0,0 +1,120 @@
+using GFlow;
+
+public class GFlowTest.ExecutionPlanTest {
+
+    private class ScaleNode : EvaluableNode {
+        public SimpleSink sink;
+        public SimpleSource source;
+        private double factor;
+
+        public ScaleNode(double factor) {
+            base();
+            this.factor = factor;
+            this.sink = new SimpleSink.with_type(typeof(double));
+            this.source = new SimpleSource.with_type(typeof(double));
+            try {
+                this.add_sink(this.sink);
+                this.add_source(this.source);
+            } catch (NodeError e) {
+                assert_not_reached();
+            }
+        }
+
+        public override void evaluate(Value[] inputs, Value[] outputs) {
+            outputs[0].set_double(inputs[0].get_double() * this.factor);
+        }
+    }
+
+    private class SumNode : EvaluableNode {
+        public SimpleSink a;
+        public SimpleSink b;
+        public SimpleSource source;
+
+        public SumNode() {
+            base();
+            this.a = new SimpleSink.with_type(typeof(double));
+            this.b = new SimpleSink.with_type(typeof(double));
+            this.source = new SimpleSource.with_type(typeof(double));
+            try {
+                this.add_sink(this.a);
+                this.add_sink(this.b);
+                this.add_source(this.source);
+            } catch (NodeError e) {
+                assert_not_reached();
+            }
+        }
+
+        public override void evaluate(Value[] inputs, Value[] outputs) {
+            outputs[0].set_double(inputs[0].get_double() + inputs[1].get_double());
+        }
+    }
+
+    public static void add_tests() {
+        Test.add_func("/gflow/execution-plan/run",
+            () => {
+                try {
+                    // input -> double -> sum <- triple <- input
+                    var input = new SimpleSource.with_type(typeof(double));
+                    var input_node = new SimpleNode();
+                    input_node.add_source(input);
+                    var twice = new ScaleNode(2);
+                    var thrice = new ScaleNode(3);
+                    var sum = new SumNode();
+                    input.link(twice.sink);
+                    input.link(thrice.sink);
+                    twice.source.link(sum.a);
+                    thrice.source.link(sum.b);
+
+                    input.set_value(1.5);
+                    var expected = (double)sum.source.get_last_value();
+                    assert(expected == 7.5);
+
+                    // The nodes are passed in an order that is not topological
+                    var plan = new ExecutionPlan({sum, thrice, twice});
+                    assert(plan.n_steps == 3);
+                    plan.run();
+                    assert(plan.get_output(sum.source).get_double() == expected);
+
+                    for (int i = 0; i < 100; i++) {
+                        plan.set_input(twice.sink, (double)i);
+                        plan.set_input(thrice.sink, (double)i);
+                        plan.run();
+                        input.set_value((double)i);
+                        assert(plan.get_output(sum.source).get_double()
+                               == (double)sum.source.get_last_value());
+                    }
+                    try {
+                        plan.set_input(sum.a, 1);
+                        assert_not_reached();
+                    } catch (NodeError e) {
+                        assert(e is NodeError.INCOMPATIBLE_VALUE);
+                    }
+                } catch (GLib.Error e) {
+                    assert_not_reached();
+                }
+            });
+        Test.add_func("/gflow/execution-plan/errors",
+            () => {
+                try {
+                    var a = new ScaleNode(1);
+                    var b = new ScaleNode(1);
+                    a.source.link(b.sink);
+                    b.source.link(a.sink);
+                    try {
+                        new ExecutionPlan({a, b});
+                        assert_not_reached();
+                    } catch (PlanError e) {
+                        assert(e is PlanError.CYCLE);
+                    }
+                    try {
+                        new ExecutionPlan({a, new SimpleNode()});
+                        assert_not_reached();
+                    } catch (PlanError e) {
+                        assert(e is PlanError.NOT_EVALUABLE);
+                    }
+                } catch (GLib.Error e) {
+                    assert_not_reached();
+                }
+            });
+    }
+}
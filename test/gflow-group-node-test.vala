@@ -0,0 +1,133 @@
+using GFlow;
+
+public class GFlowTest.GroupNodeTest {
+
+    private class PassNode : SimpleNode {
+        public SimpleSink sink;
+        public SimpleSource source;
+
+        public PassNode(string name) {
+            base();
+            this.name = name;
+            this.sink = new SimpleSink.with_type(typeof(int));
+            this.sink.name = "in";
+            this.source = new SimpleSource.with_type(typeof(int));
+            this.source.name = "out";
+            try {
+                this.add_sink(this.sink);
+                this.add_source(this.source);
+            } catch (NodeError e) {
+                assert_not_reached();
+            }
+        }
+    }
+
+    public static void add_tests() {
+        Test.add_func("/gflow/group-node/proxies",
+            () => {
+                try {
+                    // outside -> a -> b -> outside
+                    var before = new PassNode("before");
+                    var a = new PassNode("a");
+                    var b = new PassNode("b");
+                    var after = new PassNode("after");
+                    before.source.link(a.sink);
+                    a.source.link(b.sink);
+                    b.source.link(after.sink);
+
+                    var group = new GroupNode("group", {a, b});
+                    assert(group.get_sinks().length() == 1);
+                    assert(group.get_sources().length() == 1);
+                    assert(group.contains(a) && !group.contains(after));
+                    assert(group.get_proxy(a.sink) != null);
+                    assert(group.get_proxy(a.source) == null);
+                    assert(group.get_inner(group.get_proxy(b.source)) == b.source);
+                    assert(group.get_boundary_docks().length() == 2);
+
+                    // Proxies follow the links of the grouped nodes
+                    b.source.unlink(after.sink);
+                    assert(group.get_sources().length() == 0);
+                    a.source.link(after.sink);
+                    assert(group.get_proxy(a.source) != null);
+
+                    // Proxy sources repeat the values of their inner docks
+                    var proxy = (SimpleSource)group.get_proxy(a.source);
+                    a.source.set_value(42);
+                    assert(proxy.get_last_value().get_int() == 42);
+                } catch (GLib.Error e) {
+                    assert_not_reached();
+                }
+            });
+        Test.add_func("/gflow/group-node/nested",
+            () => {
+                try {
+                    var before = new PassNode("before");
+                    var a = new PassNode("a");
+                    var b = new PassNode("b");
+                    before.source.link(a.sink);
+                    a.source.link(b.sink);
+
+                    var inner = new GroupNode("inner", {a});
+                    var outer = new GroupNode("outer", {inner, b});
+                    assert(outer.contains(a));
+                    assert(outer.get_leaf_nodes().length() == 2);
+                    // a -> b stays inside of outer, but crosses the boundary of inner
+                    assert(inner.get_proxy(a.source) != null);
+                    assert(outer.get_proxy(a.source) == null);
+                    assert(outer.get_proxy(a.sink) != null);
+                } catch (GLib.Error e) {
+                    assert_not_reached();
+                }
+            });
+        Test.add_func("/gflow/group-node/boxed-handlers",
+            () => {
+                try {
+                    var inside = new DoubleSource();
+                    var boundary = new DoubleSource();
+                    var a = new SimpleNode();
+                    a.add_source(inside);
+                    a.add_source(boundary);
+                    var b = new SimpleNode();
+                    var b_sink = new DoubleSink();
+                    b.add_sink(b_sink);
+                    var after = new SimpleNode();
+                    var after_sink = new DoubleSink();
+                    after.add_sink(after_sink);
+                    inside.link(b_sink);
+                    boundary.link(after_sink);
+
+                    var group = new GroupNode("group", {a, b});
+                    uint changed_id = Signal.lookup("changed", typeof(Dock));
+                    // Only boundary sources are mirrored, so the inner one keeps skipping boxing
+                    assert(!SignalHandler.has_handler_pending(inside, changed_id, 0, false));
+                    assert(SignalHandler.has_handler_pending(boundary, changed_id, 0, false));
+                    assert(group.get_boundary_docks().length() == 1);
+
+                    boundary.unlink(after_sink);
+                    assert(!SignalHandler.has_handler_pending(boundary, changed_id, 0, false));
+                    assert(group.get_boundary_docks().length() == 0);
+                } catch (GLib.Error e) {
+                    assert_not_reached();
+                }
+            });
+        Test.add_func("/gflow/group-node/dispose",
+            () => {
+                try {
+                    var before = new PassNode("before");
+                    var a = new PassNode("a");
+                    var after = new PassNode("after");
+                    before.source.link(a.sink);
+                    a.source.link(after.sink);
+
+                    var group = new GroupNode("group", {a});
+                    group.run_dispose();
+                    uint linked_id = Signal.lookup("linked", typeof(Dock));
+                    uint changed_id = Signal.lookup("changed", typeof(Dock));
+                    assert(!SignalHandler.has_handler_pending(a.sink, linked_id, 0, false));
+                    assert(!SignalHandler.has_handler_pending(a.source, changed_id, 0, false));
+                } catch (GLib.Error e) {
+                    assert_not_reached();
+                }
+            });
+    }
+}
@@ -0,0 +1,49 @@
+using GFlow;
+
+public class GFlowTest.MappedValueTest {
+    public static void add_tests() {
+        Test.add_func("/gflow/mapped-value/ranges",
+            () => {
+                try {
+                    string path;
+                    FileUtils.close(FileUtils.open_tmp("gflow-mapped-XXXXXX", out path));
+                    FileUtils.set_contents(path, "0123456789");
+
+                    var mapped = new MappedValue(path);
+                    assert(mapped.size == 10);
+                    var range = mapped.get_range(2, 3);
+                    assert(Memory.cmp(range.get_data(), "234".data, 3) == 0);
+
+                    var view = mapped.view(5, 5);
+                    assert(view.offset == 5);
+                    assert(view.path == path);
+                    var bytes = view.get_range(1, 2);
+                    assert(bytes.get_size() == 2);
+                    assert(bytes.get_data()[0] == '6' && bytes.get_data()[1] == '7');
+                    try {
+                        view.get_range(3, 3);
+                        assert_not_reached();
+                    } catch (FileError e) {
+                        assert(e is FileError.INVAL);
+                    }
+
+                    // Only a reference is passed from the source to the sink
+                    var source = new SimpleSource.with_type(typeof(MappedValue));
+                    var sink = new SimpleSink.with_type(typeof(MappedValue));
+                    source.link(sink);
+                    MappedValue? received = null;
+                    sink.changed.connect((v) => {
+                        if (v != null) {
+                            received = (MappedValue)v.get_object();
+                        }
+                    });
+                    source.set_value(view);
+                    assert(received == view);
+
+                    FileUtils.remove(path);
+                } catch (GLib.Error e) {
+                    assert_not_reached();
+                }
+            });
+    }
+}
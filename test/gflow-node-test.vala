@@ -78,6 +78,36 @@ public class GFlowTest.NodeTest {
                 assert (false);
             }
         });
+        Test.add_func ("/gflow/node/recursion",
+        () => {
+            try {
+                // Stacked diamonds: every node is reachable through
+                // exponentially many paths from the first one
+                var nodes = new GFlow.SimpleNode[61];
+                for (int i = 0; i < nodes.length; i++) {
+                    nodes[i] = new GFlow.SimpleNode();
+                    var sink = new GFlow.SimpleSink.with_type (typeof(int));
+                    sink.max_sources = 2;
+                    nodes[i].add_sink(sink);
+                    nodes[i].add_source(new GFlow.SimpleSource.with_type (typeof(int)));
+                    nodes[i].add_source(new GFlow.SimpleSource.with_type (typeof(int)));
+                }
+                for (int i = 0; i + 3 < nodes.length; i += 3) {
+                    nodes[i].get_sources().nth_data(0).link(nodes[i+1].get_sinks().nth_data(0));
+                    nodes[i].get_sources().nth_data(1).link(nodes[i+2].get_sinks().nth_data(0));
+                    nodes[i+1].get_sources().nth_data(0).link(nodes[i+3].get_sinks().nth_data(0));
+                    nodes[i+2].get_sources().nth_data(0).link(nodes[i+3].get_sinks().nth_data(0));
+                }
+                var last = nodes[nodes.length-1];
+                assert (nodes[0].is_recursive_forward(last));
+                assert (!last.is_recursive_forward(nodes[0]));
+                assert (last.is_recursive_backward(nodes[0]));
+                assert (!nodes[0].is_recursive_backward(last));
+                assert (!nodes[0].is_recursive_forward(nodes[0]));
+            } catch (GLib.Error e) {
+                assert_not_reached ();
+            }
+        });
         Test.add_func ("/gflow/node/get_dock",
         () => {
             try {
@@ -0,0 +1,125 @@
+using GFlow;
+
+public class GFlowTest.ProfilerTest {
+    public static void add_tests() {
+        Test.add_func("/gflow/profiler/propagation",
+            () => {
+                try {
+                    var a = new SimpleNode();
+                    a.name = "a";
+                    var a_out = new SimpleSource.with_type(typeof(int));
+                    a.add_source(a_out);
+
+                    var b = new SimpleNode();
+                    b.name = "b";
+                    var b_in = new SimpleSink.with_type(typeof(int));
+                    var b_out = new SimpleSource.with_type(typeof(int));
+                    b.add_sink(b_in);
+                    b.add_source(b_out);
+                    b_in.changed.connect((v, flow_id) => {
+                        try {
+                            b_out.set_value(v, flow_id);
+                        } catch (GLib.Error e) {
+                            assert_not_reached();
+                        }
+                    });
+
+                    var c = new SimpleNode();
+                    c.name = "c";
+                    var c_in = new SimpleSink.with_type(typeof(int));
+                    c.add_sink(c_in);
+                    c_in.changed.connect(() => { Thread.usleep(2000); });
+
+                    a_out.link(b_in);
+                    b_out.link(c_in);
+
+                    var profiler = Profiler.get_default();
+                    profiler.reset();
+                    a_out.set_value(1, "disabled");
+                    assert(profiler.get_changed_count(a_out) == 0);
+
+                    Profiler.set_enabled(true);
+                    a_out.set_value(2, "flow-1");
+                    a_out.set_value(3, "flow-2");
+                    Profiler.set_enabled(false);
+
+                    assert(profiler.get_changed_count(a_out) == 2);
+                    assert(profiler.get_changed_count(b_in) == 2);
+                    assert(profiler.get_changed_count(c_in) == 2);
+                    assert(profiler.get_flow_depth("flow-1") == 2);
+                    assert(profiler.get_flow_depth("disabled") == 0);
+
+                    var b_stats = profiler.get_node_stats(b);
+                    var c_stats = profiler.get_node_stats(c);
+                    assert(profiler.get_node_stats(a) == null);
+                    assert(b_stats.count == 2 && c_stats.count == 2);
+                    assert(c_stats.self_time >= 4000);
+                    // The time spent in c is part of b's total, not its self time
+                    assert(b_stats.total_time >= c_stats.total_time);
+                    assert(b_stats.self_time < c_stats.self_time);
+                    assert(profiler.get_hotspots().data == c_stats);
+
+                    var trace = profiler.to_chrome_trace();
+                    assert("\"name\": \"c\"" in trace);
+                    assert("\"ph\": \"X\"" in trace);
+                    profiler.reset();
+                } catch (GLib.Error e) {
+                    assert_not_reached();
+                }
+            });
+        Test.add_func("/gflow/profiler/spans",
+            () => {
+                var profiler = Profiler.get_default();
+                profiler.reset();
+                assert(Profiler.begin_span() == 0);
+
+                Profiler.set_enabled(true);
+                var start = Profiler.begin_span();
+                Thread.usleep(1000);
+                Profiler.end_span("test", "span \"quoted\"", start);
+                Profiler.set_enabled(false);
+
+                var stats = profiler.get_span_stats("test", "span \"quoted\"");
+                assert(stats != null);
+                assert(stats.count == 1);
+                assert(stats.total_time >= 1000);
+                assert("span \\\"quoted\\\"" in profiler.to_chrome_trace());
+                profiler.reset();
+            });
+        Test.add_func("/gflow/profiler/counters",
+            () => {
+                try {
+                    var profiler = Profiler.get_default();
+                    profiler.reset();
+                    {
+                        var a = new SimpleNode();
+                        var a_out = new SimpleSource.with_type(typeof(int));
+                        a.add_source(a_out);
+                        var b = new SimpleNode();
+                        var b_in = new SimpleSink.with_type(typeof(int));
+                        b.add_sink(b_in);
+                        a_out.link(b_in);
+
+                        Profiler.hold_counters();
+                        assert(!Profiler.is_enabled());
+                        assert(Profiler.begin_span() == 0);
+                        a_out.set_value(1, "counted");
+                        Profiler.release_counters();
+                        a_out.set_value(2, "not-counted");
+
+                        assert(profiler.get_changed_count(a_out) == 1);
+                        assert(profiler.get_changed_count(b_in) == 1);
+                        assert(profiler.get_node_stats(b).count == 1);
+                        assert(profiler.get_flow_depth("counted") == 0);
+                        assert(!("\"ph\"" in profiler.to_chrome_trace()));
+                        assert(profiler.get_hotspots().length() == 1);
+                    }
+                    // The profiler does not keep nodes alive
+                    assert(profiler.get_hotspots().length() == 0);
+                    profiler.reset();
+                } catch (GLib.Error e) {
+                    assert_not_reached();
+                }
+            });
+    }
+}
@@ -31,7 +31,15 @@ class GFlowTest.Main {
 		DockTest.add_tests ();
 		NodeTest.add_tests ();
 		GtkFlowTest.NodeTest.add_tests ();
+		GtkFlowTest.ConnectorIndexTest.add_tests ();
 		GFlowTest.AggregatorTest.add_tests() ;
+		GFlowTest.ProfilerTest.add_tests ();
+		GFlowTest.ExecutionPlanTest.add_tests ();
+		GFlowTest.TrafficTest.add_tests ();
+		GFlowTest.MappedValueTest.add_tests ();
+		GFlowTest.GroupNodeTest.add_tests ();
+		GFlowTest.TypedDockTest.add_tests ();
+		GFlowTest.BatchTest.add_tests ();
 		Test.run ();
 		return 0;
 	}
@@ -0,0 +1,103 @@
+using GFlow;
+
+public class GFlowTest.TrafficTest {
+    public static void add_tests() {
+        Test.add_func("/gflow/traffic/record-replay",
+            () => {
+                try {
+                    var dir = DirUtils.make_tmp("gflow-traffic-XXXXXX");
+                    var path = Path.build_filename(dir, "trace");
+
+                    var number = new SimpleSource.with_type(typeof(int));
+                    var text = new SimpleSource.with_type(typeof(string));
+                    var recorder = new TrafficRecorder(path);
+                    recorder.add_source(number, "number");
+                    recorder.add_source(text, "text");
+                    number.set_value(1, "flow-1");
+                    text.set_value("hello", "flow-1");
+                    number.set_value(2);
+                    recorder.close();
+                    // Values set after closing are not recorded
+                    number.set_value(3, "flow-3");
+                    assert(recorder.n_records == 3);
+
+                    var replayed_number = new SimpleSource.with_type(typeof(int));
+                    var sink = new SimpleSink.with_type(typeof(int));
+                    replayed_number.link(sink);
+                    int[] values = {};
+                    string?[] flow_ids = {};
+                    sink.changed.connect((v, flow_id) => {
+                        values += (int)v;
+                        flow_ids += flow_id;
+                    });
+
+                    var replayer = new TrafficReplayer(path);
+                    replayer.speed = 0;
+                    replayer.add_source(replayed_number, "number");
+                    var report = replayer.run();
+                    assert(report.n_values == 2);
+                    // The text source was not registered
+                    assert(report.n_skipped == 1);
+                    assert(values.length == 2);
+                    assert(values[0] == 1 && values[1] == 2);
+                    assert(flow_ids[0] == "flow-1" && flow_ids[1] == null);
+                    assert(report.get_latency_percentile(1.0) >= report.get_latency_percentile(0.5));
+
+                    FileUtils.remove(path);
+                    DirUtils.remove(dir);
+                } catch (GLib.Error e) {
+                    assert_not_reached();
+                }
+            });
+        Test.add_func("/gflow/traffic/unsupported-values",
+            () => {
+                try {
+                    var dir = DirUtils.make_tmp("gflow-traffic-XXXXXX");
+                    var path = Path.build_filename(dir, "trace");
+
+                    var blob = new SimpleSource.with_type(typeof(Bytes));
+                    var recorder = new TrafficRecorder(path);
+                    recorder.add_source(blob, "blob");
+                    var v = Value(typeof(Bytes));
+                    v.set_boxed(new Bytes({1, 2, 3}));
+                    blob.set_value(v, "flow-1");
+                    recorder.close();
+                    assert(recorder.n_records == 1);
+
+                    var replayed_blob = new SimpleSource.with_type(typeof(Bytes));
+                    bool changed = false;
+                    replayed_blob.changed.connect(() => { changed = true; });
+                    var replayer = new TrafficReplayer(path);
+                    replayer.speed = 0;
+                    replayer.add_source(replayed_blob, "blob");
+                    var report = replayer.run();
+                    // The value is neither replayed as null nor dropped silently
+                    assert(report.n_values == 0);
+                    assert(report.n_skipped == 1);
+                    assert(!changed);
+
+                    FileUtils.remove(path);
+                    DirUtils.remove(dir);
+                } catch (GLib.Error e) {
+                    assert_not_reached();
+                }
+            });
+        Test.add_func("/gflow/traffic/invalid-trace",
+            () => {
+                try {
+                    string path;
+                    FileUtils.close(FileUtils.open_tmp("gflow-trace-XXXXXX", out path));
+                    FileUtils.set_contents(path, "not a trace");
+                    try {
+                        new TrafficReplayer(path);
+                        assert_not_reached();
+                    } catch (TrafficError e) {
+                        assert(e is TrafficError.INVALID_TRACE);
+                    }
+                    FileUtils.remove(path);
+                } catch (GLib.Error e) {
+                    assert_not_reached();
+                }
+            });
+    }
+}
@@ -0,0 +1,146 @@
+using GFlow;
+
+public class GFlowTest.TypedDockTest {
+    public static void add_tests() {
+        Test.add_func("/gflow/typed-dock/double",
+            () => {
+                try {
+                    var src = new DoubleSource();
+                    var snk = new DoubleSink();
+                    double received = 0;
+                    int n_received = 0;
+                    snk.changed_double.connect((v) => {
+                        received = v;
+                        n_received++;
+                    });
+                    src.link(snk);
+                    src.set_double(2.5);
+                    assert(received == 2.5);
+                    assert(n_received == 1);
+                    assert(snk.get_double() == 2.5);
+                    assert(src.get_last_value().get_double() == 2.5);
+
+                    // Boxed handlers still see the value
+                    Value? boxed = null;
+                    snk.changed.connect((v) => { boxed = v; });
+                    src.set_double(4.0);
+                    assert(boxed != null && boxed.get_double() == 4.0);
+
+                    src.unlink(snk);
+                    src.set_double(8.0);
+                    assert(snk.get_double() == 4.0);
+                } catch (GLib.Error e) {
+                    assert_not_reached();
+                }
+            }
+        );
+        Test.add_func("/gflow/typed-dock/compatibility",
+            () => {
+                try {
+                    // Typed source to plain sink
+                    var src = new DoubleSource();
+                    var plain_snk = new SimpleSink.with_type(typeof(double));
+                    Value? boxed = null;
+                    plain_snk.changed.connect((v) => { boxed = v; });
+                    src.link(plain_snk);
+                    src.set_double(1.5);
+                    assert(boxed != null && boxed.get_double() == 1.5);
+
+                    // Plain source to typed sink
+                    var plain_src = new SimpleSource.with_type(typeof(double));
+                    var snk = new DoubleSink();
+                    plain_src.link(snk);
+                    plain_src.set_value(3.5);
+                    assert(snk.get_double() == 3.5);
+
+                    // Typed sources check the type of boxed values
+                    bool failed = false;
+                    try {
+                        src.set_value(1);
+                    } catch (GLib.Error e) {
+                        failed = true;
+                    }
+                    assert(failed);
+                    src.set_value(6.0);
+                    assert(src.get_double() == 6.0);
+                } catch (GLib.Error e) {
+                    assert_not_reached();
+                }
+            }
+        );
+        Test.add_func("/gflow/typed-dock/int64-boolean",
+            () => {
+                try {
+                    var int_src = new Int64Source();
+                    var int_snk = new Int64Sink();
+                    int_src.link(int_snk);
+                    int_src.set_int64(int64.MAX);
+                    assert(int_snk.get_int64() == int64.MAX);
+
+                    var bool_src = new BooleanSource();
+                    var bool_snk = new BooleanSink();
+                    bool_src.set_boolean(true);
+                    // Linking passes on the last value
+                    bool_src.link(bool_snk);
+                    assert(bool_snk.get_boolean());
+                } catch (GLib.Error e) {
+                    assert_not_reached();
+                }
+            }
+        );
+        Test.add_func("/gflow/typed-dock/double-array",
+            () => {
+                try {
+                    var src = new DoubleArraySource();
+                    var snk = new DoubleArraySink();
+                    src.link(snk);
+                    src.set_doubles({1.0, 2.0, 3.0});
+                    // The packed values are passed on without copying
+                    assert(snk.get_bytes() == src.get_bytes());
+                    double[] values = snk.get_doubles();
+                    assert(values.length == 3);
+                    assert(values[0] == 1.0 && values[2] == 3.0);
+
+                    var plain_snk = new SimpleSink.with_type(typeof(Bytes));
+                    Value? boxed = null;
+                    plain_snk.changed.connect((v) => { boxed = v; });
+                    src.link(plain_snk);
+                    assert(boxed != null && boxed.get_boxed() == src.get_bytes());
+                } catch (GLib.Error e) {
+                    assert_not_reached();
+                }
+            }
+        );
+        Test.add_func("/gflow/typed-dock/reset",
+            () => {
+                try {
+                    var src = new DoubleSource();
+                    var snk = new DoubleSink();
+                    src.link(snk);
+                    src.set_double(2.0);
+                    int n_reset = 0;
+                    snk.reset.connect(() => { n_reset++; });
+
+                    // Setting null reaches the typed sink, boxed handlers see null
+                    bool got_null = false;
+                    snk.changed.connect((v) => { got_null = (v == null); });
+                    src.set_value(null);
+                    assert(n_reset == 1);
+                    assert(got_null);
+                    assert(src.get_last_value() == null);
+                    assert(snk.get_double() == 2.0);
+
+                    var bool_src = new BooleanSource();
+                    var bool_snk = new BooleanSink();
+                    bool_src.link(bool_snk);
+                    bool reset = false;
+                    bool_snk.reset.connect(() => { reset = true; });
+                    bool_src.set_value(null);
+                    assert(reset);
+                } catch (GLib.Error e) {
+                    assert_not_reached();
+                }
+            }
+        );
+    }
+}
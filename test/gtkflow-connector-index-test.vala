@@ -0,0 +1,83 @@
+using GFlow;
+using GtkFlow;
+
+public class GtkFlowTest.ConnectorIndexTest {
+
+    public static void add_tests() {
+        Test.add_func("/gtkflow/connector-index/pick",
+            () => {
+                var src = new SimpleSource.with_type(typeof(int));
+                var near = new SimpleSink.with_type(typeof(int));
+                var far = new SimpleSink.with_type(typeof(int));
+                var index = new ConnectorIndex();
+                // Both run straight along the x axis
+                index.add(new Connector(src, near, 0, 0, 300, 0));
+                index.add(new Connector(src, far, 0, 40, 300, 40));
+                assert(index.length == 2);
+
+                var c = index.pick(150, 3, 6);
+                assert(c != null && c.sink == near);
+                c = index.pick(150, 36, 6);
+                assert(c != null && c.sink == far);
+                // The closer connector wins if both are in reach
+                c = index.pick(150, 15, 30);
+                assert(c != null && c.sink == near);
+                assert(index.pick(150, 20, 6) == null);
+                assert(index.pick(400, 0, 6) == null);
+
+                // Connectors that span many cells end up in coarser grids
+                var long_sink = new SimpleSink.with_type(typeof(int));
+                index.add(new Connector(src, long_sink, -20000, 5000, 20000, 5000));
+                c = index.pick(12345, 5002, 6);
+                assert(c != null && c.sink == long_sink);
+                assert(index.pick(12345, 5020, 6) == null);
+            });
+        Test.add_func("/gtkflow/connector-index/bundled",
+            () => {
+                var src = new SimpleSource.with_type(typeof(int));
+                var snk = new SimpleSink.with_type(typeof(int));
+                var index = new ConnectorIndex();
+                index.add(new Connector.bundled(src, snk, 0, 0, 200, 100, 400, 100));
+                // Hit along the trunk and along the branch
+                assert(index.pick(100, 50, 6) != null);
+                assert(index.pick(300, 100, 6) != null);
+                assert(index.pick(300, 0, 6) == null);
+            });
+        Test.add_func("/gtkflow/connector-index/find",
+            () => {
+                var src = new SimpleSource.with_type(typeof(int));
+                var other = new SimpleSource.with_type(typeof(int));
+                var a = new SimpleSink.with_type(typeof(int));
+                var b = new SimpleSink.with_type(typeof(int));
+                var index = new ConnectorIndex();
+                var first = new Connector(src, a, 0, 0, 100, 0);
+                index.add(first);
+                index.add(new Connector(src, b, 0, 0, 100, 50));
+                index.add(new Connector(other, a, 0, 200, 100, 200));
+                assert(index.find(src, a) == first);
+                assert(index.find(other, b) == null);
+
+                // Adding a connector for the same docks replaces the old one
+                var moved = new Connector(src, a, 0, 500, 100, 500);
+                index.add(moved);
+                assert(index.length == 3);
+                assert(index.find(src, a) == moved);
+                assert(index.pick(50, 500, 6) == moved);
+                assert(index.pick(50, 0, 2) == null);
+
+                index.remove(src, b);
+                assert(index.find(src, b) == null);
+                assert(index.length == 2);
+
+                index.remove_source(src);
+                assert(index.find(src, a) == null);
+                assert(index.pick(50, 500, 6) == null);
+                assert(index.find(other, a) != null);
+                assert(index.length == 1);
+
+                index.clear();
+                assert(index.length == 0);
+                assert(index.find(other, a) == null);
+            });
+    }
+}